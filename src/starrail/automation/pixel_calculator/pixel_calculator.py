@@ -12,11 +12,16 @@ class PixelCalculator:
     
     
     @staticmethod
-    def transform_coordinate(prev_coor: tuple, prev_window_info: dict):
+    def transform_coordinate(prev_coor: tuple, prev_window_info: dict, curr_window_info: dict = None):
+        """
+        :param curr_window_info: geometry of the window to map onto (default: the foreground window, queried
+                                 on every call, pass it in when transforming several coordinates)
+        """
         try:
             x, y = prev_coor
             
-            curr_window_info = ResolutionDetector.get_foreground_window_size()
+            if curr_window_info == None:
+                curr_window_info = ResolutionDetector.get_foreground_window_size()
             curr_x = curr_window_info["left"]
             curr_y = curr_window_info["top"]
             curr_w = curr_window_info["width"]
@@ -122,7 +122,9 @@ class AutomationRecorder():
         # mouse_listener = mouse.Listener(on_click=self.__on_mouse_action)
         # keyboard_listener = keyboard.Listener(on_press=self.__on_keyboard_action)
         
-        with mouse.Listener(on_click=self.__on_mouse_action, on_scroll=self.__on_scroll_action) as mouse_listener, \
+        # The callbacks read the focus state cached by the process watcher instead of looking it up per event
+        with self.starrail.get_process_watcher().fast_polling(), \
+            mouse.Listener(on_click=self.__on_mouse_action, on_scroll=self.__on_scroll_action) as mouse_listener, \
             keyboard.Listener(on_press=self.__on_keyboard_action_press, on_release=self.__on_keyboard_action_release) as keyboard_listener:
             
             mouse_listener_thread     = threading.Thread(target=mouse_listener.join)
@@ -0,0 +1,181 @@
+import sys
+import math
+import time
+import pyautogui
+from array import array
+from typing import List
+from pynput import keyboard
+
+from starrail.constants import PYNPUT_KEY_MAPPING
+from starrail.automation.units.action import Action, MouseAction, ScrollAction, KeyboardAction
+from starrail.automation.pixel_calculator.pixel_calculator import PixelCalculator
+
+
+'''
+ExecutionPlan: an AutomationSequence compiled for one run.
+
+The actions are flattened into parallel arrays (one slot per action, not modified after compiling):
+
+    op_codes        OP_KEY / OP_MOVE / OP_CLICK / OP_SCROLL
+    target_times    seconds from the start of the run at which the action is due (delays + global delay,
+                    plus the hold time of the keyboard actions before it)
+    xs, ys          screen coordinates, already transformed to the current window geometry
+    keys            pynput key (OP_KEY only)
+    values          hold time (OP_KEY) or scroll amount (OP_SCROLL)
+
+Compiling never modifies the sequence's actions, and running the plan doesn't need to look at them (no
+isinstance dispatch, no window lookup and no key mapping per action).
+
+Actions are run against absolute deadlines (run start + target time on the perf_counter clock), so the
+time spent executing an action (mouse moves, click and key holds) is taken out of the next wait instead
+of adding up over the run. Each wait sleeps until SPIN_THRESHOLD before the deadline, then spins.
+'''
+
+OP_KEY      = 0
+OP_MOVE     = 1     # Mouse move without a click (right click while recording)
+OP_CLICK    = 2
+OP_SCROLL   = 3
+
+MOVE_DURATION   = 0.1   # pyautogui.moveTo duration
+CLICK_HOLD_TIME = 0.1
+SCROLL_DELAY    = 0.05  # Between the move and the scroll
+
+# Sleeps can wake up late by up to the OS timer resolution (about 15.6 ms on Windows by default), the last
+# stretch before a deadline is spun instead
+SPIN_THRESHOLD  = 0.02 if sys.platform == "win32" else 0.002
+
+
+class ExecutionPlan:
+    def __init__(self, op_codes, target_times, xs, ys, keys, values, untransformed_count=0):
+        self.op_codes       = array("B", op_codes)
+        self.target_times   = array("d", target_times)
+        self.xs             = array("i", xs)
+        self.ys             = array("i", ys)
+        self.keys           = tuple(keys)
+        self.values         = array("d", values)
+        self.untransformed_count = untransformed_count  # Mouse actions recorded before the pixel calculator
+
+    def __len__(self):
+        return len(self.op_codes)
+
+    @staticmethod
+    def compile(actions: List[Action], global_delay: float = 0, window_info: dict = None):
+        """
+        :param window_info: geometry of the game window the coordinates are transformed to, None to keep the
+                            recorded coordinates
+        """
+        op_codes, target_times, xs, ys, keys, values = [], [], [], [], [], []
+        untransformed_count = 0
+
+        target_time = 0
+        for action in actions:
+            target_time += action.delay + global_delay
+            target_times.append(target_time)
+            key, value, coordinate = None, 0, (0, 0)
+
+            if isinstance(action, KeyboardAction):
+                op_codes.append(OP_KEY)
+                key, value = PYNPUT_KEY_MAPPING.get(action.key, action.key), action.hold_time
+                # The recorded delay of the next action starts at this key's release
+                target_time += action.hold_time
+
+            elif isinstance(action, MouseAction):
+                op_codes.append(OP_CLICK if action.click else OP_MOVE)
+                coordinate = action.coordinate
+                if not action.is_valid_for_pixel_calc:
+                    untransformed_count += 1
+                elif window_info != None:
+                    try:
+                        coordinate = PixelCalculator.transform_coordinate(action.coordinate, action.window_info, window_info)
+                    except Exception:
+                        # Keep the recorded coordinate (e.g. a zero sized recorded window)
+                        pass
+
+            elif isinstance(action, ScrollAction):
+                op_codes.append(OP_SCROLL)
+                coordinate, value = action.coordinate, action.dy
+
+            else:
+                raise Exception(f"Action ({action}) can't be compiled!")
+
+            xs.append(int(coordinate[0]))
+            ys.append(int(coordinate[1]))
+            keys.append(key)
+            values.append(value)
+
+        return ExecutionPlan(op_codes, target_times, xs, ys, keys, values, untransformed_count)
+
+    def run(self, pynput_keyboard: keyboard.Controller, on_action=None):
+        """
+        :param on_action: called with the index of each action before it is run (progress display)
+        :return: ExecutionTiming of the run
+        """
+        handlers = (self.__run_key, self.__run_move, self.__run_click, self.__run_scroll)
+        lateness = array("d")
+
+        start_time = time.perf_counter()
+        for index in range(len(self.op_codes)):
+            if on_action != None:
+                on_action(index)
+
+            deadline = start_time + self.target_times[index]
+            ExecutionPlan.wait_until(deadline)
+            lateness.append(time.perf_counter() - deadline)
+            handlers[self.op_codes[index]](index, pynput_keyboard)
+
+        return ExecutionTiming(lateness)
+
+    @staticmethod
+    def wait_until(deadline: float):
+        """
+        Wait until the perf_counter deadline, returns immediately if it already passed.
+        """
+        remaining = deadline - time.perf_counter()
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+        while time.perf_counter() < deadline:
+            pass
+
+    # =============================================
+    # ============| ACTION HANDLERS | =============
+    # =============================================
+
+    def __run_key(self, index, pynput_keyboard):
+        try:
+            pynput_keyboard.press(self.keys[index])
+            time.sleep(self.values[index])
+            pynput_keyboard.release(self.keys[index])
+        except (keyboard.Controller.InvalidKeyException, ValueError):
+            # Unsupported key (see KeyboardAction.press_key)
+            pass
+
+    def __run_move(self, index, pynput_keyboard):
+        pyautogui.moveTo(self.xs[index], self.ys[index], duration=MOVE_DURATION)
+
+    def __run_click(self, index, pynput_keyboard):
+        pyautogui.moveTo(self.xs[index], self.ys[index], duration=MOVE_DURATION)
+        pyautogui.mouseDown()
+        time.sleep(CLICK_HOLD_TIME)
+        pyautogui.mouseUp()
+
+    def __run_scroll(self, index, pynput_keyboard):
+        pyautogui.moveTo(self.xs[index], self.ys[index], duration=MOVE_DURATION)
+        time.sleep(SCROLL_DELAY)
+        pyautogui.scroll(int(self.values[index]))
+
+
+class ExecutionTiming:
+    def __init__(self, lateness: array):
+        """
+        :param lateness: per action, seconds between its deadline and the moment it actually started
+        """
+        self.lateness = lateness
+        self.count = len(lateness)
+
+        sorted_lateness = sorted(lateness)
+        self.mean   = sum(lateness) / self.count if self.count > 0 else 0
+        self.p99    = sorted_lateness[max(0, math.ceil(self.count * 0.99) - 1)] if self.count > 0 else 0
+        self.max    = sorted_lateness[-1] if self.count > 0 else 0
+
+    def __repr__(self):
+        return f"ExecutionTiming(actions={self.count}, mean={self.mean*1000:.3f} ms, p99={self.p99*1000:.3f} ms, max={self.max*1000:.3f} ms)"
@@ -1,6 +1,5 @@
 import os
 import time
-import copy
 from datetime import datetime
 from pynput import keyboard
 from starrail.automation.units.action import Action, MouseAction, ScrollAction, KeyboardAction
@@ -8,7 +7,7 @@ from starrail.exceptions.exceptions import SRExit
 from starrail.constants import VERSION
 from starrail.utils.utils import *
 from starrail.automation.pixel_calculator.resolution_detector import ResolutionDetector
-from starrail.automation.pixel_calculator.pixel_calculator import PixelCalculator
+from starrail.automation.units.execution_plan import ExecutionPlan, ExecutionTiming
 
 SUBMODULE_NAME = "AUTO"
 
@@ -24,6 +23,9 @@ class AutomationSequence:
         self.actions: list[Action]          = []
         
         self.global_delay                   = 0
+        
+        self.__plan: ExecutionPlan          = None                          # Last compiled plan (see compile())
+        self.__plan_key: tuple              = None
     
     
     def __progress_bar(self, actions: list, prefix="", size=40, out=sys.stdout):
@@ -64,71 +66,41 @@ class AutomationSequence:
                     
                 
     
-    def execute(self):
-    
-        def verbose_action(idx: int, action: Action):
-            buffer_space = " "*5                                # Verbose current action
-            # aprint(f"(CMD {idx+1}/{len(self.actions)}) Executing: {action.__repr__()}{buffer_space}", end="\r")
-            aprint(f"[Action {idx}/{len(self.actions)}] Running... ", submodule_name=SUBMODULE_NAME, end="\r")
+    def execute(self) -> ExecutionTiming:
+        # The sequence is compiled for the current window geometry, its actions are never modified
+        plan = self.compile()
         
-        def verbose_warning():
-            # Verbose warning if the current action isn't suited for the pixel calculator developed in ver0.0.2+
-            for action in self.actions:
-                if isinstance(action, MouseAction) and action.is_valid_for_pixel_calc == False:
-                    aprint(f"This automation sequence is not available for pixel calculator in version {VERSION}.")
-                    return
+        # Verbose warning if some actions aren't suited for the pixel calculator developed in ver0.0.2+
+        if plan.untransformed_count > 0:
+            aprint(f"This automation sequence is not available for pixel calculator in version {VERSION}.")
         
-
-        # Becuase the pixel calculator will directory modify the MouseAction's coordinates, we need a way to reset the 
-        # sequence's coordinates after the sequence finishes running. Therefore, we first make a copy of the sequence
-        # before it is modified by the pixel calculator and then replace the modified sequence at the end.
-        actions_copy = copy.deepcopy(self.actions)
+        def verbose_action(idx: int):
+            aprint(f"[Action {idx}/{len(plan)}] Running... ", submodule_name=SUBMODULE_NAME, end="\r")
         
-        verbose_warning()
-        pynput_keyboard = keyboard.Controller()
+        return plan.run(keyboard.Controller(), on_action=verbose_action)
+    
+    def compile(self, window_info: dict = None) -> ExecutionPlan:
+        """
+        Compile the sequence into an ExecutionPlan for the given window geometry (default: the foreground
+        window). The last plan is reused as long as the actions, global delay and geometry are the same.
+        """
+        if window_info == None:
+            try:
+                window_info = ResolutionDetector.get_foreground_window_size()
+            except Exception:
+                # TODO: log this error (the recorded coordinates are used as is)
+                window_info = None
         
-        # for idx, action in enumerate(self.__progress_bar(self.actions, f"Running: ", 40)):
-            
-        for idx, action in enumerate(self.actions):
-            verbose_action(idx, action)
-            
-            time.sleep(action.delay)                            # Execute current action after standard action delay
-            time.sleep(self.global_delay)                       # Execute current action after global delay
-
-            # ====================================
-            # ===========| KEYBOARD | ============
-            # ====================================
-            if isinstance(action, KeyboardAction):
-                action.execute(pynput_keyboard)
-                
-            # ==================================
-            # ============| MOUSE | ============
-            # ==================================
-            elif isinstance(action, MouseAction):
-                
-                if action.is_valid_for_pixel_calc == True:
-                    try:
-                        new_coord = PixelCalculator.transform_coordinate(action.coordinate, action.window_info)
-                        action.coordinate = new_coord
-                    except Exception as ex:
-                        # TODO: log this error
-                        # aprint(Printer.to_lightgrey(f"Warning: PixelCalc not working ({ex})"))
-                        pass
-                
-                action.execute()
-                
-            # ==================================
-            # ===========| SCROLL | ============
-            # ==================================
-            elif isinstance(action, ScrollAction):
-                action.execute()
-            
-        # Reset the modified version of the sequence (modified by the pixel calculator)
-        self.actions = actions_copy
+        plan_key = (id(self.actions), len(self.actions), self.global_delay, None if window_info == None else tuple(sorted(window_info.items())))
+        if self.__plan == None or self.__plan_key != plan_key:
+            self.__plan = ExecutionPlan.compile(self.actions, self.global_delay, window_info)
+            self.__plan_key = plan_key
+        return self.__plan
 
     def add(self, action: Action):
         assert(isinstance(action, Action))
         self.actions.append(action)
+        self.__plan = None
 
     def to_json(self):
         json_data = dict()
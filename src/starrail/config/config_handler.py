@@ -44,21 +44,25 @@ class StarRailConfig(JSONConfigHandler):
             __raw_config = self.LOAD_CONFIG()
         
         # Config variables
-        self.instance_pid: int  = None
         self.root_path: Path    = None  # Root as   D:\HoYoPlay\games
         self.innr_path: Path    = None  # Inner as  D:\HoYoPlay\games\Star Rail Games or D:\HoYoPlay\games\Game
         self.game_path: Path    = None  # Game as   D:\HoYoPlay\games\Star Rail Games\StarRail.exe
         self.disclaimer: bool   = False
+        self.webcache_dir: str  = None  # Newest webCaches version directory as D:\...\StarRail_Data\webCaches\2.3.0.0
+        self.webcache_mtime_ns: int = None  # Modification time of the webCaches directory when webcache_dir was resolved
         
         # Load config into attributes
         if __raw_config != None:
             try:
-                self.instance_pid   = __raw_config["instance"]["pid"]
                 self.root_path      = __raw_config["static"]["root_path"]
                 self.innr_path      = __raw_config["static"]["innr_path"]
                 self.game_path      = __raw_config["static"]["game_path"]
                 self.disclaimer     = __raw_config["static"]["disclaimer"]
                 
+                # Resolution cache, older configs without it are kept as is
+                self.webcache_dir       = __raw_config.get("cache", dict()).get("webcache_dir")
+                self.webcache_mtime_ns  = __raw_config.get("cache", dict()).get("webcache_mtime_ns")
+                
                 if self.root_path != None:
                     self.root_path = Path(self.root_path)
                 if self.innr_path != None:
@@ -80,14 +84,15 @@ class StarRailConfig(JSONConfigHandler):
     def save_current_config(self):
         self.SAVE_CONFIG(
             {
-                "instance": {
-                    "pid": self.instance_pid
-                },
                 "static": {
                     "root_path": str(self.root_path),
                     "innr_path": str(self.innr_path),
                     "game_path": str(self.game_path),
                     "disclaimer": self.disclaimer
+                },
+                "cache": {
+                    "webcache_dir": self.webcache_dir,
+                    "webcache_mtime_ns": self.webcache_mtime_ns
                 }
             }
         )
@@ -125,14 +130,15 @@ class StarRailConfig(JSONConfigHandler):
     def __reset_config(self):
         self.SAVE_CONFIG(
             {
-                "instance": {
-                    "pid": None
-                },
                 "static": {
                     "root_path": None,
                     "innr_path": None,
                     "game_path": None,
                     "disclaimer": False
+                },
+                "cache": {
+                    "webcache_dir": None,
+                    "webcache_mtime_ns": None
                 }
             }
         )
@@ -140,5 +146,7 @@ class StarRailConfig(JSONConfigHandler):
         self.innr_path = None
         self.root_path = None
         self.disclaimer = False
+        self.webcache_dir = None
+        self.webcache_mtime_ns = None
 
 
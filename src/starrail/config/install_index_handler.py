@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: MIT
+# MIT License
+#
+# Copyright (c) 2024 Kevin L.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import time
+from starrail.utils.json_handler import JSONConfigHandler
+
+
+class StarRailInstallIndex(JSONConfigHandler):
+    '''
+    Every StarRail.exe location the game detector has found, so that it can be checked again before
+    crawling the drives:
+    
+        {"paths": {path: {"size": int, "mtime_ns": int, "last_seen": epoch}}}
+    '''
+    def __init__(self):
+        __install_index =  os.path.join(os.path.abspath(os.path.dirname(__file__)), "install_index.json")
+        super().__init__(__install_index, dict)
+    
+    def get_paths(self):
+        """
+        :return: dict of path -> {"size", "mtime_ns", "last_seen"}, most recently seen first
+        """
+        raw_index = self.LOAD_CONFIG()
+        if not isinstance(raw_index, dict) or not isinstance(raw_index.get("paths"), dict):
+            return dict()
+        
+        paths = raw_index["paths"]
+        return {path: paths[path] for path in sorted(paths, key=lambda path: paths[path].get("last_seen", 0), reverse=True)}
+    
+    def record_path(self, game_path, stat: os.stat_result = None):
+        try:
+            stat = stat if stat != None else os.stat(game_path)
+        except OSError:
+            return False
+        
+        paths = self.get_paths()
+        paths[game_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "last_seen": time.time()}
+        return self.SAVE_CONFIG({"paths": paths})
+    
+    def forget_paths(self, game_paths):
+        paths = self.get_paths()
+        for game_path in game_paths:
+            paths.pop(game_path, None)
+        return self.SAVE_CONFIG({"paths": paths})
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: MIT
+# MIT License
+#
+# Copyright (c) 2024 Kevin L.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+from starrail.utils.utils import HashCalculator
+from starrail.utils.json_handler import JSONConfigHandler
+
+
+class StarRailMetadataCache(JSONConfigHandler):
+    '''
+    Metadata parsed out of game files, memoized until the files change. Entries are keyed by file path and
+    validated against the file's size, mtime and fast fingerprint:
+    
+        {path: {"size": int, "mtime_ns": int, "fingerprint": str, "metadata": dict}}
+    
+    Loads and saves are serialized and saves are atomic (temp file + rename), since the files are decoded
+    concurrently and a load that read a partially written file would reset the cache.
+    '''
+    def __init__(self):
+        __metadata_cache =  os.path.join(os.path.abspath(os.path.dirname(__file__)), "metadata_cache.json")
+        super().__init__(__metadata_cache, dict)
+        self.__lock = threading.Lock()  # Several files may be decoded (and saved) concurrently
+    
+    def load_metadata(self, file_path):
+        """
+        :return: the memoized metadata of the file, or None if it isn't memoized or the file changed since
+        """
+        with self.__lock:
+            raw_cache = self.LOAD_CONFIG()
+        if not isinstance(raw_cache, dict):
+            return None
+        
+        cached_entry = raw_cache.get(self.__get_file_key(file_path))
+        if not isinstance(cached_entry, dict):
+            return None
+        
+        # Size and mtime are checked first since they only cost a stat call
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        if stat.st_size != cached_entry.get("size") or stat.st_mtime_ns != cached_entry.get("mtime_ns"):
+            return None
+        if HashCalculator.fingerprint(file_path) != cached_entry.get("fingerprint"):
+            return None
+        return cached_entry.get("metadata")
+    
+    def save_metadata(self, file_path, metadata: dict):
+        try:
+            stat = os.stat(file_path)
+            fingerprint = HashCalculator.fingerprint(file_path)
+        except OSError:
+            return False
+        
+        with self.__lock:
+            raw_cache = self.LOAD_CONFIG()
+            if not isinstance(raw_cache, dict):
+                raw_cache = dict()
+            
+            raw_cache[self.__get_file_key(file_path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "fingerprint": fingerprint,
+                "metadata": metadata
+            }
+            return self.ATOMIC_SAVE_CONFIG(raw_cache)
+    
+    def __get_file_key(self, file_path):
+        return os.path.normcase(os.path.abspath(file_path))
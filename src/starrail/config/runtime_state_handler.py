@@ -0,0 +1,89 @@
+# SPDX-License-Identifier: MIT
+# MIT License
+#
+# Copyright (c) 2024 Kevin L.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import atexit
+import threading
+from starrail.constants import RUNTIME_STATE_FLUSH_DELAY
+from starrail.utils.json_handler import JSONConfigHandler
+
+
+class StarRailRuntimeState(JSONConfigHandler):
+    '''
+    Volatile state of the running game instance, kept apart from the static config so that updating it
+    never rewrites starrail_config.json:
+    
+        {"pid": int, "create_time": epoch}
+    
+    Updates only change the in-memory values. They are written RUNTIME_STATE_FLUSH_DELAY seconds later
+    (coalescing the updates made in between) by a background timer, atomically (temp file + rename),
+    and flushed on exit.
+    '''
+    def __init__(self, flush_delay=RUNTIME_STATE_FLUSH_DELAY):
+        __runtime_state =  os.path.join(os.path.abspath(os.path.dirname(__file__)), "runtime_state.json")
+        super().__init__(__runtime_state, dict)
+        self.flush_delay = flush_delay
+        self.writes = 0
+        
+        self.__lock = threading.Lock()          # In-memory state, never held during file I/O
+        self.__write_lock = threading.Lock()    # Keeps the writes in order
+        self.__flush_timer: threading.Timer = None
+        self.__dirty = False
+        
+        raw_state = self.LOAD_CONFIG()
+        raw_state = raw_state if isinstance(raw_state, dict) else dict()
+        self.pid: int = raw_state.get("pid")
+        self.create_time: float = raw_state.get("create_time")
+        
+        atexit.register(self.flush)
+    
+    def update(self, pid: int, create_time: float):
+        """
+        Set the game instance, the state file is written later (see flush_delay). Never does file I/O.
+        """
+        with self.__lock:
+            if pid == self.pid and create_time == self.create_time:
+                return
+            self.pid, self.create_time = pid, create_time
+            self.__dirty = True
+            
+            if self.__flush_timer == None:
+                self.__flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self.__flush_timer.daemon = True
+                self.__flush_timer.start()
+    
+    def flush(self):
+        """
+        Write the pending update, if any.
+        """
+        with self.__write_lock:
+            with self.__lock:
+                if self.__flush_timer != None:
+                    self.__flush_timer.cancel()
+                    self.__flush_timer = None
+                if not self.__dirty:
+                    return True
+                self.__dirty = False
+                payload = {"pid": self.pid, "create_time": self.create_time}
+                self.writes += 1
+            return self.ATOMIC_SAVE_CONFIG(payload)
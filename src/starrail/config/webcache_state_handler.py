@@ -0,0 +1,76 @@
+# SPDX-License-Identifier: MIT
+# MIT License
+#
+# Copyright (c) 2024 Kevin L.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import threading
+from starrail.utils.json_handler import JSONConfigHandler
+
+
+class StarRailWebCacheState(JSONConfigHandler):
+    '''
+    Persisted progress of the incremental web cache scans, one state per cache directory:
+    
+        entries     CacheAddr -> creation time of every cache entry already parsed
+        urls        URL -> creation time of every URL found so far (kept after the entry is evicted)
+        data_files  Binary file name -> {"size": int, "mtime_ns": int, "chunks": content hash per chunk,
+                    "strings": URL strings found so far} (only used when the cache can't be parsed and the
+                    binary files are string-scanned)
+    
+    Loads and saves are serialized, and saves are atomic (temp file + rename): caches of several versions
+    may be scanned concurrently, and a load that read a partially written file would reset the state.
+    '''
+    def __init__(self):
+        __webcache_state =  os.path.join(os.path.abspath(os.path.dirname(__file__)), "webcache_state.json")
+        super().__init__(__webcache_state, dict)
+        self.__lock = threading.Lock()  # Caches of several versions may be scanned (and saved) concurrently
+        
+    def load_cache_state(self, cache_dir) -> dict:
+        with self.__lock:
+            raw_state = self.LOAD_CONFIG()
+        if not isinstance(raw_state, dict):
+            raw_state = dict()
+        
+        cache_state = raw_state.get(self.__get_cache_key(cache_dir), dict())
+        for section in ("entries", "urls", "data_files"):
+            if not isinstance(cache_state.get(section), dict):
+                cache_state[section] = dict()
+        return cache_state
+    
+    def save_cache_state(self, cache_dir, cache_state: dict):
+        with self.__lock:
+            raw_state = self.LOAD_CONFIG()
+            if not isinstance(raw_state, dict):
+                raw_state = dict()
+            
+            raw_state[self.__get_cache_key(cache_dir)] = cache_state
+            return self.ATOMIC_SAVE_CONFIG(raw_state)
+    
+    def reset_cache_state(self, cache_dir):
+        with self.__lock:
+            raw_state = self.LOAD_CONFIG()
+            if isinstance(raw_state, dict) and raw_state.pop(self.__get_cache_key(cache_dir), None) != None:
+                return self.ATOMIC_SAVE_CONFIG(raw_state)
+            return False
+    
+    def __get_cache_key(self, cache_dir):
+        return os.path.normcase(os.path.abspath(cache_dir))
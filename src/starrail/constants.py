@@ -63,6 +63,48 @@ CURSOR_UP_ANSI  = "\033[A"
 # See utils/game_detector for details on "Weak Match"
 MIN_WEAK_MATCH_EXE_SIZE = 0.5 # megabytes
 
+# Directories the game detector's crawler never descends into (case-insensitive), the first set anywhere
+# and the second only at the root of a drive
+CRAWLER_PRUNE_DIRS      = {"$recycle.bin", "system volume information", "node_modules", ".git"}
+CRAWLER_PRUNE_ROOT_DIRS = {"windows"}
+
+# Install location candidates checked before crawling the drives (see utils/game_detector):
+# directories (relative to each drive) the game directory is usually installed in
+KNOWN_GAME_ROOTS = [
+    "Program Files/HoYoPlay/games",
+    "HoYoPlay/games",
+    "Program Files",
+    "Program Files (x86)",
+    "Games",
+    ""
+]
+# Launcher registry keys (HKEY_CURRENT_USER / HKEY_LOCAL_MACHINE, key, value) holding the install directory
+LAUNCHER_REGISTRY_KEYS = [
+    ("HKEY_CURRENT_USER",   "Software\\Cognosphere\\HYP\\1_0\\hkrpg_global",    "GameInstallPath"),
+    ("HKEY_CURRENT_USER",   "Software\\miHoYo\\HYP\\1_0\\hkrpg_cn",             "GameInstallPath"),
+    ("HKEY_LOCAL_MACHINE",  "SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\Star Rail", "InstallPath"),
+]
+# Legacy launcher config (relative to the launcher directory) and its install directory entry
+LAUNCHER_CONFIG_FILE    = "config.ini"
+LAUNCHER_CONFIG_KEY     = "game_install_path"
+
+# See utils/binary_decoder for details on parallel decoding
+MIN_PARALLEL_DECODE_RANGE_SIZE = 4 # megabytes
+
+# See utils/process_watcher, the polling interval backs off from the min to the max while nothing changes
+PROCESS_WATCHER_MIN_INTERVAL = 0.1  # seconds
+PROCESS_WATCHER_IDLE_INTERVAL = 0.5 # seconds, fastest polling while the game isn't running (each poll scans every process)
+PROCESS_WATCHER_MAX_INTERVAL = 2    # seconds
+
+# See utils/status_sampler, number of samples kept for the live status sparklines and min/avg/max
+STATUS_HISTORY_SIZE = 60
+
+# See config/runtime_state_handler, updates to the runtime state within this delay are written at once
+RUNTIME_STATE_FLUSH_DELAY = 1 # seconds
+
+# See controllers/webcache_controller, the binary files are fingerprinted (and rescanned) in chunks of this size
+WEBCACHE_SCAN_CHUNK_SIZE = 256 # kilobytes
+
 
 # ==============================================
 # ==================| PATHS | ==================
@@ -119,6 +161,15 @@ WEBCACHE_IGNORE_FILETYPES = [
     ".jpeg"
 ]
 
+# Web cache URL category -> sequence identifying the category's URLs
+WEBCACHE_URL_CATEGORIES = {
+    "announcements":    "webstatic.mihoyo.com/hkrpg/announcement",
+    "events":           "webstatic.mihoyo.com/hkrpg/event",
+    "gacha_log":        "/gacha_record/api/getGachaLog"
+}
+
+PULL_AUTHKEY_LIFETIME = 24 * 60 * 60 # seconds, pull history authkeys expire a day after they are issued
+
 from pynput.keyboard import Key
 PYNPUT_KEY_MAPPING = {
     'Key.esc'       : Key.esc,
@@ -100,15 +100,12 @@ class StarRailAutomationController:
         if user_input != "y": return
         
         aprint(f"Automation run ready start.\n{Printer.to_lightblue(' - To start')}: Focus on the game and the automation will automatically start.")
-        while True:
-            if self.starrail.is_focused():
-                time.sleep(1)
-                break
-            else:
-                time.sleep(0.5)
+        self.starrail.get_process_watcher().wait_for_focus()
+        time.sleep(1)
         
-        sequence.execute()
+        timing = sequence.execute()
         aprint("Automation sequence run complete!                                                            ")
+        aprint(f"Action timing: {Printer.to_lightgrey(f'mean {timing.mean*1000:.2f} ms late, p99 {timing.p99*1000:.2f} ms, max {timing.max*1000:.2f} ms ({timing.count} actions)')}")
     
     def show_sequences(self):
         headers = [Printer.to_lightpurple(title) for title in ["ID", "Sequence Name", "Date Created",  "Runtime", "Actions Count"]]
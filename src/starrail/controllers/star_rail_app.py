@@ -9,11 +9,15 @@ import subprocess
 import configparser
 from pathlib import Path
 
-from starrail.constants import CURSOR_UP_ANSI
 from starrail.utils.utils import *
-from starrail.utils.process_handler import ProcessHandler
+from starrail.utils.process_tracker import StarRailProcessTracker
+from starrail.utils.process_watcher import GameProcessWatcher, PsutilProcessSource
+from starrail.utils.focus_source import Win32FocusSource
+from starrail.utils.status_sampler import GameStatusSampler, GameStatusSample
+from starrail.utils.terminal_renderer import IncrementalRenderer
 from starrail.config.config_handler import StarRailConfig
-from starrail.controllers.webcache_controller import StarRailWebCacheController, StarRailWebCacheBinaryFile
+from starrail.config.runtime_state_handler import StarRailRuntimeState
+from starrail.controllers.webcache_controller import StarRailWebCacheController, StarRailWebCacheBinaryFile, StarRailWebCacheURLCategory
 from starrail.controllers.streaming_assets_controller import StarRailStreamingAssetsController, StarRailStreamingAssetsBinaryFile
 
 from starrail.bin.loader.loader import Loader 
@@ -22,6 +26,10 @@ class HonkaiStarRail:
     def __init__(self):
         self.config = StarRailConfig()
         self.module_configured = self.config.full_configured()
+        self.runtime_state = StarRailRuntimeState()
+        self.process_tracker = StarRailProcessTracker(self.config, self.runtime_state)
+        self.focus_source = Win32FocusSource()
+        self.process_watcher = GameProcessWatcher(PsutilProcessSource(self.process_tracker), self.focus_source)
         
         self.webcache_controller         = StarRailWebCacheController(self.config)
         self.streaming_assets_controller = StarRailStreamingAssetsController(self.config)
@@ -54,19 +62,6 @@ class HonkaiStarRail:
     def terminate(self) -> bool:
         aprint("Terminating Honkai: Star Rail...", end="\r")
         
-        # If the cached proc PID is working
-        if self.config.instance_pid != None:
-            try:
-                starrail_proc = psutil.Process(self.config.instance_pid)
-                if self.proc_is_starrail(starrail_proc):
-                    starrail_proc.terminate()
-                    aprint("Honkai: Star Rail terminated successfully.")
-                    return True
-            except psutil.NoSuchProcess:
-                self.config.instance_pid = None
-                self.config.save_current_config()
-        
-        # If no PID is cached, find proc and termiante
         starrail_proc = self.get_starrail_process()
         if starrail_proc != None:
             starrail_proc.terminate()
@@ -86,54 +81,77 @@ class HonkaiStarRail:
     # ===========| UTILITY FUNCTIONS | ============
     # =============================================
 
-    def show_status(self, live=False):
+    def show_status(self, live=False, interval=1):
         aprint("Loading status for the Honkai: Star Rail process...")
-        
-        def print_status():
-            starrail_proc = self.get_starrail_process()
-            headers = [Printer.to_lightblue(title) for title in ["Title", "HSR Real-time Status"]]
-            
-            data_dict = {
-                "Status"            : "N/A",
-                "Process ID"        : "N/A",
-                "Started On"        : "N/A",
-                "CPU Percent"       : "N/A",
-                "CPU Affinity"      : "N/A",
-                "IO Operations"     : "N/A",
-                "RAM Usage"         : "N/A"
-            }
-            
-            if starrail_proc != None: # Is running
-                data_dict["Status"]          = bool_to_str(starrail_proc.is_running())
-                data_dict["Process ID"]      = starrail_proc.pid
-                data_dict["Started On"]      = DatetimeHandler.epoch_to_time_str(starrail_proc.create_time())
-                data_dict["CPU Percent"]     = f"{starrail_proc.cpu_percent(1)}%"
-                data_dict["CPU Affinity"]    = ",".join([str(e) for e in starrail_proc.cpu_affinity()])
-                data_dict["IO Operations"]   = f"Writes: {starrail_proc.io_counters().write_count}, Reads: {starrail_proc.io_counters().read_count}"
-                data_dict["RAM Usage"]       = f"{round(psutil.virtual_memory()[3]/1000000000, 4)} GB"
-                
-            else:
-                data_dict["Status"] = bool_to_str(False)
-                # All other options remain as N/A
-            
-            data_list = [[Printer.to_lightpurple(k), v] for k, v in data_dict.items()]
-            table = tabulate.tabulate(data_list, headers=headers)
-            print("\n" + table + "\n")
-            
-            if live:
-                print(CURSOR_UP_ANSI * (len(data_list)+5))
+        sampler = GameStatusSampler(self.process_tracker)
         
         try:
-            if live:
-                # TODO: Force CLI mode before allowing live status
-                while True:
-                    print_status()
-            else:
-                print_status()
+            # CPU usage is measured between two samples
+            sample = sampler.sample()
+            if not live:
+                if sample != None:
+                    time.sleep(interval)
+                    sample = sampler.sample()
+                print("\n" + self.__format_status_table(sample, sampler, live) + "\n")
+                return
+            
+            # TODO: Force CLI mode before allowing live status
+            renderer = IncrementalRenderer()
+            next_frame = time.perf_counter()
+            while True:
+                renderer.render([""] + self.__format_status_table(sample, sampler, live).split("\n") + [""])
+                next_frame += interval
+                time.sleep(max(0, next_frame - time.perf_counter()))
+                sample = sampler.sample()
         except KeyboardInterrupt:
             aprint("Status reading stopped.")
             raise SRExit()
     
+    def __format_status_table(self, sample: GameStatusSample, sampler: GameStatusSampler, live: bool):
+        titles = ["Title", "HSR Real-time Status"] + (["History (min / avg / max)"] if live else [])
+        headers = [Printer.to_lightblue(title) for title in titles]
+        
+        data_dict = {
+            "Status"            : bool_to_str(sample != None),
+            "Process ID"        : "N/A",
+            "Started On"        : "N/A",
+            "CPU Percent"       : "N/A",
+            "CPU Affinity"      : "N/A",
+            "Threads"           : "N/A",
+            "IO Operations"     : "N/A",
+            "RAM Usage"         : "N/A"
+        }
+        history_dict = dict()
+        
+        format_cpu = lambda value: f"{round(value, 1)}%"
+        format_rss = lambda value: f"{round(value/1000000000, 4)} GB"
+        
+        if sample != None: # Is running
+            data_dict["Process ID"]      = sample.pid
+            data_dict["Started On"]      = DatetimeHandler.epoch_to_time_str(sample.create_time)
+            data_dict["Threads"]         = sample.num_threads
+            data_dict["RAM Usage"]       = format_rss(sample.rss)
+            if sample.cpu_percent != None:
+                data_dict["CPU Percent"] = format_cpu(sample.cpu_percent)
+            if sample.cpu_affinity != None:
+                data_dict["CPU Affinity"] = ",".join([str(e) for e in sample.cpu_affinity])
+            if sample.write_count != None:
+                data_dict["IO Operations"] = f"Writes: {sample.write_count}, Reads: {sample.read_count}"
+            
+            history_dict["CPU Percent"]  = self.__format_status_history(sampler, "cpu_percent", format_cpu)
+            history_dict["Threads"]      = self.__format_status_history(sampler, "num_threads", str)
+            history_dict["RAM Usage"]    = self.__format_status_history(sampler, "rss", format_rss)
+        
+        data_list = [[Printer.to_lightpurple(k), v] + ([history_dict.get(k, "")] if live else []) for k, v in data_dict.items()]
+        return tabulate.tabulate(data_list, headers=headers)
+    
+    def __format_status_history(self, sampler: GameStatusSampler, metric, format_value):
+        stats = sampler.get_stats(metric)
+        if stats == None:
+            return ""
+        min_value, avg_value, max_value = stats
+        return f"{sampler.get_sparkline(metric, 20):<20} {format_value(min_value)} / {format_value(avg_value)} / {format_value(max_value)}"
+    
             
     def show_config(self):
         # print(Printer.to_lightpurple("\n - Game Configuration Table -"))
@@ -175,15 +193,13 @@ class HonkaiStarRail:
 
     def show_pulls(self):
         aprint("Showing the pull history page...", end="\r")
-        cache_urls = self.webcache_controller.get_events_cache()
-        if cache_urls == None:
-            aprint("No pull history cache found locally.")
+        pull_url = self.webcache_controller.get_pull_url()
+        if pull_url == None:
+            aprint("No valid pull history cache found locally (open the pull history in game to refresh it).")
             return
         
-        for url in cache_urls:
-            webbrowser.open(url)
-            
-        aprint("All pages opened successfully.      ")
+        webbrowser.open(pull_url)
+        aprint("Pull history page opened successfully.")
         
     def verbose_play_time(self):
         sr_proc = self.get_starrail_process()
@@ -218,32 +234,37 @@ class HonkaiStarRail:
         else:
             self.__print_cached_urls(cache_urls)
 
-    def webcache_all(self):
-        e_cache_urls = self.webcache_controller.get_events_cache()
-        a_cache_urls = self.webcache_controller.get_announcements_cache()
+    def webcache_all(self, all_versions=False):
+        cache_urls = self.webcache_controller.get_all_webcache(all_versions)
 
-        if e_cache_urls == None or len(e_cache_urls) == 0 and \
-            a_cache_urls == None or len(a_cache_urls) == 0:
+        if cache_urls == None or all(len(urls) == 0 for urls in cache_urls.values()):
             aprint("No available webcache found.")
             return
         else:
             print("")
 
-        new_line = False
-        if e_cache_urls != None:
-            new_line = True
-            print(Printer.to_lightblue(" - Events/Pulls Web Cache -"))
-            self.__print_cached_urls(e_cache_urls)
+        print(Printer.to_lightblue(" - Events/Pulls Web Cache -"))
+        self.__print_cached_urls(cache_urls[StarRailWebCacheURLCategory.EVENTS])
+        
+        print("")
+        print(Printer.to_lightblue(" - Announcements Web Cache -"))
+        self.__print_cached_urls(cache_urls[StarRailWebCacheURLCategory.ANNOUNCEMENTS])
         
-        if a_cache_urls != None:
-            if new_line:
-                print("")
-            print(Printer.to_lightblue(" - Announcements Web Cache -"))
-            self.__print_cached_urls(a_cache_urls)
+        if len(cache_urls[StarRailWebCacheURLCategory.GACHA_LOG]) > 0:
+            print("")
+            print(Printer.to_lightblue(" - Gacha Log Web Cache -"))
+            self.__print_cached_urls(cache_urls[StarRailWebCacheURLCategory.GACHA_LOG])
+    
+    def reset_webcache(self):
+        if self.webcache_controller.reset_webcache_state():
+            aprint("Web cache scan state cleared, rescanning the whole web cache...")
     
     def __print_cached_urls(self, url_list):
         for idx, url in enumerate(url_list):
-            print(f"[{Printer.to_lightpurple(f'URL {idx+1}')}] " + url)
+            cached_time = ""
+            if url in self.webcache_controller.url_timestamps:
+                cached_time = Printer.to_lightgrey(f"({DatetimeHandler.epoch_to_time_str(self.webcache_controller.url_timestamps[url])}) ")
+            print(f"[{Printer.to_lightpurple(f'URL {idx+1}')}] {cached_time}" + url)
 
 
     # =================================================
@@ -255,11 +276,9 @@ class HonkaiStarRail:
         
         headers = [Printer.to_lightblue(title) for title in ["Title", "Details (binary)"]]
         
-        sa_binary_dict = self.streaming_assets_controller.get_sa_binary_version()
-        sa_client_dict = self.streaming_assets_controller.get_sa_client_config()
-        sa_dev_dict = self.streaming_assets_controller.get_sa_dev_config()
+        sa_records = self.streaming_assets_controller.get_all()
         
-        master_dict = merge_dicts(sa_binary_dict, sa_client_dict, sa_dev_dict)
+        master_dict = merge_dicts(*[sa_record.to_dict() for sa_record in sa_records.values() if sa_record != None])
         
         if len(master_dict) > 0:
             master_list = [[Printer.to_lightpurple(title), "\n".join(data) if isinstance(data, list) else data] for title, data in master_dict.items() if title != "Other"]
@@ -308,50 +327,32 @@ class HonkaiStarRail:
     # =============================================
     
     def wait_to_start(self, timeout = 30) -> bool:
-        starting_time = time.time()
-        while time.time() - starting_time < timeout:
-            if self.is_running():
-                return True
-            time.sleep(0.5)
-        return False
+        return self.get_process_watcher().wait_for_start(timeout)
+    
+    def get_process_watcher(self) -> GameProcessWatcher:
+        # Started on first use, a single watcher thread is shared by every caller
+        self.process_watcher.start()
+        return self.process_watcher
 
     def is_running(self) -> bool:
         return self.get_starrail_process() != None
     
     def is_focused(self) -> bool:
+        # O(1) read of the watcher's cached state once it runs (the recorder keeps it polling fast)
+        if self.process_watcher.is_started():
+            return self.process_watcher.is_focused()
+        
         hsr_proc = self.get_starrail_process()
         if hsr_proc == None:
             return False
-        
-        focused_pid = ProcessHandler.get_focused_pid()
-        if hsr_proc.pid == focused_pid:
-            return True
-        return False
+        return hsr_proc.pid == self.focus_source.get_focused_pid()
     
     def get_starrail_process(self) -> psutil.Process:
-        EXE_BASENAME = os.path.basename(self.config.game_path)
-        
-        for p in psutil.process_iter(['pid', 'name', 'exe']):
-            # name == EXE_BASENAME is for optimization only (proceed only if filename is the same)
-            if p.info["name"] == EXE_BASENAME:
-
-                    try:
-                        starrail_proc = psutil.Process(p.info['pid'])
-                        if self.proc_is_starrail(starrail_proc):
-                            
-                            # If the cached PID isn't the current PID, reset it
-                            if self.config.instance_pid != starrail_proc.pid:
-                                self.config.instance_pid = starrail_proc.pid
-                                self.config.save_current_config()
-                            
-                            return starrail_proc
-                    
-                    except psutil.NoSuchProcess:
-                        continue
-        return None
+        # Cached by the tracker, only scans the running processes if the game was restarted
+        return self.process_tracker.get_process()
     
     def proc_is_starrail(self, starrail_proc: psutil.Process):
-        return starrail_proc.is_running() and Path(starrail_proc.exe()) == Path(self.config.game_path)
+        return self.process_tracker.is_game_process(starrail_proc)
 
 
 
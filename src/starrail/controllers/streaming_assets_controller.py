@@ -2,13 +2,16 @@ import os
 import re
 import sys
 from pathlib import Path
+from concurrent import futures
 
 from enum import Enum
 from starrail.config.config_handler import StarRailConfig
+from starrail.config.metadata_cache_handler import StarRailMetadataCache
 
 from starrail.utils.utils import aprint, Printer
 from starrail.constants import WEBCACHE_IGNORE_FILETYPES, GAME_FILE_PATH, GAME_FILE_PATH_NEW
 from starrail.utils.binary_decoder import StarRailBinaryDecoder
+from starrail.utils.binary_record_reader import StarRailBinaryRecordReader
 
 
 SUBMODULE_NAME = "SR-SAC"
@@ -20,23 +23,190 @@ class StarRailStreamingAssetsBinaryFile(Enum):
     SA_DevConfig        = "DevConfig.bytes"   
 
 
+# =============================================
+# ============| OUTPUT RECORDS | ==============
+# =============================================
+
+class StarRailBinaryVersion:
+    def __init__(self):
+        self.detailed_version: str  = None
+        self.version: str           = None
+        self.datetime_string: str   = None
+        self.other: list[str]       = []
+    
+    def to_dict(self):
+        return filter_record_dict({
+            "Detailed Version": self.detailed_version,
+            "Version":          self.version,
+            "Datetime String":  self.datetime_string,
+            "Other":            self.other
+        })
+    
+    @staticmethod
+    def from_dict(data_dict: dict):
+        record = StarRailBinaryVersion()
+        record.detailed_version = data_dict.get("Detailed Version")
+        record.version          = data_dict.get("Version")
+        record.datetime_string  = data_dict.get("Datetime String")
+        record.other            = data_dict.get("Other", [])
+        return record
+
+
+class StarRailClientConfig:
+    def __init__(self):
+        self.application_identifier: str    = None
+        self.service_endpoints: list[str]   = []
+        self.unknown: list[str]             = []
+    
+    def to_dict(self):
+        return filter_record_dict({
+            "Application Identifier":   self.application_identifier,
+            "Service Endpoints":        self.service_endpoints,
+            "Unknown":                  self.unknown
+        })
+    
+    @staticmethod
+    def from_dict(data_dict: dict):
+        record = StarRailClientConfig()
+        record.application_identifier   = data_dict.get("Application Identifier")
+        record.service_endpoints        = data_dict.get("Service Endpoints", [])
+        record.unknown                  = data_dict.get("Unknown", [])
+        return record
+
+
+class StarRailDevConfig:
+    def __init__(self):
+        self.engine_version: str    = None
+        self.unknown_version: str   = None
+        self.unknown: list[str]     = []
+    
+    def to_dict(self):
+        return filter_record_dict({
+            "Engine Version":   self.engine_version,
+            "Unknown Version":  self.unknown_version,
+            "Unknown":          self.unknown
+        })
+    
+    @staticmethod
+    def from_dict(data_dict: dict):
+        record = StarRailDevConfig()
+        record.engine_version   = data_dict.get("Engine Version")
+        record.unknown_version  = data_dict.get("Unknown Version")
+        record.unknown          = data_dict.get("Unknown", [])
+        return record
+
+
+def filter_record_dict(record_dict: dict):
+    # Drop the fields that weren't found
+    return {title: data for title, data in record_dict.items() if data != None and data != []}
+
+
+# Per file: record class, rules, attribute of the strings no rule matches.
+# Rules are (precompiled pattern, record attribute, keep only the matched part) and are checked in order, the
+# first rule whose pattern is found in the string wins. List attributes collect every match, the others
+# keep the last one.
+VERSION_PATTERN = re.compile("V[0-9]{1}.[0-9]{1}")
+
+SA_CLASSIFIERS = {
+    StarRailStreamingAssetsBinaryFile.SA_BinaryVersion: (StarRailBinaryVersion, [
+        (re.compile("PRODWin[0-9]{1}.[0-9]{1}.[0-9]{1}"),   "detailed_version",         False),
+        (VERSION_PATTERN,                                   "version",                  False),
+        (re.compile("[0-9]{8}-[0-9]{4}"),                   "datetime_string",          False),
+    ], "other"),
+    StarRailStreamingAssetsBinaryFile.SA_ClientConfig: (StarRailClientConfig, [
+        (re.compile("^com\\."),                             "application_identifier",   False),
+        (re.compile("https.*"),                             "service_endpoints",        True),
+    ], "unknown"),
+    StarRailStreamingAssetsBinaryFile.SA_DevConfig: (StarRailDevConfig, [
+        (re.compile("^(?=.*EngineRelease).*" + VERSION_PATTERN.pattern), "engine_version", False),
+        (VERSION_PATTERN,                                   "unknown_version",          False),
+    ], "unknown"),
+}
+
+
+# Fields read by the structured reader are exact, so they are classified with plain string checks instead.
+# Per file: record class, rules of (predicate, record attribute) checked in order, attribute of the other fields.
+def is_detailed_version(field: str):
+    # PRODWin2.3.0...
+    return "PRODWin" in field
+
+def is_version(field: str):
+    # V2.3...
+    index = field.find("V")
+    while index >= 0:
+        if field[index+1:index+2].isdigit() and field[index+3:index+4].isdigit():
+            return True
+        index = field.find("V", index + 1)
+    return False
+
+def is_build_time(field: str):
+    # YYYYMMDD-HHMM
+    index = field.find("-", 8)
+    while index >= 0:
+        if field[index-8:index].isdigit() and len(field[index+1:index+5]) == 4 and field[index+1:index+5].isdigit():
+            return True
+        index = field.find("-", index + 1)
+    return False
+
+def is_application_identifier(field: str):
+    return field.startswith("com.")
+
+def is_endpoint(field: str):
+    return field.startswith("https://") or field.startswith("http://")
+
+SA_FIELD_CLASSIFIERS = {
+    StarRailStreamingAssetsBinaryFile.SA_BinaryVersion: (StarRailBinaryVersion, [
+        (is_detailed_version,       "detailed_version"),
+        (is_version,                "version"),
+        (is_build_time,             "datetime_string"),
+    ], "other"),
+    StarRailStreamingAssetsBinaryFile.SA_ClientConfig: (StarRailClientConfig, [
+        (is_application_identifier, "application_identifier"),
+        (is_endpoint,               "service_endpoints"),
+    ], "unknown"),
+}
+
+
 class StarRailStreamingAssetsController:
     def __init__(self, starrail_config: StarRailConfig):
         self.starrail_config = starrail_config
         self.binary_decoder = StarRailBinaryDecoder()
+        self.metadata_cache = StarRailMetadataCache()
         
     # =============================================
     # ============| DRIVER FUNCTIONS | ============
     # =============================================
     
     def get_decoded_streaming_assets(self, sa_binary_file: StarRailStreamingAssetsBinaryFile):
-        decoded_strings = self.decode_streaming_assets(sa_binary_file)
-        if decoded_strings == None:
-            return None
+        # The parsed records are memoized until the file changes (i.e. the game is patched)
+        file_path = self.get_streaming_assets_path(sa_binary_file)
+        record_class = SA_CLASSIFIERS[sa_binary_file][0]
+        
+        cached_dict = self.metadata_cache.load_metadata(file_path)
+        if cached_dict != None:
+            return record_class.from_dict(cached_dict)
         
-        filtered_dict = self.parse_webcache(decoded_strings, sa_binary_file)
-        return filtered_dict
+        # Structured read first, the string extractor only handles files that don't match the record layout
+        record = self.read_streaming_assets(sa_binary_file)
+        if record == None:
+            decoded_strings = self.decode_streaming_assets(sa_binary_file)
+            if decoded_strings == None:
+                return None
+            record = self.parse_streaming_assets(decoded_strings, sa_binary_file)
         
+        if record != None:
+            self.metadata_cache.save_metadata(file_path, record.to_dict())
+        return record
+    
+    def get_all(self):
+        """
+        Decode all streaming assets files concurrently.
+        
+        :return: dict of StarRailStreamingAssetsBinaryFile -> record (None for the files that couldn't be decoded)
+        """
+        sa_binary_files = list(StarRailStreamingAssetsBinaryFile)
+        with futures.ThreadPoolExecutor(max_workers=len(sa_binary_files)) as executor:
+            return dict(zip(sa_binary_files, executor.map(self.get_decoded_streaming_assets, sa_binary_files)))
 
     def get_sa_binary_version(self):
         return self.get_decoded_streaming_assets(StarRailStreamingAssetsBinaryFile.SA_BinaryVersion)
@@ -52,8 +222,38 @@ class StarRailStreamingAssetsController:
     # ==========| SUBDRIVER FUNCTIONS | ===========
     # =============================================
     
+    def read_streaming_assets(self, sa_binary_file: StarRailStreamingAssetsBinaryFile):
+        """
+        Deserialize the length-prefixed fields of a streaming assets file and classify them into its record.
+        
+        :return: the file's record, or None if the file has no structured reader or doesn't match the layout
+        """
+        if sa_binary_file not in SA_FIELD_CLASSIFIERS:
+            return None
+        
+        try:
+            with open(self.get_streaming_assets_path(sa_binary_file), "rb") as rf:
+                binary_content = rf.read()
+        except OSError:
+            # Missing or locked file, reported by the string extractor
+            return None
+        
+        fields = StarRailBinaryRecordReader(binary_content).read_fields()
+        if fields == None or len(fields) == 0:
+            return None
+        
+        record_class, rules, fallback_attribute = SA_FIELD_CLASSIFIERS[sa_binary_file]
+        record = record_class()
+        for _, field in fields:
+            attribute = next((rule_attribute for predicate, rule_attribute in rules if predicate(field)), fallback_attribute)
+            if isinstance(getattr(record, attribute), list):
+                getattr(record, attribute).append(field)
+            else:
+                setattr(record, attribute, field)
+        return record
+    
     def decode_streaming_assets(self, sa_binary_file: StarRailStreamingAssetsBinaryFile):
-        file_path = os.path.join(self.starrail_config.innr_path, "StarRail_Data", "StreamingAssets", sa_binary_file.value)
+        file_path = self.get_streaming_assets_path(sa_binary_file)
         if not os.path.isfile(file_path):
             aprint(Printer.to_lightred(f"Decoder cannot locate streaming assets file '{file_path}'."))
             return
@@ -61,84 +261,40 @@ class StarRailStreamingAssetsController:
         aprint(f"Decoding {Printer.to_lightgrey(file_path)} ...", submodule_name=SUBMODULE_NAME)
         
         try:
-            return self.binary_decoder.decode_raw_binary_file(file_path)
+            return [string for _, string in self.binary_decoder.decode_indexed_binary_file(file_path)]
         except PermissionError as ex:
             aprint(f"{Printer.to_lightred('Permission denied.')}")
         return None
     
     
-    def parse_webcache(self, decoded_strings, sa_binary_file: StarRailStreamingAssetsBinaryFile):
-        data_dict = dict()
-        
-        if sa_binary_file == StarRailStreamingAssetsBinaryFile.SA_BinaryVersion:
-            for string in decoded_strings:
-                string = string.strip()
-                
-                if re.search("PRODWin[0-9]{1}.[0-9]{1}.[0-9]{1}", string) != None:
-                    data_dict["Detailed Version"] = string
-                
-                elif re.search("V[0-9]{1}.[0-9]{1}", string) != None:
-                    data_dict["Version"] = string
-                
-                elif re.search("[0-9]{8}-[0-9]{4}", string) != None:
-                    data_dict["Datetime String"] = string
-                    
-                else:
-                    try:
-                        endpoints = data_dict["Other"]
-                        endpoints.append(string)
-                        data_dict["Other"] = endpoints
-                    except KeyError:
-                        data_dict["Other"] = [string]
+    def get_streaming_assets_path(self, sa_binary_file: StarRailStreamingAssetsBinaryFile):
+        return os.path.join(self.starrail_config.innr_path, "StarRail_Data", "StreamingAssets", sa_binary_file.value)
+    
+    def parse_streaming_assets(self, decoded_strings, sa_binary_file: StarRailStreamingAssetsBinaryFile):
+        """
+        Classify the decoded strings of a streaming assets file into its record in a single pass.
         
+        :return: StarRailBinaryVersion, StarRailClientConfig or StarRailDevConfig, or None if no strings were decoded
+        """
+        if len(decoded_strings) == 0:
+            return None
         
-        if sa_binary_file == StarRailStreamingAssetsBinaryFile.SA_ClientConfig:
-            for string in decoded_strings:
-                string = string.strip()
-                
-                match = re.search("https.*", string)
-                if string.startswith("com."):
-                    data_dict["Application Identifier"] = string
-                
-                
-                elif match != None:
-                    try:
-                        endpoints = data_dict["Server Endpoints"]
-                        endpoints.append(match.group(0))
-                        data_dict["Service Endpoints"] = endpoints
-                    except KeyError:
-                        data_dict["Service Endpoints"] = [match.group(0)]
-                
-                else:
-                    try:
-                        endpoints = data_dict["Unknown"]
-                        endpoints.append(string)
-                        data_dict["Unknown"] = endpoints
-                    except KeyError:
-                        data_dict["Unknown"] = [string]  
-                        
-
-        if sa_binary_file == StarRailStreamingAssetsBinaryFile.SA_DevConfig:
-            for string in decoded_strings:
-                string = string.strip()
-                
-                if re.search("V[0-9]{1}.[0-9]{1}", string) != None:
-                    
-                    if "EngineRelease" in string:
-                        data_dict["Engine Version"] = string
-                    else:
-                        data_dict["Unknown Version"] = string
-                
-                else:
-                    try:
-                        endpoints = data_dict["Unknown"]
-                        endpoints.append(string)
-                        data_dict["Unknown"] = endpoints
-                    except KeyError:
-                        data_dict["Unknown"] = [string]
+        record_class, rules, fallback_attribute = SA_CLASSIFIERS[sa_binary_file]
+        record = record_class()
         
+        for string in decoded_strings:
+            string = string.strip()
+            attribute, value = fallback_attribute, string
+            
+            for pattern, rule_attribute, keep_match in rules:
+                match = pattern.search(string)
+                if match != None:
+                    attribute, value = rule_attribute, (match.group(0) if keep_match else string)
+                    break
+            
+            if isinstance(getattr(record, attribute), list):
+                getattr(record, attribute).append(value)
+            else:
+                setattr(record, attribute, value)
         
-        if len(data_dict) > 0:
-            return data_dict
-        return None
-    
\ No newline at end of file
+        return record
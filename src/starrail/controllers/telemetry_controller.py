@@ -0,0 +1,136 @@
+import os
+import glob
+import time
+import tabulate
+from datetime import datetime
+
+from starrail.utils.utils import *
+from starrail.utils.status_sampler import GameStatusSampler
+from starrail.utils.telemetry_store import TelemetryWriter, TelemetryReader
+from starrail.exceptions.exceptions import StarRailTelemetryFormatException
+from starrail.controllers.star_rail_app import HonkaiStarRail
+
+SUBMODULE_NAME = "SR-TC"
+TELEMETRY_EXTENSION = ".srtm"
+
+
+class StarRailTelemetryController:
+    def __init__(self, starrail_instance: HonkaiStarRail):
+        self.starrail = starrail_instance
+        self.telemetry_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "telemetry")
+    
+    def verbose_general_usage(self):
+        headers = [Printer.to_lightpurple(title) for title in ["Example Command", "Description"]]
+        data = [
+            [color_cmd("monitor record"),               "Record the game's CPU, RAM, IO and thread counts until the game stops"],
+            [color_cmd("monitor record -i 5 -d 3600"),  "Record a sample every 5 seconds for an hour"],
+            [color_cmd("monitor report"),               "Show the percentiles of the last recording"],
+            [color_cmd("monitor report --csv out.csv"), "Also export the last recording as CSV"],
+        ]
+        print("\n" + tabulate.tabulate(data, headers) + "\n")
+    
+    
+    # =============================================
+    # ============| DRIVER FUNCTIONS | ============
+    # =============================================
+    
+    def record(self, interval=1, duration=None, file_path=None):
+        watcher = self.starrail.get_process_watcher()
+        if watcher.pid == None:
+            aprint("Waiting for Honkai: Star Rail to start...", submodule_name=SUBMODULE_NAME)
+            watcher.wait_for_start()
+        
+        if file_path == None:
+            file_path = os.path.join(self.telemetry_dir, datetime.now().strftime("%Y%m%d_%H%M%S") + TELEMETRY_EXTENSION)
+        
+        sampler = GameStatusSampler(self.starrail.process_tracker, history_size=1)
+        try:
+            writer = TelemetryWriter(file_path, interval, time.time())
+        except StarRailTelemetryFormatException as ex:
+            aprint(Printer.to_lightred(str(ex).strip()), submodule_name=SUBMODULE_NAME)
+            raise SRExit()
+        
+        aprint(f"Recording telemetry every {interval}s to {Printer.to_lightgrey(file_path)} (Ctrl+C to stop)...", submodule_name=SUBMODULE_NAME)
+        try:
+            # Absolute deadlines, the sampling time doesn't shift the next samples
+            start_time = next_sample_time = time.perf_counter()
+            while duration == None or time.perf_counter() - start_time < duration:
+                sample = sampler.sample()
+                if sample == None:
+                    aprint("Honkai: Star Rail has stopped.", submodule_name=SUBMODULE_NAME)
+                    break
+                
+                writer.append(sample)
+                aprint(f"{writer.records} samples recorded", end="\r", submodule_name=SUBMODULE_NAME)
+                next_sample_time += interval
+                time.sleep(max(0, next_sample_time - time.perf_counter()))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            writer.close()
+        
+        aprint(f"Recorded {writer.records} samples to {Printer.to_lightgrey(file_path)}.", submodule_name=SUBMODULE_NAME)
+    
+    def report(self, file_path=None, csv_path=None):
+        file_path = file_path if file_path != None else self.get_latest_recording()
+        if file_path == None or not os.path.isfile(file_path):
+            aprint(f"No telemetry recording found ({color_cmd('starrail monitor record', True)} to record one).", submodule_name=SUBMODULE_NAME)
+            return
+        
+        try:
+            reader = TelemetryReader(file_path)
+        except StarRailTelemetryFormatException as ex:
+            aprint(Printer.to_lightred(str(ex).strip()), submodule_name=SUBMODULE_NAME)
+            raise SRExit()
+        
+        try:
+            if len(reader) == 0:
+                aprint(f"No samples recorded in {Printer.to_lightgrey(file_path)}.", submodule_name=SUBMODULE_NAME)
+                return
+            
+            first_time, last_time = reader.get_record(0)[0], reader.get_record(len(reader) - 1)[0]
+            aprint(f"{len(reader)} samples over {DatetimeHandler.seconds_to_time_str(int(last_time - first_time))} "
+                   f"(from {DatetimeHandler.epoch_to_time_str(first_time)}, every {reader.interval}s) in {Printer.to_lightgrey(file_path)}", submodule_name=SUBMODULE_NAME)
+            
+            print("\n" + self.__format_report_table(reader) + "\n")
+            
+            if csv_path != None:
+                record_count = reader.export_csv(csv_path)
+                aprint(f"Exported {record_count} samples to {Printer.to_lightgrey(os.path.abspath(csv_path))}.", submodule_name=SUBMODULE_NAME)
+        finally:
+            reader.close()
+    
+    def get_latest_recording(self):
+        recordings = glob.glob(os.path.join(self.telemetry_dir, "*" + TELEMETRY_EXTENSION))
+        return max(recordings, key=os.path.getmtime) if len(recordings) > 0 else None
+    
+    
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+    
+    def __format_report_table(self, reader: TelemetryReader):
+        titles = ["Metric", "Min", "Mean", "P50", "P90", "P99", "Max"]
+        headers = [Printer.to_lightblue(title) for title in titles]
+        
+        format_float = lambda value: f"{round(value, 1)}"
+        format_gb    = lambda value: f"{round(value/1000000000, 4)} GB"
+        format_mb    = lambda value: f"{round(value/1000000, 3)} MB/s"
+        metrics = [
+            ("CPU Percent",     lambda: reader.iter_column("cpu_percent"),  lambda value: f"{round(value, 1)}%"),
+            ("RAM Usage",       lambda: reader.iter_column("rss"),          format_gb),
+            ("Threads",         lambda: reader.iter_column("num_threads"),  lambda value: f"{round(value)}"),
+            ("Reads/s",         lambda: reader.iter_rate("read_count"),     format_float),
+            ("Writes/s",        lambda: reader.iter_rate("write_count"),    format_float),
+            ("Read Bytes/s",    lambda: reader.iter_rate("read_bytes"),     format_mb),
+            ("Write Bytes/s",   lambda: reader.iter_rate("write_bytes"),    format_mb),
+        ]
+        
+        data = []
+        for title, values_factory, format_value in metrics:
+            stats = reader.get_stats(values_factory)
+            if stats == None:
+                data.append([Printer.to_lightpurple(title)] + ["N/A"] * (len(titles) - 1))
+            else:
+                data.append([Printer.to_lightpurple(title)] + [format_value(stats[key]) for key in ("min", "mean", "p50", "p90", "p99", "max")])
+        return tabulate.tabulate(data, headers=headers)
@@ -3,14 +3,20 @@ import os
 import re
 import sys
 import shutil
+from typing import Dict, List
+from concurrent import futures
 from pathlib import Path
 
 from enum import Enum
 from starrail.config.config_handler import StarRailConfig
+from starrail.config.webcache_state_handler import StarRailWebCacheState
 
-from starrail.utils.utils import aprint, Printer
-from starrail.constants import WEBCACHE_IGNORE_FILETYPES
-from starrail.utils.binary_decoder import StarRailBinaryDecoder
+from starrail.utils.utils import aprint, Printer, HashCalculator
+from starrail.constants import WEBCACHE_IGNORE_FILETYPES, WEBCACHE_URL_CATEGORIES, WEBCACHE_SCAN_CHUNK_SIZE
+from starrail.utils.binary_decoder import StarRailBinaryDecoder, decode_binary_content, map_binary_file, is_printable
+from starrail.utils.chromium_cache_parser import ChromiumBlockfileCacheParser
+from starrail.utils.pull_url_store import StarRailPullURLStore
+from starrail.exceptions.exceptions import StarRailWebCacheFormatException
 
 
 SUBMODULE_NAME = "SR-WCC"
@@ -22,22 +28,81 @@ class StarRailWebCacheBinaryFile(Enum):
     WEBCACHE_DATA2 = "data_2"   # Events/Pulls
 
 
+class StarRailWebCacheURLCategory(Enum):
+    ANNOUNCEMENTS   = "announcements"
+    EVENTS          = "events"      # Events/Pulls
+    GACHA_LOG       = "gacha_log"
+
+
 class StarRailWebCacheController:
     def __init__(self, starrail_config: StarRailConfig):
         self.starrail_config = starrail_config
         self.binary_decoder = StarRailBinaryDecoder()
+        self.webcache_state = StarRailWebCacheState()
+        self.pull_url_store = StarRailPullURLStore()
+        self.url_timestamps: Dict[str, float] = dict()    # URL -> cache entry creation time (epoch), populated by the cache parser
+        self.url_classifier = self.__build_url_classifier()
+        self.ignored_file_types = tuple(WEBCACHE_IGNORE_FILETYPES)
         
     # =============================================
     # ============| DRIVER FUNCTIONS | ============
     # =============================================
     
     def get_decoded_webcache(self, webcache_binary_file: StarRailWebCacheBinaryFile):
-        decoded_strings = self.decode_webcache(webcache_binary_file)
+        # The cache index is parsed directly when possible (exact URLs), otherwise the strings are
+        # scanned out of the binary file itself.
+        cache_dir = self.get_webcache_dir()
+        if cache_dir == None:
+            return None
+        
+        decoded_strings = self.parse_webcache_entries(cache_dir)
+        if decoded_strings == None:
+            decoded_strings = self.decode_webcache_files([webcache_binary_file], cache_dir)
         if decoded_strings == None:
             return None
         
         filtered_urls = self.parse_webcache(decoded_strings, webcache_binary_file)
+        if webcache_binary_file == StarRailWebCacheBinaryFile.WEBCACHE_DATA2:
+            self.pull_url_store.record(filtered_urls, self.url_timestamps)
         return filtered_urls
+    
+    def get_all_webcache(self, all_versions=False):
+        """
+        Decode the whole web cache at once: the version directory is resolved once, and if the cache index
+        can't be parsed, all binary files are decoded concurrently.
+        
+        :param all_versions: decode the caches of all webCaches versions (in parallel) and merge them, to get
+                             the history spanning several game updates
+        :return: dict of StarRailWebCacheURLCategory -> list of URLs, or None if no web cache is available
+        """
+        cache_dirs = self.get_webcache_dirs() if all_versions else [self.get_webcache_dir()]
+        cache_dirs = [cache_dir for cache_dir in cache_dirs if cache_dir != None]
+        if len(cache_dirs) == 0:
+            return None
+        
+        with futures.ThreadPoolExecutor(max_workers=len(cache_dirs)) as executor:
+            decoded_results = [decoded_strings for decoded_strings in executor.map(self.__decode_cache_dir, cache_dirs) if decoded_strings != None]
+        if len(decoded_results) == 0:
+            return None
+        
+        # Oldest version first, so that the URLs stay in chronological order
+        decoded_strings = dict.fromkeys(string for decoded_strings in reversed(decoded_results) for string in decoded_strings)
+        classified_urls = self.classify_urls(list(decoded_strings))
+        # Only the event pages are opened as pull history, the getGachaLog API URLs aren't recorded
+        self.pull_url_store.record(classified_urls[StarRailWebCacheURLCategory.EVENTS], self.url_timestamps)
+        return classified_urls
+    
+    def get_pull_url(self):
+        """
+        Get the newest pull history URL whose authkey is still valid. It is answered from the pull URL store,
+        the web cache is only scanned if the store holds no valid URL.
+        
+        :return: URL, or None if no valid pull history URL is available
+        """
+        pull_url = self.pull_url_store.get_newest_valid_url()
+        if pull_url == None and self.get_events_cache() != None:
+            pull_url = self.pull_url_store.get_newest_valid_url()
+        return pull_url
         
     def get_announcements_cache(self):
         return self.get_decoded_webcache(StarRailWebCacheBinaryFile.WEBCACHE_DATA1)
@@ -45,70 +110,280 @@ class StarRailWebCacheController:
     def get_events_cache(self):
         return self.get_decoded_webcache(StarRailWebCacheBinaryFile.WEBCACHE_DATA2)
     
+    def reset_webcache_state(self):
+        # Forget the scan progress (and the URLs found so far) of all versions, the next scan starts over
+        reset_states = [self.webcache_state.reset_cache_state(cache_dir) for cache_dir in self.get_webcache_dirs()]
+        return any(reset_states)
+    
     
     # =============================================
     # ==========| SUBDRIVER FUNCTIONS | ===========
     # =============================================
 
+    def parse_webcache_entries(self, cache_dir=None):
+        """
+        Read the URLs (cache keys) of all entries straight from the Chromium cache index.
+        
+        Scans are incremental: the entries parsed by previous runs are skipped and only the new ones are
+        read, then merged into the persisted URL set (which keeps URLs of entries evicted since).
+        
+        :return: list of URLs ordered by creation time, or None if the cache can't be parsed
+        """
+        if cache_dir == None:
+            cache_dir = self.get_webcache_dir()
+        if cache_dir == None:
+            return None
+        
+        cache_state = self.webcache_state.load_cache_state(cache_dir)
+        known_entries = {int(address): creation_time for address, creation_time in cache_state["entries"].items()}
+        
+        cache_parser = ChromiumBlockfileCacheParser(cache_dir)
+        try:
+            new_entries = cache_parser.parse(known_entries)
+        except (StarRailWebCacheFormatException, PermissionError):
+            # Unknown format or locked cache, left to the binary decoder (which reports the lock)
+            return None
+        
+        # Entries that are no longer in the cache are dropped from the scanned set, their URLs are kept
+        scanned_entries = {str(address): known_entries[address] for address in cache_parser.known_addresses}
+        for entry in new_entries:
+            scanned_entries[str(entry.address)] = entry.creation_time
+            cache_state["urls"][entry.url] = entry.creation_time
+        
+        if len(new_entries) > 0 or len(scanned_entries) != len(cache_state["entries"]):
+            cache_state["entries"] = scanned_entries
+            self.webcache_state.save_cache_state(cache_dir, cache_state)
+        
+        self.url_timestamps.update(cache_state["urls"])
+        return sorted(cache_state["urls"], key=lambda url: cache_state["urls"][url])
+    
     def decode_webcache(self, webcache_binary_file: StarRailWebCacheBinaryFile):
-
-        # Get webCache path (varying webcache versioning)
-        def get_webcache_path():
-            webcache_path = ""
-            webcache_semi_path = Path(os.path.join(self.starrail_config.innr_path, "StarRail_Data", "webCaches"))
-            
-            try:
-                version_dirs = [d for d in webcache_semi_path.iterdir() if d.is_dir()]
-                if len(version_dirs) > 0:
-                    version_dir = version_dirs[0]
-                    webcache_path = os.path.join(self.starrail_config.innr_path, "StarRail_Data", "webCaches", version_dir, "Cache", "Cache_Data", webcache_binary_file.value)
-                    return webcache_path
-                else:
-                    return None
-            except Exception as ex:
-                return None
-
-        file_path = get_webcache_path()
-        if file_path == None or not os.path.isfile(file_path):
+        return self.decode_webcache_files([webcache_binary_file])
+    
+    def decode_webcache_files(self, webcache_binary_files: List[StarRailWebCacheBinaryFile], cache_dir=None):
+        """
+        Scan the URL strings out of web cache binary files (concurrently, one thread per file).
+        
+        Scans are incremental: a file whose size and mtime haven't changed since the previous scan isn't
+        read, otherwise only the chunks whose content hash changed are decoded (block files rewrite freed
+        blocks in place, so new entries don't have to grow the file), and the URL strings found are merged
+        into the persisted ones.
+        
+        :return: list of URL strings of all files, or None if none of the files exist or the cache is locked
+        """
+        if cache_dir == None:
+            cache_dir = self.get_webcache_dir()
+        if cache_dir == None:
             return None
         
-        aprint(f"Decoding {webcache_binary_file.value} ({Printer.to_lightgrey(file_path)}) ...", submodule_name=SUBMODULE_NAME)
+        cache_state = self.webcache_state.load_cache_state(cache_dir)
+        file_states = cache_state["data_files"]
+        file_paths = [os.path.join(cache_dir, binary_file.value) for binary_file in webcache_binary_files]
+        
+        for binary_file, file_path in zip(webcache_binary_files, file_paths):
+            if os.path.isfile(file_path) and not self.__is_scanned(file_path, file_states.get(binary_file.value, dict())):
+                aprint(f"Decoding {binary_file.value} ({Printer.to_lightgrey(file_path)}) ...", submodule_name=SUBMODULE_NAME)
         
         try:
-            return self.binary_decoder.decode_raw_binary_file(file_path)
+            with futures.ThreadPoolExecutor(max_workers=len(webcache_binary_files)) as executor:
+                scanned_states = list(executor.map(
+                    self.__scan_webcache_file,
+                    file_paths,
+                    [file_states.get(binary_file.value, dict()) for binary_file in webcache_binary_files]
+                ))
         except PermissionError:
             aprint(f"{Printer.to_lightred('Web cache is LOCKED.')} Web cache is only available when the game is not running.", submodule_name=SUBMODULE_NAME)
-        return None
+            return None
+        
+        decoded_strings = []
+        state_changed = False
+        for binary_file, scanned_state in zip(webcache_binary_files, scanned_states):
+            if scanned_state == None:
+                continue
+            decoded_strings += scanned_state["strings"]
+            if scanned_state != file_states.get(binary_file.value):
+                file_states[binary_file.value] = scanned_state
+                state_changed = True
+        
+        if state_changed:
+            self.webcache_state.save_cache_state(cache_dir, cache_state)
+        
+        if all(scanned_state == None for scanned_state in scanned_states):
+            return None
+        return list(dict.fromkeys(decoded_strings))
     
     
     def parse_webcache(self, decoded_strings, webcache_file: StarRailWebCacheBinaryFile):
         if webcache_file == StarRailWebCacheBinaryFile.WEBCACHE_DATA0:
             pass
         if webcache_file == StarRailWebCacheBinaryFile.WEBCACHE_DATA1:
-            return self.filter_urls("webstatic.mihoyo.com/hkrpg/announcement", decoded_strings)
+            return self.classify_urls(decoded_strings)[StarRailWebCacheURLCategory.ANNOUNCEMENTS]
         if webcache_file == StarRailWebCacheBinaryFile.WEBCACHE_DATA2:
-            return self.filter_urls("webstatic.mihoyo.com/hkrpg/event", decoded_strings)
+            return self.classify_urls(decoded_strings)[StarRailWebCacheURLCategory.EVENTS]
         return None
     
+    def classify_urls(self, decoded_strings):
+        """
+        Sort the URLs found in the decoded strings into their categories in a single sweep.
+        
+        Gives the same URLs as filtering the strings once per category did: a string belongs to every
+        category whose sequence it contains (anywhere in the string) unless it ends with an ignored file
+        type, and its URL is the span from its first "https" to its end.
+        
+        :return: dict of StarRailWebCacheURLCategory -> list of URLs
+        """
+        classified_urls = {category: [] for category in StarRailWebCacheURLCategory}
+        for string in decoded_strings:
+            string = string.strip()
+            categories = {match.lastgroup for match in self.url_classifier.finditer(string)}
+            if len(categories) == 0 or string.endswith(self.ignored_file_types):
+                continue
+            
+            url_match = re.search("https.*", string)
+            if url_match == None:
+                continue
+            for category in StarRailWebCacheURLCategory:
+                if category.name in categories:
+                    classified_urls[category].append(url_match.group(0))
+        return classified_urls
+    
     # =============================================
     # ============| HELPER FUNCTIONS | ============
     # =============================================
     
-    def filter_urls(self, target_sequence: str, decoded_strings):
-        # Filter out URLs without the target sequence and end with the ignoring file types
-        filtered_urls = []
-        for url in decoded_strings:
-            url = url.strip()
-            if target_sequence in url and not self.should_ignore(url):
-                match = re.search("https.*", url)
-                if match != None:
-                    filtered_urls.append(match.group(0)) 
-        return filtered_urls
+    def get_webcache_dir(self):
+        """
+        Resolve the cache directory of the newest webCaches version. The resolved version directory is
+        memoized in the config and reused until the webCaches directory changes (its mtime changes when a
+        version directory is added or removed).
+        """
+        webcache_root = self.get_webcache_root()
+        if webcache_root == None:
+            return None
+        
+        try:
+            webcache_mtime_ns = os.stat(webcache_root).st_mtime_ns
+        except OSError:
+            return None
+        
+        version_dir = self.starrail_config.webcache_dir
+        if version_dir != None and self.starrail_config.webcache_mtime_ns == webcache_mtime_ns \
+            and os.path.dirname(version_dir) == webcache_root and os.path.isdir(version_dir):
+            return os.path.join(version_dir, "Cache", "Cache_Data")
+        
+        version_dirs = self.get_webcache_version_dirs(webcache_root)
+        if len(version_dirs) == 0:
+            return None
+        
+        self.starrail_config.webcache_dir = version_dirs[0]
+        self.starrail_config.webcache_mtime_ns = webcache_mtime_ns
+        self.starrail_config.save_current_config()
+        return os.path.join(version_dirs[0], "Cache", "Cache_Data")
+    
+    def get_webcache_dirs(self):
+        # Cache directories of all webCaches versions, newest first
+        webcache_root = self.get_webcache_root()
+        if webcache_root == None:
+            return []
+        return [os.path.join(version_dir, "Cache", "Cache_Data") for version_dir in self.get_webcache_version_dirs(webcache_root)]
+    
+    def get_webcache_root(self):
+        if self.starrail_config.innr_path == None:
+            return None
+        return os.path.join(self.starrail_config.innr_path, "StarRail_Data", "webCaches")
+    
+    def get_webcache_version_dirs(self, webcache_root):
+        # Version directories (webCaches/<version>) holding a cache, newest first: ordered by parsed version
+        # number (names that aren't version numbers come last), then by modification time
+        version_dirs = []
+        try:
+            with os.scandir(webcache_root) as entries:
+                for entry in entries:
+                    if entry.is_dir() and os.path.isdir(os.path.join(entry.path, "Cache", "Cache_Data")):
+                        version_dirs.append((self.__parse_version(entry.name), entry.stat().st_mtime_ns, entry.path))
+        except OSError:
+            return []
+        
+        return [version_dir for _, _, version_dir in sorted(version_dirs, reverse=True)]
+    
+    def __decode_cache_dir(self, cache_dir):
+        # The cache index is parsed directly when possible, otherwise the strings are scanned out of the binary files
+        decoded_strings = self.parse_webcache_entries(cache_dir)
+        if decoded_strings == None:
+            decoded_strings = self.decode_webcache_files(list(StarRailWebCacheBinaryFile), cache_dir)
+        return decoded_strings
+    
+    def __scan_webcache_file(self, file_path, file_state: dict):
+        # Worker of decode_webcache_files(), returns the file's new scan state (None if the file doesn't exist).
+        # The file is mapped and hashed chunk by chunk (hashlib releases the GIL, so the reads of all the
+        # files overlap), then only the chunks that changed are decoded.
+        if not os.path.isfile(file_path):
+            return None
+        if self.__is_scanned(file_path, file_state):
+            return file_state
+        
+        stat = os.stat(file_path)
+        scanned_chunks = file_state.get("chunks", [])
+        scanned_strings = file_state.get("strings", [])
+        if stat.st_size < file_state.get("size", 0):
+            # The cache has been cleared or recreated since the last scan
+            scanned_chunks, scanned_strings = [], []
+        
+        chunk_size = WEBCACHE_SCAN_CHUNK_SIZE * 1024
+        known_strings = set(scanned_strings)
+        new_strings = []
+        with open(file_path, "rb") as rf:
+            binary_content = map_binary_file(rf)
+            if binary_content == None:
+                return {"size": 0, "mtime_ns": stat.st_mtime_ns, "chunks": [], "strings": scanned_strings}
+            
+            with binary_content:
+                chunks = HashCalculator.chunk_fingerprints(binary_content, chunk_size)
+                for range_start, range_end in self.__get_changed_ranges(chunks, scanned_chunks, chunk_size):
+                    # Back up to the start of the string crossing into the range (if any), its tail may have changed
+                    while range_start > 0 and is_printable(binary_content[range_start - 1]):
+                        range_start -= 1
+                    
+                    for offset, string in decode_binary_content(binary_content, start=range_start):
+                        if offset >= range_end:
+                            break
+                        if "http" in string and string not in known_strings:
+                            known_strings.add(string)
+                            new_strings.append(string)
+        
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunks": chunks, "strings": scanned_strings + new_strings}
+    
+    def __get_changed_ranges(self, chunks, scanned_chunks, chunk_size):
+        # Byte ranges [start, end) covering the chunks whose hash differs from the previous scan, adjacent chunks merged
+        changed_ranges = []
+        for idx, chunk in enumerate(chunks):
+            if idx < len(scanned_chunks) and scanned_chunks[idx] == chunk:
+                continue
+            if len(changed_ranges) > 0 and changed_ranges[-1][1] == idx * chunk_size:
+                changed_ranges[-1][1] = (idx + 1) * chunk_size
+            else:
+                changed_ranges.append([idx * chunk_size, (idx + 1) * chunk_size])
+        return changed_ranges
+    
+    def __is_scanned(self, file_path, file_state: dict):
+        # The file hasn't changed since the scan recorded in file_state (older states without chunks are rescanned)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return "chunks" in file_state and stat.st_size == file_state.get("size") and stat.st_mtime_ns == file_state.get("mtime_ns")
     
+    def __parse_version(self, version_name):
+        # "2.3.0.0" -> (1, (2, 3, 0, 0)), anything else -> (0, ())
+        if re.fullmatch(r"\d+(\.\d+)*", version_name) == None:
+            return (0, ())
+        return (1, tuple(int(part) for part in version_name.split(".")))
     
-    def should_ignore(self, url: str):
-        # Should ignore current URL because of its file type
-        for ignoring_file_type in WEBCACHE_IGNORE_FILETYPES:
-            if url.endswith(ignoring_file_type):
-                return True
-        return False
\ No newline at end of file
+    def __build_url_classifier(self):
+        # One regex for all categories: each category sequence is a named group, so the group that
+        # matched gives the category
+        category_patterns = "|".join(
+            f"(?P<{category.name}>{re.escape(WEBCACHE_URL_CATEGORIES[category.value])})"
+            for category in StarRailWebCacheURLCategory
+        )
+        return re.compile(category_patterns)
@@ -15,6 +15,7 @@ from starrail.exceptions.exceptions import SRExit, StarRailBaseException
 from starrail.controllers.star_rail_app import HonkaiStarRail
 from starrail.controllers.web_controller import StarRailWebController
 from starrail.controllers.automation_controller import StarRailAutomationController
+from starrail.controllers.telemetry_controller import StarRailTelemetryController
 from starrail.controllers.c_click_controller import ContinuousClickController
 
 from starrail.bin.loader.loader import Loader
@@ -27,6 +28,7 @@ class StarRailEntryPointHandler:
         self.web_controller         = StarRailWebController()
         self.scheduler              = StarRailScheduler(self.star_rail) # Only the start/stop is used from the starrail instance
         self.automation_controller  = StarRailAutomationController(self.star_rail)
+        self.telemetry_controller   = StarRailTelemetryController(self.star_rail)
     
     
     # ================================================
@@ -69,7 +71,7 @@ class StarRailEntryPointHandler:
     # =================================================
     
     def show_status(self, args):
-        self.star_rail.show_status(args.live)
+        self.star_rail.show_status(args.live, args.interval)
     
     def show_config(self, args):
         self.star_rail.show_config()
@@ -78,7 +80,19 @@ class StarRailEntryPointHandler:
         self.star_rail.streaming_assets()
     
     def play_time(self, args):
-        self.star_rail.verbose_play_time()    
+        self.star_rail.verbose_play_time()
+    
+    def monitor(self, args):
+        if args.action == "record":
+            self.telemetry_controller.record(args.interval, args.duration, args.file)
+        
+        elif args.action == "report":
+            self.telemetry_controller.report(args.file, args.csv)
+        
+        else:
+            if args.action != None:
+                aprint(Printer.to_lightred(f"Unknown monitor action: '{args.action}'"))
+            self.telemetry_controller.verbose_general_usage()
     
     # =================================================
     # ===============| LAUNCH DRIVER | ================
@@ -230,7 +244,7 @@ class StarRailEntryPointHandler:
 
     def decode(self, args):
         ascii_binary_decoder = StarRailBinaryDecoder()
-        ascii_binary_decoder.user_decode(args.path, args.min_length)
+        ascii_binary_decoder.user_decode(args.path, args.min_length, args.jobs, args.encoding)
 
     def pulls(self, args):
         self.star_rail.show_pulls()
@@ -239,12 +253,15 @@ class StarRailEntryPointHandler:
         if not args.quiet:
             print_webcache_explanation()
         
+        if args.rescan:
+            self.star_rail.reset_webcache()
+        
         if args.announcements:
             self.star_rail.webcache_announcements()
         elif args.events:
             self.star_rail.webcache_events()
         else:
-            self.star_rail.webcache_all()
+            self.star_rail.webcache_all(args.all_versions)
             
 
 
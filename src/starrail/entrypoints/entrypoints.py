@@ -87,6 +87,7 @@ def start_starrail():
     
     show_status = subparsers.add_parser('status', help='Show real-time game status (game process)', description='Show real-time game status (game process)')
     show_status.add_argument('--live', '-l', action='store_true', default=False, help='Show live game status (non-stop).')
+    show_status.add_argument('--interval', '-i', type=float, default=1, help='Seconds between two status samples (refresh rate of --live, default 1).')
     show_status.set_defaults(func=entrypoint_handler.show_status)
     parser.add_parser_to_group(game_info_group, show_status)
     
@@ -102,6 +103,15 @@ def start_starrail():
     pt_config.set_defaults(func=entrypoint_handler.play_time)
     parser.add_parser_to_group(game_info_group, pt_config)
 
+    monitor_parser = subparsers.add_parser('monitor', help='Record the game\'s performance over a session and report its percentiles', description='Record the game\'s performance over a session and report its percentiles')
+    monitor_parser.add_argument('action', nargs='?', default=None, help='record / report')
+    monitor_parser.add_argument('--interval', '-i', type=float, default=1, help='Seconds between two samples (record only, default 1).')
+    monitor_parser.add_argument('--duration', '-d', type=float, default=None, help='Seconds to record for (record only, default: until the game stops).')
+    monitor_parser.add_argument('--file', '-f', type=str, default=None, help='Telemetry file to record to or report on (default: a new file / the last recording).')
+    monitor_parser.add_argument('--csv', type=str, default=None, help='Also export the samples to this CSV file (report only).')
+    monitor_parser.set_defaults(func=entrypoint_handler.monitor)
+    parser.add_parser_to_group(game_info_group, monitor_parser)
+
 
     # =================================================
     # ===============| LAUNCH DRIVER | ================
@@ -185,9 +195,11 @@ def start_starrail():
     logs_config.set_defaults(func=entrypoint_handler.game_logs)
     parser.add_parser_to_group(utility_group, logs_config)
     
-    decode_config = subparsers.add_parser('decode', help='Decode ASCII-based binary files', description='Decode ASCII-based binary files')
+    decode_config = subparsers.add_parser('decode', help='Decode readable strings from binary files', description='Decode readable strings (ASCII, UTF-8, UTF-16) from binary files')
     decode_config.add_argument('--path', type=str, default=None, help='Path of the binary file to decode.')
     decode_config.add_argument('--min-length', type=int, default=8, help='Minimum ASCII length to be considered as a valid string.')
+    decode_config.add_argument('--jobs', '-j', type=int, default=1, help='Number of processes used to decode large files in parallel.')
+    decode_config.add_argument('--encoding', '-e', type=str, default='ascii', choices=['ascii', 'utf-8', 'utf-16le', 'utf-16be', 'all'], help='Encoding of the strings to extract (all = ASCII, UTF-8 and UTF-16LE/BE in a single pass).')
     decode_config.set_defaults(func=entrypoint_handler.decode)
     parser.add_parser_to_group(utility_group, decode_config)
     
@@ -200,6 +212,8 @@ def start_starrail():
     cache_announcement_config.add_argument('--events', '-e', action='store_true', default=False, help='Show cached events.')
     cache_announcement_config.add_argument('--quiet', '-q', action='store_true', default=False, help='Do not verbose web cache explanation.')
     cache_announcement_config.add_argument('--open', action='store_true', default=False, help='Open all web cache URLs found.')
+    cache_announcement_config.add_argument('--all-versions', action='store_true', default=False, help='Merge the web caches of all game versions found (history spanning several updates).')
+    cache_announcement_config.add_argument('--rescan', action='store_true', default=False, help='Forget the previously scanned cache entries and rescan the whole web cache.')
     cache_announcement_config.set_defaults(func=entrypoint_handler.webcache)
     parser.add_parser_to_group(utility_group, cache_announcement_config)
     
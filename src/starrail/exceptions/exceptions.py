@@ -49,3 +49,15 @@ class SRExit(Exception):
     __module__ = 'builtins'
     def __init__(self, message="Module internal exit requested (should be caught accordingly)."):
         super().__init__(message)
+
+
+class StarRailWebCacheFormatException(Exception):
+    __module__ = 'builtins'
+    def __init__(self, message):
+        super().__init__(f"\nThe web cache is not in a recognized Chromium disk cache format ({message}).")
+
+
+class StarRailTelemetryFormatException(Exception):
+    __module__ = 'builtins'
+    def __init__(self, message):
+        super().__init__(f"\nThe telemetry file is not in a recognized format ({message}).")
@@ -1,38 +1,400 @@
-
-
 import re
 import os
-import tabulate
+import mmap
+import unicodedata
+from enum import Enum
+from functools import lru_cache
+from concurrent import futures
+from starrail.constants import MIN_PARALLEL_DECODE_RANGE_SIZE
 from starrail.utils.utils import *
+from starrail.utils.string_index import StarRailStringIndex
 
 SUBMODULE_NAME = "SR-DB"
 
+
+class StarRailStringEncoding(Enum):
+    ASCII       = "ascii"
+    UTF8        = "utf-8"
+    UTF16LE     = "utf-16le"
+    UTF16BE     = "utf-16be"
+
+
+# One readable character per encoding (used by the multi-encoding extractor)
+# (well-formed UTF-8 only: no overlong forms, surrogates or code points past U+10FFFF)
+UTF8_CHAR       = (
+    rb'(?:[\x20-\x7e]|[\xc2-\xdf][\x80-\xbf]'
+    rb'|\xe0[\xa0-\xbf][\x80-\xbf]|[\xe1-\xec\xee\xef][\x80-\xbf]{2}|\xed[\x80-\x9f][\x80-\xbf]'
+    rb'|\xf0[\x90-\xbf][\x80-\xbf]{2}|[\xf1-\xf3][\x80-\xbf]{3}|\xf4[\x80-\x8f][\x80-\xbf]{2})'
+)
+# UTF-16 code units are either printable ASCII or CJK text (high byte in the CJK symbols/kana 0x30,
+# CJK ideographs 0x4E-0x9F or fullwidth forms 0xFF blocks; fullwidth forms stop at U+FFEF, which
+# keeps out U+FFFF and the other noncharacters). CJK units never have a NUL low byte, so an ASCII
+# unit of one byte order can't be mistaken for a CJK unit of the other.
+UTF16LE_CHAR    = rb'(?:[\x20-\x7e]\x00|[\x01-\xff][\x30\x4e-\x9f]|[\x01-\xef]\xff)'
+UTF16BE_CHAR    = rb'(?:\x00[\x20-\x7e]|[\x30\x4e-\x9f][\x01-\xff]|\xff[\x01-\xef])'
+
+# Minimum fraction of text-like characters for a non-ASCII string to be accepted (see text_score())
+MIN_TEXT_SCORE  = 0.8
+# Legacy CJK character sets, used as a list of the characters in common use (see is_common_cjk())
+COMMON_CJK_CODECS = ("gb2312", "shift_jis")
+
+
+def map_binary_file(file):
+    """
+    Memory-map an opened binary file for read-only scanning.
+
+    :param file: File object opened in 'rb' mode
+    :return: mmap of the file, or None if the file is empty (empty files cannot be mapped)
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        return None
+
+    binary_content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    # Hint the OS to drop pages behind the scan (not available on Windows)
+    if hasattr(binary_content, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        binary_content.madvise(mmap.MADV_SEQUENTIAL)
+    return binary_content
+
+
+def decode_byte_range(file_path, min_length, start, end):
+    """
+    Extract the readable strings (with their byte offsets) that START within [start, end) of a binary file.
+    
+    Worker function of the parallel decoder (module-level so it can be pickled into a process pool).
+    A string crossing `end` is read past the range until it terminates, while a string crossing `start`
+    is skipped since it is owned by the previous range. Concatenating the results of adjacent ranges
+    therefore gives exactly the serial result, with no duplicates at the seams.
+    """
+    pattern = re.compile(b'[ -~]{%d,}' % min_length)
+
+    with open(file_path, 'rb') as file:
+        binary_content = map_binary_file(file)
+        if binary_content == None:
+            return []
+
+        with binary_content:
+            start = find_string_boundary(binary_content, start)
+            if start == None:
+                return []
+
+            decoded_strings = []
+            for match in pattern.finditer(binary_content, start):
+                if match.start() >= end:
+                    break
+                decoded_strings.append((match.start(), match.group(0).decode('utf-8', errors='ignore')))
+            return decoded_strings
+
+
+def decode_binary_content(binary_content, min_length=8, start=0):
+    """
+    Extract the readable strings (with their byte offsets) starting at or after `start` from an in-memory
+    buffer (bytes or mmap).
+
+    :return: generator of (offset, string)
+    """
+    pattern = re.compile(b'[ -~]{%d,}' % min_length)
+
+    start = find_string_boundary(binary_content, start)
+    if start == None:
+        return
+    for match in pattern.finditer(binary_content, start):
+        yield match.start(), match.group(0).decode('utf-8', errors='ignore')
+
+
+def find_string_boundary(binary_content, start):
+    """
+    Move `start` past the string it falls into (if any), so that scanning from the returned position
+    only yields strings that START at or after `start`.
+
+    :return: the adjusted position, or None if the string runs to the end of the buffer
+    """
+    if start >= len(binary_content):
+        return None
+    if start > 0 and is_printable(binary_content[start-1]):
+        match = re.compile(b'[^ -~]').search(binary_content, start)
+        if match == None:
+            return None
+        start = match.start()
+    return start
+
+
+def is_printable(byte: int):
+    return 0x20 <= byte <= 0x7e
+
+
+@lru_cache(maxsize=None)
+def is_common_cjk(character: str):
+    for codec in COMMON_CJK_CODECS:
+        try:
+            character.encode(codec)
+            return True
+        except UnicodeEncodeError:
+            continue
+    return False
+
+
+def text_score(string: str):
+    """
+    Score how much a decoded string reads like text, as the fraction of its characters that are:
+        - ASCII letters, digits or spaces
+        - CJK characters in common use (in GB2312 or Shift JIS, which hold about half of the CJK
+          ideographs but nearly every character of real Chinese/Japanese text)
+        - Other letters, which must all be of the same script (e.g. all CYRILLIC), Latin letters
+          being limited to the Latin-1 Supplement and Latin Extended-A blocks of European alphabets
+          (ASCII letters don't count in a string of another script, e.g. a Cyrillic one)
+
+    Bytes that only happen to decode (random data, or CJK text read with the wrong byte alignment)
+    give a mix of rare ideographs, scripts and punctuation, and score well below real text.
+
+    :return: score between 0 and 1 (0 if the string has an unprintable character, or a non-ASCII,
+             non-CJK character that isn't a letter of the string's script)
+    """
+    if len(string) == 0 or not string.isprintable():
+        return 0
+
+    text_characters = 0
+    ascii_letters = 0
+    script = None
+    for character in string:
+        code_point = ord(character)
+        if character.isascii():
+            text_characters += character.isalnum() or character == " "
+            ascii_letters += character.isalpha()
+        elif 0x3000 <= code_point <= 0x9fff or 0xff01 <= code_point <= 0xffef:
+            text_characters += is_common_cjk(character)
+        else:
+            # Random bytes that decode as UTF-8 are mostly ASCII with a stray character of some unrelated
+            # block, a single one of which disqualifies the string
+            if unicodedata.category(character)[0] != "L":
+                return 0
+            character_script = unicodedata.name(character, "").split(" ")[0]
+            if character_script == "LATIN" and not 0xc0 <= code_point <= 0x17f:
+                return 0
+            script = character_script if script == None else script
+            if character_script != script:
+                return 0
+            text_characters += 1
+
+    if script not in (None, "LATIN"):
+        text_characters -= ascii_letters
+    return text_characters / len(string)
+
+
+def extract_multi_encoding_strings(binary_content, min_length=8):
+    """
+    Extract readable ASCII, UTF-8, UTF-16LE and UTF-16BE strings from a buffer in a single pass.
+
+    All encodings are matched by one combined pattern (UTF-8 first, which also covers ASCII), so the
+    buffer is only scanned once instead of once per encoding. Matches are checked before they are
+    accepted, since the same bytes can often be read more than one way:
+        - A UTF-16 run can also read as the other byte order starting one byte later (e.g. BE text
+          preceded by a non-NUL byte reads as LE text with its low bytes shifted by one). Both
+          readings are scored by their number of text characters (see text_score()) and the better
+          one is kept, UTF-16LE on a tie, LE being the byte order used on Windows.
+        - A UTF-16 run made mostly of ASCII-looking units is ASCII text, so its span is rescanned as UTF-8.
+        - A non-ASCII string that doesn't read like text (text_score() below MIN_TEXT_SCORE) is dropped
+          and only the ASCII strings in its span are kept, so random bytes don't come out as strings.
+
+    :param binary_content: bytes-like object (or mmap) to scan
+    :param min_length: Minimum length (in characters) of strings to extract
+    :return: generator of (offset, string, StarRailStringEncoding)
+    """
+    pattern = re.compile(rb'(?P<utf8>%s{%d,})|(?P<utf16le>%s{%d,})|(?P<utf16be>%s{%d,})' % (
+        UTF8_CHAR, min_length, UTF16LE_CHAR, min_length, UTF16BE_CHAR, min_length
+    ))
+    utf8_pattern = re.compile(rb'%s{%d,}' % (UTF8_CHAR, min_length))
+    utf16_patterns = {
+        StarRailStringEncoding.UTF16LE: re.compile(rb'%s{%d,}' % (UTF16LE_CHAR, min_length)),
+        StarRailStringEncoding.UTF16BE: re.compile(rb'%s{%d,}' % (UTF16BE_CHAR, min_length))
+    }
+    ascii_pattern = re.compile(b'[ -~]{%d,}' % min_length)
+
+    position = 0
+    while True:
+        match = pattern.search(binary_content, position)
+        if match == None:
+            return
+
+        if match.lastgroup == "utf8":
+            yield from read_utf8_string(match.group(0), match.start(), ascii_pattern)
+            position = match.end()
+            continue
+
+        # Score the match against the other byte order read from the next byte
+        encoding = StarRailStringEncoding(match.lastgroup.replace("utf16", "utf-16"))
+        other_encoding = StarRailStringEncoding.UTF16BE if encoding == StarRailStringEncoding.UTF16LE else StarRailStringEncoding.UTF16LE
+        readings = [(match.start(), match.group(0), encoding)]
+        other_match = utf16_patterns[other_encoding].match(binary_content, match.start() + 1)
+        if other_match != None:
+            readings.append((other_match.start(), other_match.group(0), other_encoding))
+
+        scored_readings = []
+        for offset, raw_string, string_encoding in readings:
+            string = raw_string.decode(string_encoding.value)
+            score = text_score(string) * len(string)
+            scored_readings.append((score, string.isascii(), string_encoding == StarRailStringEncoding.UTF16LE, offset, raw_string, string, string_encoding))
+        _, _, _, offset, raw_string, string, encoding = max(scored_readings, key=lambda reading: reading[:3])
+        span_end = offset + len(raw_string)
+
+        big_endian = encoding == StarRailStringEncoding.UTF16BE
+        high_bytes = raw_string[0::2] if big_endian else raw_string[1::2]
+        low_bytes  = raw_string[1::2] if big_endian else raw_string[0::2]
+        ascii_looking_units = sum(1 for high, low in zip(high_bytes, low_bytes) if is_printable(high) and is_printable(low))
+
+        if ascii_looking_units * 2 > len(high_bytes) or (not string.isascii() and text_score(string) < MIN_TEXT_SCORE):
+            position = match.start()
+            while True:
+                # A UTF-8 string starting in the span needs at most 4 bytes per character to reach min_length
+                utf8_match = utf8_pattern.search(binary_content, position, span_end + 4 * min_length)
+                if utf8_match == None or utf8_match.start() >= span_end:
+                    break
+                utf8_match = utf8_pattern.match(binary_content, utf8_match.start())
+                yield from read_utf8_string(utf8_match.group(0), utf8_match.start(), ascii_pattern)
+                position = utf8_match.end()
+            position = max(position, span_end)
+            continue
+
+        yield offset, string, encoding
+        position = span_end
+
+
+def read_utf8_string(raw_string, offset, ascii_pattern):
+    """
+    Decode a matched UTF-8 run. A non-ASCII run that doesn't read like text only yields the ASCII
+    strings within it (the ones the ASCII decoder would have found).
+
+    :return: generator of (offset, string, StarRailStringEncoding)
+    """
+    if raw_string.isascii():
+        yield offset, raw_string.decode("utf-8"), StarRailStringEncoding.ASCII
+        return
+
+    string = raw_string.decode("utf-8")
+    if text_score(string) >= MIN_TEXT_SCORE:
+        yield offset, string, StarRailStringEncoding.UTF8
+        return
+    for ascii_match in ascii_pattern.finditer(raw_string):
+        yield offset + ascii_match.start(), ascii_match.group(0).decode("utf-8"), StarRailStringEncoding.ASCII
+
+
 class StarRailBinaryDecoder:
     def __init__(self):
         self.decoded_count = 0
-    
-    def decode_raw_binary_file(self, file_path, min_length=8):
+        self.string_index = StarRailStringIndex()
+
+    def decode_raw_binary_file(self, file_path, min_length=8, jobs=1):
         """
         Extract readable strings from a binary file.
         Expecting length > given min_length parameter.
-        
+
         :param file_path: Path to the binary file
         :param min_length: Minimum length of strings to extract
+        :param jobs: Number of worker processes (1 to decode serially)
         :return: list of extracted strings
         """
+        return list(self.stream_raw_binary_file(file_path, min_length, jobs))
+
+    def stream_raw_binary_file(self, file_path, min_length=8, jobs=1):
+        """
+        Lazily extract readable strings from a binary file.
+        The file is memory-mapped and scanned in place (never read into memory as a whole),
+        and each string is yielded as soon as it is found.
+
+        :param file_path: Path to the binary file
+        :param min_length: Minimum length of strings to extract
+        :param jobs: Number of worker processes (1 to decode serially)
+        :return: generator of extracted strings
+        """
+        for _, string in self.stream_raw_binary_file_with_offsets(file_path, min_length, jobs):
+            yield string
+
+    def stream_raw_binary_file_with_offsets(self, file_path, min_length=8, jobs=1, start=0):
+        """
+        Same as stream_raw_binary_file(), but yields each string together with its byte offset in the file.
+
+        :param start: byte offset to resume scanning from; only strings starting at or after it are yielded
+        :return: generator of (offset, string)
+        """
+        if jobs > 1:
+            yield from self.__stream_raw_binary_file_parallel(file_path, min_length, jobs, start)
+            return
+
+        with open(file_path, 'rb') as file:
+            binary_content = map_binary_file(file)
+            if binary_content != None:
+                with binary_content:
+                    yield from decode_binary_content(binary_content, min_length, start)
+
+        self.decoded_count += 1
+
+    def __stream_raw_binary_file_parallel(self, file_path, min_length, jobs, start=0):
+        # Split the file into one byte range per job (ranges smaller than the minimum range size
+        # aren't worth the process overhead), scan the ranges in a process pool, and yield the
+        # results range by range in file order.
+        file_size = os.path.getsize(file_path)
+        min_range_size = int(MIN_PARALLEL_DECODE_RANGE_SIZE * 1024 * 1024)
+        range_size = max(-(-(file_size - start) // jobs), min_range_size)
+
+        ranges = [(range_start, min(range_start + range_size, file_size)) for range_start in range(start, file_size, range_size)]
+        if len(ranges) <= 1:
+            yield from self.stream_raw_binary_file_with_offsets(file_path, min_length, start=start)
+            return
+
+        with futures.ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as executor:
+            range_results = executor.map(
+                decode_byte_range,
+                [file_path] * len(ranges),
+                [min_length] * len(ranges),
+                [range_start for range_start, _ in ranges],
+                [range_end for _, range_end in ranges]
+            )
+            for decoded_strings in range_results:
+                yield from decoded_strings
+
+        self.decoded_count += 1
+
+    def stream_multi_encoding_binary_file(self, file_path, min_length=8):
+        """
+        Lazily extract readable strings of any supported encoding (ASCII, UTF-8, UTF-16LE/BE)
+        from a binary file in a single pass (see extract_multi_encoding_strings()).
+
+        :return: generator of (offset, string, StarRailStringEncoding)
+        """
         with open(file_path, 'rb') as file:
-            binary_content = file.read()
-        
-        # Use regular expression to find readable strings
-        pattern = re.compile(b'[ -~]{%d,}' % min_length)
-        strings = pattern.findall(binary_content)
-        
-        # Decode bytes to strings
-        decoded_strings = [s.decode('utf-8', errors='ignore') for s in strings]
+            binary_content = map_binary_file(file)
+            if binary_content != None:
+                with binary_content:
+                    yield from extract_multi_encoding_strings(binary_content, min_length)
+
         self.decoded_count += 1
-        return decoded_strings
 
-    def user_decode(self, file_path=None, min_length=8):
+    def decode_indexed_binary_file(self, file_path, min_length=8, jobs=1):
+        """
+        Extract readable strings (with their byte offsets) from a binary file, answered from the
+        file's string index when the file hasn't changed since it was last decoded.
+
+        :return: list of (offset, string)
+        """
+        return list(self.stream_indexed_binary_file(file_path, min_length, jobs))
+
+    def stream_indexed_binary_file(self, file_path, min_length=8, jobs=1):
+        """
+        Generator version of decode_indexed_binary_file(). On an index miss, the file is decoded
+        and its index is (re)built on the fly from the streamed strings.
+
+        :return: generator of (offset, string)
+        """
+        indexed_strings = self.string_index.load(file_path, min_length)
+        if indexed_strings != None:
+            yield from indexed_strings
+            return
+
+        with self.string_index.writer(file_path, min_length) as index_writer:
+            for offset, string in self.stream_raw_binary_file_with_offsets(file_path, min_length, jobs):
+                index_writer.add(offset, string)
+                yield offset, string
+
+    def user_decode(self, file_path=None, min_length=8, jobs=1, encoding=StarRailStringEncoding.ASCII.value):
         if not file_path:
             aprint("Binary File Path: ", end="")
             user_input = input("").strip().lower().replace("\"", "")
@@ -40,18 +402,41 @@ class StarRailBinaryDecoder:
                 aprint(Printer.to_lightred(f"Invalid path: {user_input}"))
                 return
             file_path = user_input
-        
-        results = []
+
+        # ASCII decoding uses the (indexed, parallelizable) ASCII decoder, any other encoding selection
+        # uses the multi-encoding extractor and only shows the strings of the selected encoding(s).
+        show_encoding = encoding != StarRailStringEncoding.ASCII.value
+        if not show_encoding:
+            results = ((offset, content, StarRailStringEncoding.ASCII) for offset, content in self.stream_indexed_binary_file(file_path, min_length, jobs))
+        else:
+            if jobs > 1:
+                aprint(f"Parallel decoding is only available for ASCII decoding (--encoding {StarRailStringEncoding.ASCII.value}).", submodule_name=SUBMODULE_NAME)
+
+            selected_encodings = list(StarRailStringEncoding)
+            if encoding == StarRailStringEncoding.UTF8.value:
+                selected_encodings = [StarRailStringEncoding.ASCII, StarRailStringEncoding.UTF8]
+            elif encoding != "all":
+                selected_encodings = [StarRailStringEncoding(encoding)]
+            results = (result for result in self.stream_multi_encoding_binary_file(file_path, min_length) if result[2] in selected_encodings)
+
+        # Results are printed as they are decoded, so the table is laid out with fixed column widths
+        # instead of letting tabulate measure the (not yet known) full result set.
+        result_count = 0
         try:
-            results = self.decode_raw_binary_file(file_path, min_length)
+            for idx, (offset, content, string_encoding) in enumerate(results):
+                if idx == 0:
+                    encoding_header = f"{Printer.to_purple('Encoding')}  " if show_encoding else ""
+                    encoding_divider = f"{'-'*8}  " if show_encoding else ""
+                    print(f"{Printer.to_purple('  Index')}  {Printer.to_purple('    Offset')}  {encoding_header}{Printer.to_purple('Content')}")
+                    print(f"{'-'*7}  {'-'*10}  {encoding_divider}{'-'*14}")
+
+                encoding_column = f"{string_encoding.value:<8}  " if show_encoding else ""
+                print(f"{Printer.to_lightblue(f'{idx:>7}')}  {Printer.to_lightgrey(f'{offset:#010x}')}  {encoding_column}{content}")
+                result_count += 1
         except Exception as ex:
             aprint(f"File cannot be decoded ({ex}).", submodule_name=SUBMODULE_NAME)
             return
-        
-        if len(results) == 0:
+
+        if result_count == 0:
             aprint("No results are found.", submodule_name=SUBMODULE_NAME)
             return
-        
-        headers = [Printer.to_purple(title) for title in ["Index", "Content"]]
-        data = [[Printer.to_lightblue(idx), content] for idx, content in enumerate(results)]
-        print(tabulate.tabulate(data, headers))
\ No newline at end of file
@@ -0,0 +1,52 @@
+import struct
+
+
+'''
+Binary Record Reader: deserializes the records of the streaming assets files (BinaryVersion.bytes and
+ClientConfig.bytes).
+
+Both files are a sequence of string fields, each prefixed with its length in bytes as a big-endian u16,
+with nothing between the fields and nothing after the last one:
+
+    [u16be length][UTF-8 string] [u16be length][UTF-8 string] ...
+
+The content must follow the layout exactly. A length running past the end of the file, a field that isn't
+printable UTF-8 text or a file without any field is a mismatch, and the caller falls back to the string
+extractor.
+'''
+
+LENGTH_PREFIX = struct.Struct(">H")
+
+
+class StarRailBinaryRecordReader:
+    def __init__(self, binary_content: bytes):
+        self.view = memoryview(binary_content)
+
+    def read_fields(self):
+        """
+        Read the string fields in a single pass. Only the fields themselves are copied out of the buffer.
+
+        :return: list of (offset, string), or None if the content doesn't follow the layout
+        """
+        fields = []
+        position, size = 0, len(self.view)
+
+        while position < size:
+            if position + LENGTH_PREFIX.size > size:
+                return None
+            length = LENGTH_PREFIX.unpack_from(self.view, position)[0]
+            start = position + LENGTH_PREFIX.size
+            if start + length > size:
+                return None
+
+            try:
+                field = str(self.view[start:start+length], "utf-8")
+            except UnicodeDecodeError:
+                return None
+            if not field.isprintable():
+                return None
+
+            fields.append((start, field))
+            position = start + length
+
+        return fields if len(fields) > 0 else None
@@ -0,0 +1,246 @@
+import os
+import mmap
+import struct
+from typing import Dict, List
+
+from starrail.utils.utils import DatetimeHandler
+from starrail.exceptions.exceptions import StarRailWebCacheFormatException
+
+
+'''
+Chromium blockfile disk cache (the format of the game's webCaches/<version>/Cache/Cache_Data directory)
+
+    index               Header + hash table of CacheAddr (one bucket per key hash, collisions chained via EntryStore.next)
+    data_0              RANKINGS blocks (36 bytes, LRU bookkeeping)
+    data_1              BLOCK_256 blocks, holds the EntryStore records (keys, stream addresses, timestamps)
+    data_2              BLOCK_1K blocks, small stream data (e.g. HTTP response headers)
+    data_3              BLOCK_4K blocks, larger stream data
+    f_XXXXXX            External files for data that doesn't fit in a block file
+
+Reference: net/disk_cache/blockfile/disk_format.h and addr.h in the Chromium source.
+'''
+
+INDEX_MAGIC             = 0xC103CAC3
+BLOCK_MAGIC             = 0xC104CAC3
+INDEX_HEADER_SIZE       = 368           # IndexHeader incl. LruData
+INDEX_HEADER            = struct.Struct("<IIiiiiIi")    # magic, version, num_entries, num_bytes, last_file, this_id, stats, table_len
+DEFAULT_TABLE_LEN       = 0x10000
+BLOCK_HEADER_SIZE       = 8192
+
+# EntryStore: hash, next, rankings_node, reuse_count, refetch_count, state, creation_time, key_len, long_key,
+#             data_size[4], data_addr[4], flags, pad[4], self_hash (followed by the inline key)
+ENTRY_STORE             = struct.Struct("<IIIiiiQiI4i4II4iI")
+ENTRY_KEY_OFFSET        = ENTRY_STORE.size
+ENTRY_STATE_NORMAL      = 0
+
+# CacheAddr file types and their block sizes
+ADDR_EXTERNAL           = 0
+BLOCK_SIZES             = {1: 36, 2: 256, 3: 1024, 4: 4096, 5: 8, 6: 104, 7: 48}
+
+# base::Time values are microseconds since 1601-01-01 (UTC)
+WINDOWS_EPOCH_OFFSET    = 11644473600
+
+
+class ChromiumCacheEntry:
+    def __init__(self, key: str, creation_time: float, response_time: float, status_line: str, headers: dict, address: int):
+        self.key            = key
+        self.url            = ChromiumCacheEntry.key_to_url(key)
+        self.creation_time  = creation_time     # Epoch seconds
+        self.response_time  = response_time     # Epoch seconds (None if the response info couldn't be read)
+        self.status_line    = status_line
+        self.headers        = headers           # Lowercased header name -> value
+        self.address        = address           # CacheAddr of the entry (unique within the cache)
+
+    def __repr__(self):
+        return f"ChromiumCacheEntry(url={self.url}, created={DatetimeHandler.epoch_to_time_str(self.creation_time)}, status={self.status_line})"
+
+    @staticmethod
+    def key_to_url(key: str):
+        # HTTP cache keys may carry prefixes ("1/0/", "_dk_<site> <site> ") before the URL itself
+        url = key.split(" ")[-1]
+        start = url.find("http")
+        return url[start:] if start > 0 else url
+
+
+class ChromiumBlockfileCacheParser:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.known_addresses: List[int] = []   # Addresses of the known entries still in the cache (after parse())
+        self.__block_files: Dict[int, mmap.mmap] = dict()
+
+    def parse(self, known_entries: Dict[int, float] = None):
+        """
+        Walk the index hash table and read every stored entry.
+
+        :param known_entries: CacheAddr -> creation time of entries read by a previous parse. Those are
+                              skipped (only their chain link is read) unless their block has been reused.
+        :return: list of ChromiumCacheEntry, ordered by creation time
+        :raises StarRailWebCacheFormatException: if the directory isn't a blockfile cache
+        """
+        self.known_addresses = []
+        try:
+            return sorted(self.__parse_entries(known_entries or dict()), key=lambda entry: entry.creation_time)
+        finally:
+            self.close()
+
+    def close(self):
+        for block_file in self.__block_files.values():
+            block_file.close()
+        self.__block_files.clear()
+
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+
+    def __parse_entries(self, known_entries):
+        index_path = os.path.join(self.cache_dir, "index")
+        if not os.path.isfile(index_path):
+            raise StarRailWebCacheFormatException(f"missing index file in {self.cache_dir}")
+
+        with open(index_path, "rb") as rf:
+            index_content = rf.read()
+
+        if len(index_content) < INDEX_HEADER_SIZE:
+            raise StarRailWebCacheFormatException("truncated index header")
+
+        magic, _, _, _, _, _, _, table_len = INDEX_HEADER.unpack_from(index_content)
+        if magic != INDEX_MAGIC:
+            raise StarRailWebCacheFormatException(f"bad index magic {magic:#x}")
+
+        table_len = table_len if table_len > 0 else DEFAULT_TABLE_LEN
+        table_len = min(table_len, (len(index_content) - INDEX_HEADER_SIZE) // 4)
+        table = struct.unpack_from(f"<{table_len}I", index_content, INDEX_HEADER_SIZE)
+
+        entries = []
+        visited = set()
+        for address in table:
+            # Follow the bucket's collision chain (guarding against corrupted, looping chains)
+            while self.__is_initialized(address) and address not in visited:
+                visited.add(address)
+                entry_block = self.__read_block(address)
+                if entry_block == None or len(entry_block) < ENTRY_KEY_OFFSET:
+                    break
+
+                fields = ENTRY_STORE.unpack_from(entry_block)
+                if known_entries.get(address) == self.__to_epoch(fields[6]):
+                    self.known_addresses.append(address)
+                else:
+                    entry = self.__parse_entry(address, entry_block, fields)
+                    if entry != None:
+                        entries.append(entry)
+                address = fields[1]
+        return entries
+
+    def __parse_entry(self, address, entry_block, fields):
+        state, creation_time, key_len, long_key = fields[5], fields[6], fields[7], fields[8]
+        data_sizes, data_addrs = fields[9:13], fields[13:17]
+
+        if state != ENTRY_STATE_NORMAL or key_len <= 0:
+            return None
+
+        if self.__is_initialized(long_key):
+            raw_key = self.__read_data(long_key, key_len)
+        else:
+            raw_key = entry_block[ENTRY_KEY_OFFSET:ENTRY_KEY_OFFSET+key_len]
+        if raw_key == None:
+            return None
+
+        response_time, status_line, headers = None, None, dict()
+        if data_sizes[0] > 0 and self.__is_initialized(data_addrs[0]):
+            response_info = self.__read_data(data_addrs[0], data_sizes[0])
+            if response_info != None:
+                response_time, status_line, headers = self.__parse_response_info(response_info)
+
+        return ChromiumCacheEntry(
+            raw_key.decode("utf-8", errors="ignore"),
+            self.__to_epoch(creation_time),
+            response_time,
+            status_line,
+            headers,
+            address
+        )
+
+    def __parse_response_info(self, response_info: bytes):
+        '''
+        Stream 0 of an HTTP cache entry is a pickled HttpResponseInfo:
+            uint32 payload size, int32 flags, [int32 extra flags], int64 request time, int64 response time,
+            int32 headers length + raw headers ("HTTP/1.1 200 OK\\0Name: value\\0...\\0\\0")
+        The extra flags field only exists in newer Chromium versions, so both layouts are tried.
+        '''
+        for time_offset in (8, 12):
+            headers_offset = time_offset + 16
+            if len(response_info) < headers_offset + 4:
+                continue
+            headers_len = struct.unpack_from("<i", response_info, headers_offset)[0]
+            raw_headers = response_info[headers_offset+4:headers_offset+4+headers_len]
+            if headers_len > 0 and len(raw_headers) == headers_len and raw_headers.startswith(b"HTTP/"):
+                response_time = struct.unpack_from("<q", response_info, time_offset + 8)[0]
+                return (self.__to_epoch(response_time),) + self.__parse_raw_headers(raw_headers)
+
+        # Unknown pickle layout, fall back to locating the raw headers directly
+        start = response_info.find(b"HTTP/")
+        if start < 0:
+            return None, None, dict()
+        end = response_info.find(b"\0\0", start)
+        return (None,) + self.__parse_raw_headers(response_info[start:end if end > 0 else len(response_info)])
+
+    def __parse_raw_headers(self, raw_headers: bytes):
+        lines = [line.decode("latin-1") for line in raw_headers.split(b"\0") if line]
+        headers = dict()
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return (lines[0] if len(lines) > 0 else None), headers
+
+    def __read_block(self, address):
+        file_type = (address >> 28) & 0x7
+        if file_type == ADDR_EXTERNAL or file_type not in BLOCK_SIZES:
+            return None
+
+        num_blocks  = ((address >> 24) & 0x3) + 1
+        file_number = (address >> 16) & 0xFF
+        start_block = address & 0xFFFF
+        block_size  = BLOCK_SIZES[file_type]
+
+        block_file = self.__get_block_file(file_number)
+        if block_file == None:
+            return None
+
+        offset = BLOCK_HEADER_SIZE + start_block * block_size
+        return block_file[offset:offset + num_blocks * block_size]
+
+    def __read_data(self, address, size):
+        if (address >> 28) & 0x7 == ADDR_EXTERNAL:
+            external_path = os.path.join(self.cache_dir, f"f_{address & 0x0FFFFFFF:06x}")
+            try:
+                with open(external_path, "rb") as rf:
+                    return rf.read(size)
+            except OSError:
+                return None
+
+        block = self.__read_block(address)
+        if block == None or len(block) < size:
+            return None
+        return block[:size]
+
+    def __get_block_file(self, file_number):
+        if file_number in self.__block_files:
+            return self.__block_files[file_number]
+
+        block_file = None
+        block_path = os.path.join(self.cache_dir, f"data_{file_number}")
+        if os.path.isfile(block_path) and os.path.getsize(block_path) >= BLOCK_HEADER_SIZE:
+            with open(block_path, "rb") as rf:
+                block_file = mmap.mmap(rf.fileno(), 0, access=mmap.ACCESS_READ)
+            if struct.unpack_from("<I", block_file)[0] != BLOCK_MAGIC:
+                block_file.close()
+                raise StarRailWebCacheFormatException(f"bad block file magic in data_{file_number}")
+
+        self.__block_files[file_number] = block_file
+        return block_file
+
+    def __is_initialized(self, address):
+        return address & 0x80000000 != 0
+
+    def __to_epoch(self, time_value):
+        return time_value / 1000000 - WINDOWS_EPOCH_OFFSET
@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+
+
+'''
+Directory crawler used by the game detector's crawl strategy (see utils/game_detector).
+
+This module only depends on the standard library, so it can be loaded on its own (e.g. by
+tests/benchmark_game_detector.py on platforms the package doesn't support).
+'''
+
+
+class StarRailDirectoryCrawler:
+    """
+    Work-stealing directory crawler - every directory found goes into one shared queue served by all
+    worker threads, so a single large drive is spread across all workers instead of being walked by one.
+    """
+    def __init__(self, workers=None, prune_dirs=set(), prune_root_dirs=set()):
+        # Crawling is I/O bound (directory listings release the GIL), so more threads than cores pay off
+        self.workers = workers if workers != None else min(32, (os.cpu_count() or 1) + 4)
+        self.prune_dirs = {name.lower() for name in prune_dirs}             # Never descended into
+        self.prune_root_dirs = {name.lower() for name in prune_root_dirs}   # Never descended into at a drive root
+        self.stop_event = threading.Event()
+        self.listed_dirs = 0                # Directories listed by the last crawl
+
+        self.__dir_queue = queue.Queue()
+        self.__pending = 0                  # Directories queued or being listed
+        self.__pending_lock = threading.Lock()
+        self.__done_event = threading.Event()
+        self.__matches: list[str] = []
+        self.__matches_lock = threading.Lock()
+
+    def crawl(self, roots, file_name, stop_on_match=None):
+        """
+        Crawl the directory trees under the roots for files named `file_name` (case-insensitive).
+
+        :param stop_on_match: predicate called with the absolute path of every match (from the worker threads),
+                              the whole crawl stops as soon as it returns True
+        :return: list of the absolute paths of all matches found
+        """
+        self.stop_event.clear()
+        self.__done_event.clear()
+        self.__matches = []
+        self.listed_dirs = 0
+        for root in roots:
+            self.__push(root)
+        if self.__pending == 0:
+            return []
+
+        workers = [
+            threading.Thread(target=self.__crawl_worker, args=(file_name.lower(), stop_on_match), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for worker in workers:
+            worker.start()
+
+        # Done when every directory has been listed, or stopped by a match
+        self.__done_event.wait()
+        self.stop_event.set()
+        for worker in workers:
+            worker.join()
+        return self.__matches
+
+    def stop(self):
+        self.stop_event.set()
+        self.__done_event.set()
+
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+
+    def __crawl_worker(self, file_name, stop_on_match):
+        # Each worker crawls depth-first from its own stack and only shares directories (the shallowest
+        # half of its stack, i.e. the largest subtrees) when the shared queue has run dry. Matches are
+        # batched in the worker and handed over once, when the worker exits.
+        matches, listed_dirs = [], 0
+        local_dirs = []
+        while not self.stop_event.is_set():
+            if len(local_dirs) == 0:
+                try:
+                    local_dirs.append(self.__dir_queue.get(timeout=0.05))
+                except queue.Empty:
+                    continue
+
+            subdirs = []
+            try:
+                subdirs = self.__list_directory(local_dirs.pop(), file_name, stop_on_match, matches)
+                listed_dirs += 1
+            finally:
+                with self.__pending_lock:
+                    self.__pending += len(subdirs) - 1
+                    if self.__pending == 0:
+                        self.__done_event.set()
+
+            local_dirs.extend(subdirs)
+            if len(local_dirs) > 1 and self.__dir_queue.empty():
+                shared_count = len(local_dirs) // 2
+                for directory in local_dirs[:shared_count]:
+                    self.__dir_queue.put(directory)
+                del local_dirs[:shared_count]
+
+        with self.__matches_lock:
+            self.__matches.extend(matches)
+            self.listed_dirs += listed_dirs
+
+    def __list_directory(self, directory, file_name, stop_on_match, matches):
+        # -> subdirectories to crawl
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                # Drive roots are their own dirname
+                at_root = os.path.dirname(directory) == directory
+                for entry in entries:
+                    # DirEntry types come from the directory listing itself, no stat call is needed
+                    if entry.is_dir(follow_symlinks=False):
+                        entry_name = entry.name.lower()
+                        if entry_name in self.prune_dirs or (at_root and entry_name in self.prune_root_dirs):
+                            continue
+                        subdirs.append(entry.path)
+
+                    elif entry.name.lower() == file_name:
+                        matches.append(entry.path)
+                        if stop_on_match != None and stop_on_match(entry.path):
+                            self.stop()
+                            return []
+        except OSError:
+            # Access denied, or removed during the crawl
+            return subdirs
+        return subdirs
+
+    def __push(self, directory):
+        with self.__pending_lock:
+            self.__pending += 1
+        self.__dir_queue.put(directory)
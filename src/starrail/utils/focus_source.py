@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from starrail.utils.process_handler import ProcessHandler
+
+
+'''
+Focus Source: which process owns the foreground window. The game process watcher polls it to keep the
+cached focus state that the recorder callbacks read.
+
+    Win32FocusSource    GetForegroundWindow lookup (Windows)
+    FakeFocusSource     set by hand, drives the watcher in tests and benchmarks on other platforms
+'''
+
+class FocusSource(ABC):
+    @abstractmethod
+    def get_focused_pid(self) -> int:
+        """
+        :return: PID of the process owning the foreground window, or None if unknown
+        """
+        pass
+
+
+class Win32FocusSource(FocusSource):
+    def get_focused_pid(self):
+        try:
+            return ProcessHandler.get_focused_pid()
+        except (AttributeError, OSError):
+            # No Win32 API on this platform
+            return None
+
+
+class FakeFocusSource(FocusSource):
+    def __init__(self, focused_pid: int = None):
+        self.focused_pid = focused_pid
+        self.lookups = 0
+
+    def get_focused_pid(self):
+        self.lookups += 1
+        return self.focused_pid
@@ -1,20 +1,29 @@
 import os
 import sys
+import stat
+import time
 import string
+import configparser
+from abc import ABC, abstractmethod
 from pathlib import Path
-from concurrent import futures
-from multiprocessing import Manager
-import queue
 
-from starrail.constants import GAME_FILENAME, GAME_FILE_PATH, GAME_FILE_PATH_NEW, MIN_WEAK_MATCH_EXE_SIZE
+from starrail.constants import GAME_FILENAME, GAME_FILE_PATH, GAME_FILE_PATH_NEW, MIN_WEAK_MATCH_EXE_SIZE, CRAWLER_PRUNE_DIRS, CRAWLER_PRUNE_ROOT_DIRS, \
+    KNOWN_GAME_ROOTS, LAUNCHER_REGISTRY_KEYS, LAUNCHER_CONFIG_FILE, LAUNCHER_CONFIG_KEY
+from starrail.config.install_index_handler import StarRailInstallIndex
+from starrail.utils.directory_crawler import StarRailDirectoryCrawler
 from starrail.exceptions.exceptions import *
 
 
 class StarRailGameDetector:
     """
     Honkai Star Rail Game Detector - Finds the game on local drives
+    
+    The detection strategies are run in priority order (cheapest first) until one of them finds the game:
+        1. StarRailKnownPathsStrategy   Paths found by previous detections (install index)
+        2. StarRailLauncherStrategy     Launcher registry entries and config files, usual install directories
+        3. StarRailCrawlStrategy        Crawl of all local drives
     """
-    def __init__(self):
+    def __init__(self, strategies=None):
         
         # Weak Match
         # Implemented in 1.0.2, weak match will return valid game path based solely on the filename
@@ -23,69 +32,219 @@ class StarRailGameDetector:
         # game versions, but it is the best one I can think of right now to futue-proof another directory
         # structure change.
 
-        manager = Manager()
-        self.weak_matches = manager.Queue()  # Use Manager's Queue
-
-
-    def get_local_drives(self):
-        available_drives = ['%s:' % d for d in string.ascii_uppercase if os.path.exists('%s:' % d)]
-        return available_drives
-
-
-    def find_game_in_path(self, path, name, stop_flag):
-        for root, _, files in os.walk(path):
-            if stop_flag.value: # Check the shared flag value.
-                return None
-            
-            # If game file in the directory
-            if name in files:
-                abs_path = os.path.join(root, name)
-                self.weak_matches.put(abs_path)
-
-                # Check if the game's entire path is in the path found
-                if os.path.normpath(GAME_FILE_PATH) in abs_path or os.path.normpath(GAME_FILE_PATH_NEW) in abs_path:
-                    return os.path.join(root, name)
+        self.weak_matches: list[str] = []    # Every game file found by the last crawl
         
-        return None
+        self.install_index = StarRailInstallIndex()
+        self.strategies = strategies if strategies != None else [
+            StarRailKnownPathsStrategy(self),
+            StarRailLauncherStrategy(self),
+            StarRailCrawlStrategy(self)
+        ]
+        self.strategy_timings: dict[str, float] = dict()    # Strategy name -> seconds taken in the last find_game()
+        self.__local_drives = None
 
 
     def find_game(self, paths=[], name=GAME_FILENAME):
+        """
+        Find the game file.
+        
+        :param paths: directories to crawl, in which case only the crawl strategy is run on them
+        :return: absolute path of the game file, or None
+        """
         for p in paths:
             if not os.path.exists(p):
                 raise StarRailBaseException(f"Path does not exist. [{p}]")
 
-        if len(paths) == 0:
-            paths = self.get_local_drives()
+        strategies = self.strategies if len(paths) == 0 else [StarRailCrawlStrategy(self, paths)]
+        
+        self.strategy_timings = dict()
+        for strategy in strategies:
+            start_time = time.perf_counter()
+            game_path = strategy.find(name)
+            self.strategy_timings[strategy.name] = time.perf_counter() - start_time
+            
+            if game_path != None:
+                if strategy.records_result:
+                    self.install_index.record_path(game_path)
+                return game_path
 
-        paths = [f"{path}\\" if path.endswith(":") and len(path) == 2 else path for path in paths]
+        # No match and no valid weak match
+        return None
 
-        worker_threads = 1
-        if os.cpu_count() > 1:
-            worker_threads = os.cpu_count() - 1
 
-        with futures.ProcessPoolExecutor(max_workers=worker_threads) as executor, Manager() as manager:
-            stop_flag = manager.Value('b', False)   # Create a boolean shared flag.
-            future_to_path = {executor.submit(self.find_game_in_path, path, name, stop_flag): path for path in paths}
-            for future in futures.as_completed(future_to_path):
-                result = future.result()
-                if result is not None:
-                    stop_flag.value = True # Set the flag to true when a result is found.
-                    return result
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
 
-        # No match is found, then:
-        while not self.weak_matches.empty():
-            path = self.weak_matches.get()
-            if self.is_file_over_size(path):
-                return path
+    def get_local_drives(self):
+        if self.__local_drives == None:
+            self.__local_drives = ['%s:' % d for d in string.ascii_uppercase if os.path.exists('%s:' % d)]
+        return self.__local_drives
 
-        # No match and no valid weak match
+
+    def is_strong_match(self, abs_path):
+        # Check if the game's entire path is in the path found
+        return os.path.normpath(GAME_FILE_PATH) in abs_path or os.path.normpath(GAME_FILE_PATH_NEW) in abs_path
+
+
+    def get_game_file_stat(self, file_path):
+        # Single stat call, returns the stat of the file if it can be the game (a file over the weak match size)
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+        
+        if stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > MIN_WEAK_MATCH_EXE_SIZE * 1024 * 1024:
+            return file_stat
         return None
 
 
     def is_file_over_size(self, file_path):
-        if not os.path.isfile(file_path):
-            return False
+        return self.get_game_file_stat(file_path) != None
 
-        megabytes = MIN_WEAK_MATCH_EXE_SIZE * 1024 * 1024
-        file_size = os.path.getsize(file_path)
-        return file_size > megabytes
\ No newline at end of file
+
+# =============================================
+# ===========| DETECTION STRATEGIES | =========
+# =============================================
+
+class StarRailDetectionStrategy(ABC):
+    """
+    Base class of the game detector's strategies.
+    """
+    name            = "Base"
+    records_result  = True      # Whether the detector records the path found in the install index
+    
+    def __init__(self, detector: StarRailGameDetector):
+        self.detector = detector
+    
+    @abstractmethod
+    def find(self, name):
+        """
+        :return: absolute path of the game file, or None if the strategy can't find it
+        """
+        pass
+
+
+class StarRailKnownPathsStrategy(StarRailDetectionStrategy):
+    """
+    Paths found by previous detections, most recently seen first. A known path comes back with a
+    single stat call and the index is only rewritten when the file changed (e.g. game update).
+    """
+    name            = "Known Paths"
+    records_result  = False
+    
+    def find(self, name):
+        install_index = self.detector.install_index
+        indexed_paths = install_index.get_paths()
+        invalid_paths = []
+        
+        for indexed_path, indexed_entry in indexed_paths.items():
+            file_stat = self.detector.get_game_file_stat(indexed_path)
+            if file_stat == None:
+                invalid_paths.append(indexed_path)
+                continue
+            
+            if len(invalid_paths) > 0:
+                install_index.forget_paths(invalid_paths)
+            if indexed_entry.get("size") != file_stat.st_size or indexed_entry.get("mtime_ns") != file_stat.st_mtime_ns:
+                install_index.record_path(indexed_path, file_stat)
+            return indexed_path
+        
+        if len(invalid_paths) > 0:
+            install_index.forget_paths(invalid_paths)
+        return None
+
+
+class StarRailLauncherStrategy(StarRailDetectionStrategy):
+    """
+    Install locations known to the launchers (registry entries, legacy launcher config files), then
+    the usual install directories on each drive. Each candidate costs a single stat call.
+    """
+    name = "Launcher Lookup"
+    
+    def find(self, name):
+        seen_candidates = set()
+        for candidate in self.get_candidate_paths(name):
+            candidate = os.path.normpath(candidate)
+            if os.path.normcase(candidate) in seen_candidates:
+                continue
+            seen_candidates.add(os.path.normcase(candidate))
+            
+            if self.detector.get_game_file_stat(candidate) != None:
+                return candidate
+        return None
+    
+    def get_candidate_paths(self, name):
+        yield from self.__get_registry_candidates(name)
+        yield from self.__get_launcher_config_candidates(name)
+        yield from self.__get_known_root_candidates(name)
+    
+    def __get_registry_candidates(self, name):
+        try:
+            import winreg
+        except ImportError:
+            return
+        
+        for hive, key, value_name in LAUNCHER_REGISTRY_KEYS:
+            try:
+                with winreg.OpenKey(getattr(winreg, hive), key) as registry_key:
+                    install_dir = winreg.QueryValueEx(registry_key, value_name)[0]
+            except OSError:
+                continue
+            # HoYoPlay stores the game directory, the legacy launcher its own directory (game in Game/)
+            yield os.path.join(install_dir, name)
+            yield os.path.join(install_dir, "Game", name)
+    
+    def __get_launcher_config_candidates(self, name):
+        # Legacy launcher directory: <root>/Star Rail/config.ini with the game directory in game_install_path
+        launcher_dir = os.path.dirname(os.path.dirname(os.path.normpath(GAME_FILE_PATH)))
+        for drive in self.detector.get_local_drives():
+            for known_root in KNOWN_GAME_ROOTS:
+                config_path = os.path.join(f"{drive}\\", known_root, launcher_dir, LAUNCHER_CONFIG_FILE)
+                if not os.path.isfile(config_path):
+                    continue
+                
+                launcher_config = configparser.ConfigParser()
+                try:
+                    launcher_config.read(config_path, encoding="utf-8")
+                except (configparser.Error, UnicodeDecodeError):
+                    continue
+                for section in launcher_config.sections():
+                    if launcher_config.has_option(section, LAUNCHER_CONFIG_KEY):
+                        yield os.path.join(launcher_config.get(section, LAUNCHER_CONFIG_KEY), name)
+    
+    def __get_known_root_candidates(self, name):
+        for drive in self.detector.get_local_drives():
+            for known_root in KNOWN_GAME_ROOTS:
+                for game_file_path in (GAME_FILE_PATH_NEW, GAME_FILE_PATH):
+                    yield os.path.join(f"{drive}\\", known_root, os.path.dirname(game_file_path), name)
+
+
+class StarRailCrawlStrategy(StarRailDetectionStrategy):
+    """
+    Crawl of the given directories (all local drives by default), stopped at the first strong match.
+    Without a strong match, the first weak match over the minimum size is returned.
+    """
+    name = "Filesystem Crawl"
+    
+    def __init__(self, detector: StarRailGameDetector, paths=None, workers=None):
+        super().__init__(detector)
+        self.paths = paths
+        self.workers = workers
+    
+    def find(self, name):
+        paths = self.paths if self.paths != None else self.detector.get_local_drives()
+        paths = [f"{path}\\" if path.endswith(":") and len(path) == 2 else path for path in paths]
+        
+        crawler = StarRailDirectoryCrawler(self.workers, CRAWLER_PRUNE_DIRS, CRAWLER_PRUNE_ROOT_DIRS)
+        self.detector.weak_matches = crawler.crawl(paths, name, self.detector.is_strong_match)
+        
+        strong_matches = [path for path in self.detector.weak_matches if self.detector.is_strong_match(path)]
+        if len(strong_matches) > 0:
+            return strong_matches[0]
+
+        # No match is found, then:
+        for path in self.detector.weak_matches:
+            if self.detector.is_file_over_size(path):
+                return path
+        return None
@@ -1,5 +1,6 @@
 import os
 import json
+import tempfile
 from abc import ABC
 from starrail.exceptions.exceptions import StarRailBaseException
 
@@ -27,6 +28,26 @@ class JSONConfigHandler(ABC):
             StarRailBaseException(f"Config file '{self.config_file}' cannot be created due to an unknown error ({ex}).")
         return True
 
+    def ATOMIC_SAVE_CONFIG(self, json_payload) -> bool:
+        # Written to a temp file and renamed over the config file, so that a concurrent reader sees
+        # either the old or the new file, never a partially written one
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(self.config_file)}.", dir=os.path.dirname(self.config_file))
+        except OSError:
+            return False
+        
+        try:
+            with os.fdopen(fd, "w") as wf:
+                json.dump(json_payload, wf, indent=4)
+            os.replace(temp_path, self.config_file)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
     def DELETE_CONFIG(self):
         if not self.CONFIG_EXISTS():
             return False
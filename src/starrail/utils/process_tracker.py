@@ -0,0 +1,106 @@
+import os
+import psutil
+import threading
+from pathlib import Path
+
+from starrail.config.config_handler import StarRailConfig
+from starrail.config.runtime_state_handler import StarRailRuntimeState
+
+
+class StarRailProcessTracker:
+    '''
+    Tracks the running game process across calls (and across runs, through the PID and create time
+    saved in the runtime state), so that finding it doesn't scan every process on the machine:
+
+        1. The tracked psutil.Process is still running (psutil checks the PID and create time)
+        2. The saved PID exists, has the saved create time and runs the configured StarRail.exe
+        3. Full scan of the running processes (only if both checks above fail)
+    '''
+    def __init__(self, config: StarRailConfig, runtime_state: StarRailRuntimeState):
+        self.config = config
+        self.runtime_state = runtime_state
+        self.full_scans = 0     # Number of times the fast paths failed and every process was scanned
+        self.__process: psutil.Process = None
+        self.__checked_saved_pid = False
+        self.__lock = threading.Lock()  # Shared by the process watcher thread and its callers
+
+    def get_process(self) -> psutil.Process:
+        """
+        :return: the running game process, or None if the game isn't running
+        """
+        if self.config.game_path == None:
+            return None
+        with self.__lock:
+            return self.__get_process()
+
+    def is_game_process(self, process: psutil.Process) -> bool:
+        try:
+            return process.is_running() and Path(process.exe()) == Path(self.config.game_path)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+
+    def __get_process(self):
+        # Fast path, the process found by a previous call
+        if self.__process != None:
+            if self.__is_alive(self.__process):
+                return self.__process
+            self.__process = None
+
+        # The saved PID is only worth checking once, it can't become valid later
+        if not self.__checked_saved_pid:
+            self.__checked_saved_pid = True
+            process = self.__validate_saved_pid()
+            if process != None:
+                self.__track(process)
+                return process
+
+        process = self.__scan_processes()
+        if process != None:
+            self.__track(process)
+        return process
+
+    def __is_alive(self, process: psutil.Process):
+        # A Process object can't start running another executable, so its exe was checked once when
+        # it got tracked. is_running() compares the create time, which catches a reused PID.
+        try:
+            return process.is_running()
+        except psutil.AccessDenied:
+            return False
+
+    def __validate_saved_pid(self):
+        if self.runtime_state.pid == None:
+            return None
+        try:
+            process = psutil.Process(self.runtime_state.pid)
+            if self.runtime_state.create_time != None and process.create_time() != self.runtime_state.create_time:
+                return None
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        return process if self.is_game_process(process) else None
+
+    def __scan_processes(self):
+        self.full_scans += 1
+        exe_basename = os.path.basename(self.config.game_path)
+
+        for process in psutil.process_iter(['name', 'exe']):
+            # name == exe_basename is for optimization only (proceed only if filename is the same)
+            if process.info["name"] != exe_basename or process.info["exe"] == None:
+                continue
+            if Path(process.info["exe"]) == Path(self.config.game_path) and self.__is_alive(process):
+                return process
+        return None
+
+    def __track(self, process: psutil.Process):
+        self.__process = process
+        try:
+            create_time = process.create_time()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            create_time = None
+
+        # Written in the background, the caller may be a hot path (e.g. a recorder input callback)
+        self.runtime_state.update(process.pid, create_time)
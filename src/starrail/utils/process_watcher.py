@@ -0,0 +1,245 @@
+import threading
+from enum import Enum
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from starrail.constants import PROCESS_WATCHER_MIN_INTERVAL, PROCESS_WATCHER_IDLE_INTERVAL, PROCESS_WATCHER_MAX_INTERVAL
+from starrail.utils.focus_source import FocusSource
+from starrail.utils.process_tracker import StarRailProcessTracker
+
+
+'''
+Game Process Watcher: a single background thread that observes the game process and publishes its
+start/stop/focus changes, so that callers block on an event instead of polling the process themselves.
+
+The process is polled through a GameProcessSource (PsutilProcessSource for the real game, or
+FakeProcessSource to drive the watcher in tests) and the foreground window through a FocusSource (see
+utils/focus_source). The last observed state is cached, is_focused() reads it without any lookup.
+
+The polling interval backs off to PROCESS_WATCHER_MAX_INTERVAL while nothing changes and goes back to the
+fastest rate on a change, while a caller is waiting on an event or while fast_polling() is held (e.g. by
+the recorder, which needs an up to date focus state). The fastest rate depends on the game state: while
+the game isn't running, every poll is a full scan of the running processes (see utils/process_tracker),
+so it is PROCESS_WATCHER_IDLE_INTERVAL. Once the game is found, polling it is cheap and the fastest rate is
+PROCESS_WATCHER_MIN_INTERVAL.
+'''
+
+class GameProcessEvent(Enum):
+    STARTED     = "started"
+    STOPPED     = "stopped"
+    FOCUSED     = "focused"
+    UNFOCUSED   = "unfocused"
+
+
+class GameProcessSource(ABC):
+    @abstractmethod
+    def get_pid(self) -> int:
+        """
+        :return: PID of the running game process, or None if the game isn't running
+        """
+        pass
+
+
+class PsutilProcessSource(GameProcessSource):
+    def __init__(self, process_tracker: StarRailProcessTracker):
+        self.process_tracker = process_tracker
+
+    def get_pid(self):
+        process = self.process_tracker.get_process()
+        return process.pid if process != None else None
+
+
+class FakeProcessSource(GameProcessSource):
+    def __init__(self, pid: int = None):
+        self.pid = pid
+        self.polls = 0
+
+    def get_pid(self):
+        self.polls += 1
+        return self.pid
+
+
+class GameProcessWatcher:
+    def __init__(self, source: GameProcessSource, focus_source: FocusSource, min_interval=PROCESS_WATCHER_MIN_INTERVAL, idle_interval=PROCESS_WATCHER_IDLE_INTERVAL, max_interval=PROCESS_WATCHER_MAX_INTERVAL):
+        self.source = source
+        self.focus_source = focus_source
+        self.min_interval = min_interval    # Fastest polling while the game is running
+        self.idle_interval = idle_interval  # Fastest polling while the game isn't running
+        self.max_interval = max_interval
+
+        self.pid: int = None        # PID of the running game (None if not running)
+        self.focused = False        # Whether the game owns the foreground window
+        self.interval = idle_interval
+
+        self.__lock = threading.Lock()
+        self.__subscribers = []
+        self.__fast_pollers = 0
+        self.__running_event = threading.Event()
+        self.__stopped_event = threading.Event()
+        self.__focused_event = threading.Event()
+        self.__wake_event = threading.Event()
+        self.__stop_event = threading.Event()
+        self.__thread: threading.Thread = None
+
+    # =============================================
+    # =========| START/STOP FUNCTIONS | ===========
+    # =============================================
+
+    def start(self):
+        """
+        Poll once (so the state is known when this returns) and start the watcher thread, if not started.
+        """
+        with self.__lock:
+            if self.__thread != None:
+                return
+            self.__stop_event.clear()
+            self.__thread = threading.Thread(target=self.__watch, daemon=True)
+        self.poll()
+        self.__thread.start()
+
+    def stop(self):
+        with self.__lock:
+            thread, self.__thread = self.__thread, None
+        if thread != None:
+            self.__stop_event.set()
+            self.__wake_event.set()
+            thread.join()
+
+    def is_started(self):
+        return self.__thread != None
+
+    def is_focused(self) -> bool:
+        # Cached by the last poll, no lookup
+        return self.focused
+
+    @contextmanager
+    def fast_polling(self):
+        """
+        Poll at the fastest rate while in this context, so that the cached state stays up to date.
+        """
+        self.__hold_fast_polling()
+        try:
+            yield self
+        finally:
+            self.__release_fast_polling()
+
+    # =============================================
+    # ==========| SUBSCRIBER FUNCTIONS | ==========
+    # =============================================
+
+    def subscribe(self, callback):
+        """
+        :param callback: called as callback(event: GameProcessEvent, pid: int) from the watcher thread
+        """
+        with self.__lock:
+            self.__subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self.__lock:
+            if callback in self.__subscribers:
+                self.__subscribers.remove(callback)
+
+    def wait_for_start(self, timeout=None) -> bool:
+        """
+        Block until the game is running (returns immediately if it already is). The watcher must be started.
+
+        :return: False if the timeout expired first
+        """
+        return self.__wait(self.__running_event, timeout)
+
+    def wait_for_stop(self, timeout=None) -> bool:
+        return self.__wait(self.__stopped_event, timeout)
+
+    def wait_for_focus(self, timeout=None) -> bool:
+        return self.__wait(self.__focused_event, timeout)
+
+    # =============================================
+    # ============| POLLING FUNCTIONS | ===========
+    # =============================================
+
+    def poll(self):
+        """
+        Observe the game process once and publish the changes since the last poll.
+
+        :return: list of (GameProcessEvent, pid) published
+        """
+        pid = self.source.get_pid()
+        focused = pid != None and self.focus_source.get_focused_pid() == pid
+
+        events = []
+        with self.__lock:
+            previous_pid = self.pid
+            if self.focused and (not focused or pid != previous_pid):
+                events.append((GameProcessEvent.UNFOCUSED, previous_pid))
+            if pid != previous_pid:
+                if previous_pid != None:
+                    events.append((GameProcessEvent.STOPPED, previous_pid))
+                if pid != None:
+                    events.append((GameProcessEvent.STARTED, pid))
+            if focused and (not self.focused or pid != previous_pid):
+                events.append((GameProcessEvent.FOCUSED, pid))
+
+            self.pid, self.focused = pid, focused
+            self.__set_event(self.__running_event, pid != None)
+            self.__set_event(self.__stopped_event, pid == None)
+            self.__set_event(self.__focused_event, focused)
+
+            fastest_interval = self.__get_fastest_interval()
+            if len(events) > 0 or self.__fast_pollers > 0:
+                self.interval = fastest_interval
+            else:
+                self.interval = min(max(self.interval * 2, fastest_interval), self.max_interval)
+            subscribers = list(self.__subscribers)
+
+        for event, event_pid in events:
+            for callback in subscribers:
+                try:
+                    callback(event, event_pid)
+                except Exception:
+                    # A failing subscriber must not stop the watcher or the other subscribers
+                    continue
+        return events
+
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+
+    def __watch(self):
+        while not self.__stop_event.is_set():
+            self.__wake_event.wait(self.interval)
+            self.__wake_event.clear()
+            if self.__stop_event.is_set():
+                break
+            self.poll()
+
+    def __wait(self, event: threading.Event, timeout):
+        if event.is_set():
+            return True
+
+        # Poll at the fastest rate while someone is waiting
+        self.__hold_fast_polling()
+        try:
+            return event.wait(timeout)
+        finally:
+            self.__release_fast_polling()
+
+    def __hold_fast_polling(self):
+        with self.__lock:
+            self.__fast_pollers += 1
+            self.interval = self.__get_fastest_interval()
+        self.__wake_event.set()
+
+    def __release_fast_polling(self):
+        with self.__lock:
+            self.__fast_pollers -= 1
+
+    def __get_fastest_interval(self):
+        # Called with the lock held
+        return self.min_interval if self.pid != None else self.idle_interval
+
+    def __set_event(self, event: threading.Event, is_set: bool):
+        if is_set:
+            event.set()
+        else:
+            event.clear()
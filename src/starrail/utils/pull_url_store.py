@@ -0,0 +1,111 @@
+import os
+import time
+import sqlite3
+from contextlib import closing
+from urllib.parse import urlparse, parse_qs
+
+from starrail.constants import PULL_AUTHKEY_LIFETIME, WEBCACHE_URL_CATEGORIES
+
+
+'''
+Pull URL Store: every events/pulls URL ever extracted from the web cache, deduplicated.
+
+    url             the URL itself (primary key)
+    first_seen      epoch time the URL was first extracted
+    last_seen       epoch time the URL was last extracted
+    cached_time     epoch time the game cached the URL (None if unknown)
+    is_pull         1 if the URL is an event page carrying an authkey (pull history page), 0 for other event
+                    pages and for URLs that aren't event pages (e.g. the getGachaLog API the page calls)
+    authkey_expiry  epoch time the authkey expires, from the URL's "timestamp" parameter (None if unknown)
+'''
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS pull_urls (
+    url             TEXT PRIMARY KEY,
+    first_seen      REAL NOT NULL,
+    last_seen       REAL NOT NULL,
+    cached_time     REAL,
+    is_pull         INTEGER NOT NULL,
+    authkey_expiry  REAL
+)
+"""
+
+# Insert, then refresh (no ON CONFLICT upsert, which needs SQLite 3.24+ and older Python 3.7 builds ship older)
+INSERT_URL = """
+INSERT OR IGNORE INTO pull_urls (url, first_seen, last_seen, cached_time, is_pull, authkey_expiry)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+UPDATE_URL = """
+UPDATE pull_urls SET
+    last_seen   = ?,
+    cached_time = COALESCE(?, cached_time)
+WHERE url = ?
+"""
+
+# The page path is checked again since older versions flagged the getGachaLog API URLs as pulls too
+SELECT_NEWEST_PULL_URL = """
+SELECT url FROM pull_urls
+WHERE is_pull = 1 AND instr(url, ?) > 0 AND (authkey_expiry IS NULL OR authkey_expiry > ?)
+ORDER BY COALESCE(authkey_expiry, cached_time, first_seen) DESC
+LIMIT 1
+"""
+
+
+class StarRailPullURLStore:
+    def __init__(self, db_path=None):
+        if db_path == None:
+            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "pull_urls.db")
+        self.db_path = db_path
+
+    def record(self, urls, cached_times: dict = None):
+        """
+        Add the extracted URLs to the store, or refresh their last seen time if already stored.
+
+        :param cached_times: URL -> epoch time the game cached it (optional)
+        """
+        if len(urls) == 0:
+            return
+
+        cached_times = cached_times or dict()
+        seen_time = time.time()
+        rows = [
+            (url, seen_time, seen_time, cached_times.get(url)) + StarRailPullURLStore.parse_authkey(url)
+            for url in dict.fromkeys(urls)
+        ]
+        with closing(self.__connect()) as conn, conn:
+            conn.executemany(INSERT_URL, rows)
+            conn.executemany(UPDATE_URL, [(seen_time, cached_time, url) for url, _, _, cached_time, _, _ in rows])
+
+    def get_newest_valid_url(self):
+        """
+        :return: the pull URL with the newest authkey that hasn't expired yet, or None
+        """
+        with closing(self.__connect()) as conn:
+            row = conn.execute(SELECT_NEWEST_PULL_URL, (WEBCACHE_URL_CATEGORIES["events"], time.time())).fetchone()
+        return row[0] if row != None else None
+
+    def get_urls(self):
+        """
+        :return: list of (url, first_seen, last_seen, cached_time, is_pull, authkey_expiry), oldest first
+        """
+        with closing(self.__connect()) as conn:
+            return conn.execute("SELECT * FROM pull_urls ORDER BY COALESCE(cached_time, first_seen)").fetchall()
+
+    @staticmethod
+    def parse_authkey(url: str):
+        # -> (is_pull, authkey_expiry), the authkey is valid for a fixed time after the URL's timestamp.
+        # Only the event pages are pull history pages, the API URLs they call carry the authkey too.
+        query = parse_qs(urlparse(url).query)
+        if "authkey" not in query or WEBCACHE_URL_CATEGORIES["events"] not in url:
+            return 0, None
+        try:
+            return 1, int(query["timestamp"][0]) + PULL_AUTHKEY_LIFETIME
+        except (KeyError, ValueError):
+            return 1, None
+
+    def __connect(self):
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(CREATE_TABLE)
+        return conn
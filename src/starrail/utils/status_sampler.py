@@ -0,0 +1,126 @@
+import time
+import psutil
+from collections import deque
+
+from starrail.constants import STATUS_HISTORY_SIZE
+from starrail.utils.process_tracker import StarRailProcessTracker
+
+
+'''
+Status Sampler: samples the game process without blocking, for the live status view.
+
+Every sample reads the process once (psutil's oneshot() fetches all the counters in a single system
+call where the platform allows it). CPU usage is the delta of the process CPU time between two samples
+over the wall time between them, so sampling never sleeps and the first sample has no CPU value.
+
+The last STATUS_HISTORY_SIZE values of each HISTORY_METRICS are kept in a ring buffer for sparklines and
+min/avg/max. The history is cleared when the game restarts.
+'''
+
+HISTORY_METRICS = ("cpu_percent", "rss", "num_threads")
+SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
+
+
+class GameStatusSample:
+    def __init__(self, timestamp: float, pid: int, create_time: float, cpu_percent: float, rss: int, num_threads: int,
+                 read_count: int, write_count: int, read_bytes: int, write_bytes: int, cpu_affinity: list):
+        self.timestamp      = timestamp     # Epoch seconds
+        self.pid            = pid
+        self.create_time    = create_time   # Epoch seconds
+        self.cpu_percent    = cpu_percent   # Since the previous sample (None for the first sample of a process)
+        self.rss            = rss           # Bytes
+        self.num_threads    = num_threads
+        self.read_count     = read_count    # IO counters are cumulative (None if unavailable on the platform)
+        self.write_count    = write_count
+        self.read_bytes     = read_bytes
+        self.write_bytes    = write_bytes
+        self.cpu_affinity   = cpu_affinity  # None if unavailable on the platform
+
+
+class GameStatusSampler:
+    def __init__(self, process_tracker: StarRailProcessTracker, history_size=STATUS_HISTORY_SIZE):
+        self.process_tracker = process_tracker
+        self.history = {metric: deque(maxlen=history_size) for metric in HISTORY_METRICS}
+        self.__previous = None  # (pid, create_time, cpu time, perf_counter time) of the previous sample
+
+    def sample(self) -> GameStatusSample:
+        """
+        :return: the current status of the game process, or None if the game isn't running
+        """
+        process = self.process_tracker.get_process()
+        if process == None:
+            self.__previous = None
+            return None
+
+        try:
+            with process.oneshot():
+                cpu_times   = process.cpu_times()
+                create_time = process.create_time()
+                rss         = process.memory_info().rss
+                num_threads = process.num_threads()
+                io_counters = self.__get_optional(process, "io_counters")
+                affinity    = self.__get_optional(process, "cpu_affinity")
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self.__previous = None
+            return None
+
+        now = time.perf_counter()
+        cpu_time = cpu_times.user + cpu_times.system
+        cpu_percent = None
+        if self.__previous != None and self.__previous[:2] == (process.pid, create_time):
+            _, _, previous_cpu_time, previous_time = self.__previous
+            if now > previous_time:
+                cpu_percent = max(0.0, (cpu_time - previous_cpu_time) / (now - previous_time) * 100)
+        elif self.__previous != None:
+            # The game restarted, the history belongs to the previous process
+            self.clear_history()
+        self.__previous = (process.pid, create_time, cpu_time, now)
+
+        sample = GameStatusSample(
+            time.time(), process.pid, create_time, cpu_percent, rss, num_threads,
+            io_counters.read_count if io_counters != None else None,
+            io_counters.write_count if io_counters != None else None,
+            io_counters.read_bytes if io_counters != None else None,
+            io_counters.write_bytes if io_counters != None else None,
+            affinity
+        )
+        for metric in HISTORY_METRICS:
+            value = getattr(sample, metric)
+            if value != None:
+                self.history[metric].append(value)
+        return sample
+
+    def get_stats(self, metric):
+        """
+        :return: (min, avg, max) of the metric's history, or None if there is no history yet
+        """
+        values = self.history[metric]
+        if len(values) == 0:
+            return None
+        return min(values), sum(values) / len(values), max(values)
+
+    def get_sparkline(self, metric, width=None):
+        """
+        :return: the metric's history (the last width values) as a line of block characters
+        """
+        values = list(self.history[metric])[-width:] if width != None else list(self.history[metric])
+        if len(values) == 0:
+            return ""
+        low, high = min(values), max(values)
+        scale = (len(SPARKLINE_CHARS) - 1) / (high - low) if high > low else 0
+        return "".join(SPARKLINE_CHARS[int((value - low) * scale)] for value in values)
+
+    def clear_history(self):
+        for values in self.history.values():
+            values.clear()
+
+    # =============================================
+    # ============| HELPER FUNCTIONS | ============
+    # =============================================
+
+    def __get_optional(self, process, counter_name):
+        # io_counters and cpu_affinity don't exist on every platform
+        try:
+            return getattr(process, counter_name)()
+        except (AttributeError, NotImplementedError, psutil.AccessDenied):
+            return None
@@ -0,0 +1,190 @@
+import os
+import sys
+import struct
+import hashlib
+from array import array
+
+from starrail.utils.utils import HashCalculator
+
+
+'''
+String Index: a compact on-disk record of the strings decoded from a binary file.
+
+Layout of an index file (little-endian):
+    header          struct INDEX_HEADER (magic, version, min_length, size, mtime_ns, fingerprint, path_len, count)
+    path            utf-8 encoded absolute path of the indexed file
+    string table    all decoded strings, utf-8 encoded and concatenated
+    offsets         count * uint64, byte offset of each string in the indexed file
+    lengths         count * uint32, byte length of each string in the string table
+
+The string table is written first and the arrays last so that an index can be written while the
+strings are still being streamed out of the decoder.
+'''
+
+INDEX_MAGIC     = b"SRSI"
+INDEX_VERSION   = 1
+INDEX_HEADER    = struct.Struct("<4sHHQQ16sII")
+
+
+class StarRailStringIndex:
+    def __init__(self, index_dir=None):
+        if index_dir == None:
+            index_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "string_index")
+        self.index_dir = index_dir
+
+    def load(self, file_path, min_length):
+        """
+        Load the indexed strings of a file.
+
+        :return: list of (offset, string), or None if the file isn't indexed or has changed since
+        """
+        index_path = self.__get_index_path(file_path, min_length)
+        try:
+            with open(index_path, "rb") as rf:
+                index_content = rf.read()
+        except OSError:
+            return None
+
+        if len(index_content) < INDEX_HEADER.size:
+            return None
+
+        magic, version, _, size, mtime_ns, fingerprint, path_len, count = INDEX_HEADER.unpack_from(index_content)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return None
+        if not self.__is_fresh(file_path, size, mtime_ns, fingerprint):
+            return None
+
+        table_start = INDEX_HEADER.size + path_len
+        lengths_start = len(index_content) - count * 4
+        offsets_start = lengths_start - count * 8
+
+        offsets = array("Q", index_content[offsets_start:lengths_start])
+        lengths = array("I", index_content[lengths_start:])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+            lengths.byteswap()
+
+        string_table = memoryview(index_content)[table_start:offsets_start]
+        entries = []
+        position = 0
+        for offset, length in zip(offsets, lengths):
+            entries.append((offset, str(string_table[position:position+length], "utf-8")))
+            position += length
+        return entries
+
+    def writer(self, file_path, min_length):
+        return StarRailStringIndexWriter(self.__get_index_path(file_path, min_length), file_path, min_length)
+
+    def delete(self, file_path, min_length):
+        try:
+            os.remove(self.__get_index_path(file_path, min_length))
+        except OSError:
+            return False
+        return True
+
+    def __get_index_path(self, file_path, min_length):
+        key = f"{os.path.normcase(os.path.abspath(file_path))}|{min_length}"
+        return os.path.join(self.index_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.idx")
+
+    def __is_fresh(self, file_path, size, mtime_ns, fingerprint):
+        # Size and mtime are checked first since they only cost a stat call
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return False
+        return bytes.fromhex(HashCalculator.fingerprint(file_path)) == fingerprint
+
+
+class StarRailStringIndexWriter:
+    """
+    Context manager that writes a string index while the strings are being decoded.
+    The index is only committed (renamed into place) if the block exits without an exception and
+    the indexed file didn't change during decoding. Otherwise the previous index (stale, since the
+    index is only rebuilt on a miss) is removed along with the partial one.
+    """
+    def __init__(self, index_path, file_path, min_length):
+        self.index_path = index_path
+        self.file_path  = file_path
+        self.min_length = min_length
+
+        self.offsets        = array("Q")
+        self.lengths        = array("I")
+        self.stat           = None
+        self.fingerprint    = None
+        self.encoded_path   = None
+        self.wf             = None
+
+    def __enter__(self):
+        self.stat = os.stat(self.file_path)
+        self.fingerprint = bytes.fromhex(HashCalculator.fingerprint(self.file_path))
+        self.encoded_path = os.path.abspath(self.file_path).encode("utf-8")
+
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            self.wf = open(f"{self.index_path}.tmp", "wb")
+            self.wf.write(self.__pack_header())
+            self.wf.write(self.encoded_path)
+        except OSError:
+            # Indexing is best-effort, decoding carries on without it
+            self.wf = None
+        return self
+
+    def add(self, offset, string):
+        if self.wf == None:
+            return
+        encoded_string = string.encode("utf-8")
+        self.offsets.append(offset)
+        self.lengths.append(len(encoded_string))
+        self.wf.write(encoded_string)
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.wf == None:
+            return False
+
+        committed = False
+        try:
+            if exc_type == None and self.__file_unchanged():
+                if sys.byteorder == "big":
+                    self.offsets.byteswap()
+                    self.lengths.byteswap()
+                self.wf.write(self.offsets.tobytes())
+                self.wf.write(self.lengths.tobytes())
+                self.wf.seek(0)
+                self.wf.write(self.__pack_header())
+                committed = True
+        except OSError:
+            committed = False
+        finally:
+            self.wf.close()
+
+        if committed:
+            try:
+                os.replace(f"{self.index_path}.tmp", self.index_path)
+            except OSError:
+                pass
+        else:
+            self.__remove_silently(f"{self.index_path}.tmp")
+            self.__remove_silently(self.index_path)
+        return False
+
+    def __pack_header(self):
+        return INDEX_HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, self.min_length,
+            self.stat.st_size, self.stat.st_mtime_ns, self.fingerprint,
+            len(self.encoded_path), len(self.offsets)
+        )
+
+    def __remove_silently(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __file_unchanged(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return False
+        return stat.st_size == self.stat.st_size and stat.st_mtime_ns == self.stat.st_mtime_ns
@@ -0,0 +1,169 @@
+import os
+import csv
+import math
+import mmap
+import struct
+
+from starrail.utils.status_sampler import GameStatusSample
+from starrail.exceptions.exceptions import StarRailTelemetryFormatException
+
+
+'''
+Telemetry Store: append-only time series of game status samples.
+
+    header      magic, version, field count, sampling interval, creation time (HEADER, 32 bytes)
+    records     one per sample, FIELDS as little-endian float64 (missing values are NaN)
+
+Every record has the same width and only holds doubles, so the file is read through an mmap cast to a
+flat array of doubles: a column is a strided view of it and nothing is loaded into Python objects up
+front. A record cut short by a crash (or read while being written) is ignored by readers, and dropped
+before a writer appends to the file.
+'''
+
+MAGIC       = b"SRTELEM\0"
+VERSION     = 1
+HEADER      = struct.Struct("<8sIIdd")
+FIELDS      = ("timestamp", "pid", "cpu_percent", "rss", "num_threads", "read_count", "write_count", "read_bytes", "write_bytes")
+RECORD      = struct.Struct(f"<{len(FIELDS)}d")
+
+# Cumulative counters, reported as rates (per second) between consecutive samples
+RATE_FIELDS         = ("read_count", "write_count", "read_bytes", "write_bytes")
+HISTOGRAM_BUCKETS   = 2048
+
+
+class TelemetryWriter:
+    def __init__(self, file_path, interval: float, created_time: float):
+        self.file_path = file_path
+        self.records = 0
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+
+        # Only append to a telemetry file of the same format
+        record_count = 0
+        if os.path.isfile(file_path) and os.path.getsize(file_path) > 0:
+            reader = TelemetryReader(file_path)
+            record_count = len(reader)
+            reader.close()
+
+        self.__file = open(file_path, "ab")
+        if self.__file.tell() == 0:
+            self.__file.write(HEADER.pack(MAGIC, VERSION, len(FIELDS), interval, created_time))
+        else:
+            # Drop a record cut short by a crash, the records appended after it would be misaligned
+            self.__file.truncate(HEADER.size + record_count * RECORD.size)
+
+    def append(self, sample: GameStatusSample):
+        self.__file.write(RECORD.pack(*[TelemetryWriter.to_field(getattr(sample, field)) for field in FIELDS]))
+        self.__file.flush()
+        self.records += 1
+
+    def close(self):
+        self.__file.close()
+
+    @staticmethod
+    def to_field(value):
+        return float(value) if value != None else math.nan
+
+
+class TelemetryReader:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.__mmap: mmap.mmap = None
+        self.__values: memoryview = None
+
+        with open(file_path, "rb") as rf:
+            header = rf.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise StarRailTelemetryFormatException("truncated header")
+            magic, version, field_count, self.interval, self.created_time = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION or field_count != len(FIELDS):
+                raise StarRailTelemetryFormatException(f"bad header in {os.path.basename(file_path)}")
+
+            self.record_count = (os.fstat(rf.fileno()).st_size - HEADER.size) // RECORD.size
+            if self.record_count > 0:
+                self.__mmap = mmap.mmap(rf.fileno(), 0, access=mmap.ACCESS_READ)
+                self.__values = memoryview(self.__mmap)[HEADER.size:HEADER.size + self.record_count * RECORD.size].cast("d")
+
+    def __len__(self):
+        return self.record_count
+
+    def close(self):
+        if self.__values != None:
+            self.__values.release()
+            self.__values = None
+        if self.__mmap != None:
+            self.__mmap.close()
+            self.__mmap = None
+
+    def get_record(self, index):
+        """
+        :return: list of the record's FIELDS values
+        """
+        return self.__values[index * len(FIELDS):(index + 1) * len(FIELDS)].tolist()
+
+    def iter_column(self, field):
+        """
+        Values of one field, in time order, read straight from the mapped file (NaN if missing).
+        """
+        if self.record_count == 0:
+            return iter(())
+        return iter(self.__values[FIELDS.index(field)::len(FIELDS)])
+
+    def iter_rate(self, field):
+        """
+        Per second rate of a cumulative field between consecutive samples of the same process.
+        """
+        previous = None
+        for timestamp, pid, value in zip(self.iter_column("timestamp"), self.iter_column("pid"), self.iter_column(field)):
+            if previous != None and previous[1] == pid and timestamp > previous[0] and not math.isnan(value):
+                yield max(0.0, (value - previous[2]) / (timestamp - previous[0]))
+            previous = (timestamp, pid, value)
+
+    def get_stats(self, values_factory, percentiles=(50, 90, 99)):
+        """
+        Count, min, mean, max and percentiles of a series, in two streaming passes (range, then a histogram
+        of HISTOGRAM_BUCKETS buckets). Percentiles are interpolated within their bucket, so they are exact
+        to (max - min) / HISTOGRAM_BUCKETS.
+
+        :param values_factory: callable returning a fresh iterator over the series (e.g. lambda: reader.iter_column("rss"))
+        :return: dict of "count", "min", "mean", "max" and "p<N>", or None if the series has no values
+        """
+        count, total, low, high = 0, 0.0, math.inf, -math.inf
+        for value in values_factory():
+            if value == value:  # Not NaN
+                count += 1
+                total += value
+                low = value if value < low else low
+                high = value if value > high else high
+        if count == 0:
+            return None
+
+        stats = {"count": count, "min": low, "mean": total / count, "max": high}
+        if high == low:
+            stats.update({f"p{percentile}": low for percentile in percentiles})
+            return stats
+
+        histogram = [0] * HISTOGRAM_BUCKETS
+        scale = HISTOGRAM_BUCKETS / (high - low)
+        for value in values_factory():
+            if value == value:
+                histogram[min(int((value - low) * scale), HISTOGRAM_BUCKETS - 1)] += 1
+
+        for percentile in percentiles:
+            rank, seen = percentile / 100 * count, 0
+            for bucket, bucket_count in enumerate(histogram):
+                if seen + bucket_count >= rank and bucket_count > 0:
+                    stats[f"p{percentile}"] = low + (bucket + (rank - seen) / bucket_count) / scale
+                    break
+                seen += bucket_count
+        return stats
+
+    def export_csv(self, csv_path):
+        """
+        Write every record as a CSV row (missing values left empty), one record at a time.
+        """
+        with open(csv_path, "w", newline="") as wf:
+            writer = csv.writer(wf)
+            writer.writerow(FIELDS)
+            for index in range(self.record_count):
+                writer.writerow(["" if value != value else (int(value) if value.is_integer() else value) for value in self.get_record(index)])
+        return self.record_count
@@ -0,0 +1,42 @@
+import sys
+from typing import List
+
+from starrail.constants import CURSOR_UP_ANSI
+
+
+CLEAR_LINE_ANSI     = "\033[2K"
+CURSOR_DOWN_ANSI    = "\033[B"
+
+
+class IncrementalRenderer:
+    '''
+    Redraws a block of lines in place, only rewriting the lines that changed since the previous frame.
+    Each frame is written to the terminal in a single write.
+    '''
+    def __init__(self, stream=None):
+        self.stream = stream if stream != None else sys.stdout
+        self.lines_written = 0  # Lines rewritten so far (unchanged lines are skipped)
+        self.__previous_lines: list[str] = None
+
+    def render(self, lines: List[str]):
+        output = []
+        if self.__previous_lines == None:
+            output = [line + "\n" for line in lines]
+            self.lines_written += len(lines)
+        else:
+            # Back to the top of the previous frame, the block grows if the new frame is taller
+            output.append(CURSOR_UP_ANSI * len(self.__previous_lines))
+            line_count = max(len(lines), len(self.__previous_lines))
+            for index in range(line_count):
+                line = lines[index] if index < len(lines) else ""
+                previous_line = self.__previous_lines[index] if index < len(self.__previous_lines) else None
+                if line == previous_line:
+                    output.append(CURSOR_DOWN_ANSI)
+                else:
+                    output.append("\r" + CLEAR_LINE_ANSI + line + ("\n" if index >= len(self.__previous_lines) - 1 else CURSOR_DOWN_ANSI + "\r"))
+                    self.lines_written += 1
+            lines = lines + [""] * (line_count - len(lines))
+
+        self.stream.write("".join(output))
+        self.stream.flush()
+        self.__previous_lines = list(lines)
@@ -30,8 +30,6 @@ from datetime import datetime
 from enum import Enum
 import pyautogui
 import platform
-from concurrent import futures
-from multiprocessing import Manager
 import hashlib
 import readline
 
@@ -193,48 +191,6 @@ def bool_to_str(boolean: bool, true_text="Running", false_text="Not Running"):
     return Printer.to_lightred(f"{CROSSMARK} {false_text}")
 
 
-
-class StarRailGameDetector:
-    """
-    Honkai Star Rail Game Detector - Finds the game on local drives
-    """
-    def get_local_drives(self):
-        available_drives = ['%s:' % d for d in string.ascii_uppercase if os.path.exists('%s:' % d)]
-        return available_drives
-
-    def find_game_in_path(self, path, name, stop_flag):
-        for root, _, files in os.walk(path):
-            if stop_flag.value: # Check the shared flag value.
-                return None
-            if name in files:
-                return os.path.join(root, name)
-        return None
-
-    def find_game(self, paths=[], name=GAME_FILENAME):
-        for p in paths:
-            if not os.path.exists(p):
-                raise StarRailBaseException(f"Path does not exist. [{p}]")
-
-        if len(paths) == 0:
-            paths = self.get_local_drives()
-
-        paths = [f"{path}\\" if path.endswith(":") and len(path) == 2 else path for path in paths]
-
-        worker_threads = 1
-        if os.cpu_count() > 1:
-            worker_threads = os.cpu_count() - 1
-
-        with futures.ProcessPoolExecutor(max_workers=worker_threads) as executor, Manager() as manager:
-            stop_flag = manager.Value('b', False)   # Create a boolean shared flag.
-            future_to_path = {executor.submit(self.find_game_in_path, path, name, stop_flag): path for path in paths}
-            for future in futures.as_completed(future_to_path):
-                result = future.result()
-                if result is not None:
-                    stop_flag.value = True # Set the flag to true when a result is found.
-                    return result
-        return None
-
-
 class StarRailScreenshotController:
     """
     Honkai Star Rail Screenshot Controller - Takes and stores in-game screenshots for processing
@@ -370,6 +326,31 @@ class HashCalculator:
             for byte_block in iter(lambda: f.read(4096), b""):
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
+
+    @staticmethod
+    def fingerprint(file_path: str, sample_size: int = 65536):
+        """
+        Fast content fingerprint of a file (not a full-content hash). Hashes the file size together
+        with the first, middle and last `sample_size` bytes, so the cost is constant per file.
+        """
+        file_size = os.path.getsize(file_path)
+        blake2b_hash = hashlib.blake2b(str(file_size).encode(), digest_size=16)
+        with open(file_path, "rb") as f:
+            for offset in sorted({0, max(0, file_size // 2 - sample_size // 2), max(0, file_size - sample_size)}):
+                f.seek(offset)
+                blake2b_hash.update(f.read(sample_size))
+        return blake2b_hash.hexdigest()
+
+    @staticmethod
+    def chunk_fingerprints(binary_content, chunk_size: int):
+        """
+        Content hash of every `chunk_size` bytes of a buffer (bytes or mmap), so that the chunks that
+        changed can be told apart. Only one chunk is held in memory at a time.
+        """
+        return [
+            hashlib.blake2b(binary_content[offset:offset + chunk_size], digest_size=8).hexdigest()
+            for offset in range(0, len(binary_content), chunk_size)
+        ]
     
     
     
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import importlib.util
+
+'''
+Benchmark of the game detector's filesystem crawl on a synthetic directory tree (runs on any platform).
+
+Builds a deep tree under a temp directory, with the game file at the bottom of one branch and a few
+directories the crawler prunes, then measures the crawl throughput (directories listed per second)
+against a plain os.walk. Exits with status 1 if the throughput is under --min-rate, so it can be used
+as a regression test:
+
+    python tests/benchmark_game_detector.py --depth 6 --fanout 4 --min-rate 5000
+'''
+
+# The crawler only depends on the standard library, it is loaded directly so the benchmark doesn't
+# need the package's Windows-only dependencies.
+CRAWLER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "starrail", "utils", "directory_crawler.py")
+PRUNE_DIRS = {"node_modules", ".git"}
+GAME_FILENAME = "StarRail.exe"
+
+
+def load_crawler_class():
+    spec = importlib.util.spec_from_file_location("directory_crawler", CRAWLER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.StarRailDirectoryCrawler
+
+
+def build_tree(root, depth, fanout, files_per_dir):
+    # Full tree of `fanout` subdirectories per level, the game file in the last leaf directory
+    directory_count = 0
+    level = [root]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for index in range(fanout):
+                directory = os.path.join(parent, f"dir_{index}")
+                os.mkdir(directory)
+                for file_index in range(files_per_dir):
+                    open(os.path.join(directory, f"file_{file_index}.dat"), "w").close()
+                next_level.append(directory)
+        directory_count += len(next_level)
+        level = next_level
+
+    # Pruned trees, never listed by the crawler
+    for prune_dir in PRUNE_DIRS:
+        os.makedirs(os.path.join(root, prune_dir, "nested", "deeper"))
+
+    game_dir = os.path.join(level[-1], "Star Rail Games")
+    os.mkdir(game_dir)
+    open(os.path.join(game_dir, GAME_FILENAME), "w").close()
+    return directory_count + 2, os.path.join(game_dir, GAME_FILENAME)
+
+
+def run_benchmark(args):
+    crawler_class = load_crawler_class()
+    root = tempfile.mkdtemp(prefix="starrail_bench_")
+    try:
+        build_start = time.perf_counter()
+        directory_count, game_path = build_tree(root, args.depth, args.fanout, args.files)
+        print(f"Built {directory_count} directories in {time.perf_counter() - build_start:.2f}s ({root})")
+
+        best_crawl, best_walk = None, None
+        for _ in range(args.repeat):
+            crawler = crawler_class(args.workers, PRUNE_DIRS)
+            start = time.perf_counter()
+            matches = crawler.crawl([root], GAME_FILENAME)
+            elapsed = time.perf_counter() - start
+            if matches != [game_path]:
+                print(f"FAILED: crawler found {matches}, expected [{game_path}]")
+                return 1
+            best_crawl = elapsed if best_crawl == None else min(best_crawl, elapsed)
+
+            start = time.perf_counter()
+            walked = sum(1 for _ in os.walk(root))
+            best_walk = (time.perf_counter() - start) if best_walk == None else min(best_walk, time.perf_counter() - start)
+
+        crawl_rate = crawler.listed_dirs / best_crawl
+        print(f"Crawler ({crawler.workers} workers): {crawler.listed_dirs} directories in {best_crawl:.3f}s, {crawl_rate:,.0f} dirs/s")
+        print(f"os.walk baseline:     {walked} directories in {best_walk:.3f}s, {walked / best_walk:,.0f} dirs/s")
+
+        if args.min_rate != None and crawl_rate < args.min_rate:
+            print(f"FAILED: crawl throughput {crawl_rate:,.0f} dirs/s is under the minimum {args.min_rate:,.0f} dirs/s")
+            return 1
+        return 0
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game detector's filesystem crawl on a synthetic tree")
+    parser.add_argument("--depth", type=int, default=6, help="Depth of the tree.")
+    parser.add_argument("--fanout", type=int, default=4, help="Subdirectories per directory.")
+    parser.add_argument("--files", type=int, default=2, help="Files per directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Crawler worker threads (default: crawler default).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best one is kept.")
+    parser.add_argument("--min-rate", type=float, default=None, help="Minimum crawl throughput (dirs/s), fails under it.")
+    sys.exit(run_benchmark(parser.parse_args()))
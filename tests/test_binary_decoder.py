@@ -0,0 +1,111 @@
+import random
+
+from starrail.utils import binary_decoder
+from starrail.utils.binary_decoder import StarRailBinaryDecoder, StarRailStringEncoding, decode_byte_range, extract_multi_encoding_strings
+
+
+SIMPLIFIED_CHINESE  = "公告活动内容更新说明"
+TRADITIONAL_CHINESE = "開拓者們請注意本次版本更新內容"
+JAPANESE            = "崩壊スターレイルの世界へようこそ"
+
+
+def extract(binary_content):
+    return [(offset, string, encoding) for offset, string, encoding in extract_multi_encoding_strings(binary_content)]
+
+
+def test_utf16be_cjk_after_non_nul_byte():
+    # The LE reading from the previous byte is just as long, only the BE reading gives real text
+    for text in (SIMPLIFIED_CHINESE, TRADITIONAL_CHINESE, JAPANESE):
+        binary_content = b"\x01" + text.encode("utf-16-be") + b"\x01"
+        assert extract(binary_content) == [(1, text, StarRailStringEncoding.UTF16BE)]
+
+
+def test_utf16le_cjk_before_non_nul_byte():
+    for text in (SIMPLIFIED_CHINESE, TRADITIONAL_CHINESE, JAPANESE):
+        binary_content = b"\x4f" + text.encode("utf-16-le") + b"\x52"
+        assert extract(binary_content) == [(1, text, StarRailStringEncoding.UTF16LE)]
+
+
+def test_utf16_mixed_ascii_and_cjk():
+    binary_content = b"\x00\x01hello world\x00" + "版本2.0更新公告".encode("utf-16-le") + b"\x00\x00"
+    assert extract(binary_content) == [
+        (2, "hello world", StarRailStringEncoding.ASCII),
+        (14, "版本2.0更新公告", StarRailStringEncoding.UTF16LE)
+    ]
+
+
+def test_utf16_ascii_byte_order():
+    # A NUL-preceded LE string reads the same as BE, LE wins the tie
+    assert extract(b"\x00" + "Hello LE string".encode("utf-16-le") + b"\x00\x00") == [(1, "Hello LE string", StarRailStringEncoding.UTF16LE)]
+
+
+def test_utf16_noncharacters_excluded():
+    binary_content = "Hello UTF16 BE string".encode("utf-16-be") + b"\xff\xff"
+    assert extract(binary_content) == [(0, "Hello UTF16 BE string", StarRailStringEncoding.UTF16BE)]
+
+
+def test_utf8_text():
+    binary_content = b"\x07" + SIMPLIFIED_CHINESE.encode("utf-8") + b"\x07" + "Café au lait".encode("utf-8") + b"\x00" + "Привет мир".encode("utf-8")
+    assert extract(binary_content) == [
+        (1, SIMPLIFIED_CHINESE, StarRailStringEncoding.UTF8),
+        (32, "Café au lait", StarRailStringEncoding.UTF8),
+        (46, "Привет мир", StarRailStringEncoding.UTF8)
+    ]
+
+
+def test_utf8_non_text_keeps_ascii():
+    # A stray non-ASCII character doesn't make a string, the ASCII run within it is still found
+    binary_content = b"\x00" + "abcdefghijߖ".encode("utf-8") + b"\x00"
+    assert extract(binary_content) == [(1, "abcdefghij", StarRailStringEncoding.ASCII)]
+
+
+def test_random_bytes():
+    binary_content = random.Random(0).getrandbits(8 << 20).to_bytes(1 << 20, "little")
+    results = extract(binary_content)
+    non_ascii_results = [result for result in results if result[2] != StarRailStringEncoding.ASCII]
+    # Random bytes still give ASCII runs (as they do with the ASCII decoder), but only a handful of
+    # non-ASCII strings (this 1 MiB used to give about 100 UTF-16 and 250 UTF-8 strings)
+    assert len(non_ascii_results) < 20
+
+
+def make_straddling_content(range_size, range_count):
+    # A string across every range boundary, plus strings ending right before and starting right at it
+    rng = random.Random(1)
+    binary_content = bytearray(rng.getrandbits(8) & 0x1f for _ in range(range_size * range_count))
+    for boundary in range(range_size, range_size * range_count, range_size):
+        offset = rng.randrange(1, 12)
+        binary_content[boundary - offset : boundary + 12] = b"s" * (offset + 12)
+        binary_content[boundary - 40 : boundary - 20] = b"e" * 20
+        binary_content[boundary + 20 : boundary + 40] = b"b" * 20
+    # One string longer than a whole range
+    binary_content[range_size // 2 : range_size * 2 + 50] = b"L" * (range_size * 3 // 2 + 50)
+    return bytes(binary_content)
+
+
+def test_decode_byte_range_every_split(tmp_path):
+    binary_content = b"\x00abcdefghij\x01klmnopqrstuvwxyz\x02\x03ABCDEFGH\x04short\x05" + b"0123456789" * 4
+    file_path = tmp_path / "content.bin"
+    file_path.write_bytes(binary_content)
+
+    serial = list(StarRailBinaryDecoder().stream_raw_binary_file_with_offsets(str(file_path), 8))
+    for split in range(len(binary_content) + 1):
+        split_results = decode_byte_range(str(file_path), 8, 0, split) + decode_byte_range(str(file_path), 8, split, len(binary_content))
+        assert split_results == serial, split
+
+
+def test_parallel_decode_matches_serial(tmp_path, monkeypatch):
+    range_size = 1024
+    file_path = tmp_path / "content.bin"
+    file_path.write_bytes(make_straddling_content(range_size, 16))
+
+    decoder = StarRailBinaryDecoder()
+    serial = list(decoder.stream_raw_binary_file_with_offsets(str(file_path), 8))
+    assert any(offset < range_size < offset + len(string) for offset, string in serial)
+
+    monkeypatch.setattr(binary_decoder, "MIN_PARALLEL_DECODE_RANGE_SIZE", range_size / 1024 / 1024)
+    for jobs in (2, 3, 7, 16):
+        assert list(decoder.stream_raw_binary_file_with_offsets(str(file_path), 8, jobs=jobs)) == serial, jobs
+
+    start = range_size + 5
+    serial_from_start = [result for result in serial if result[0] >= start]
+    assert list(decoder.stream_raw_binary_file_with_offsets(str(file_path), 8, jobs=4, start=start)) == serial_from_start
@@ -0,0 +1,87 @@
+import struct
+
+from starrail.utils.binary_record_reader import StarRailBinaryRecordReader
+from starrail.controllers.streaming_assets_controller import StarRailStreamingAssetsController, StarRailStreamingAssetsBinaryFile
+
+
+BINARY_VERSION_FIELDS = [
+    "V2.3Live",
+    "20240607-2202",
+    "7102406012-2012-V2.3Live-7123455-CNPRODWin2.3.0-CnLive-v2",
+    "StartAsset",
+    "StartDesignData"
+]
+CLIENT_CONFIG_FIELDS = [
+    "com.miHoYo.hkrpg",
+    "https://globaldp-prod-cn01.bhsr.com/query_dispatch",
+    "CnLive"
+]
+
+
+def serialize(fields):
+    return b"".join(struct.pack(">H", len(field.encode("utf-8"))) + field.encode("utf-8") for field in fields)
+
+
+class SampleConfig:
+    def __init__(self, innr_path):
+        self.innr_path = innr_path
+
+
+def make_controller(tmp_path, file_contents: dict):
+    streaming_assets_dir = tmp_path / "StarRail_Data" / "StreamingAssets"
+    streaming_assets_dir.mkdir(parents=True)
+    for sa_binary_file, binary_content in file_contents.items():
+        (streaming_assets_dir / sa_binary_file.value).write_bytes(binary_content)
+
+    controller = StarRailStreamingAssetsController(SampleConfig(str(tmp_path)))
+    controller.metadata_cache.config_file = str(tmp_path / "metadata_cache.json")
+    controller.binary_decoder.string_index.index_dir = str(tmp_path / "string_index")
+    return controller
+
+
+def test_read_fields():
+    binary_content = serialize(BINARY_VERSION_FIELDS)
+    fields = StarRailBinaryRecordReader(binary_content).read_fields()
+    assert [field for _, field in fields] == BINARY_VERSION_FIELDS
+    assert fields[1][0] == 2 + len(BINARY_VERSION_FIELDS[0]) + 2
+
+
+def test_read_fields_mismatch():
+    valid_content = serialize(CLIENT_CONFIG_FIELDS)
+    assert StarRailBinaryRecordReader(b"").read_fields() == None
+    assert StarRailBinaryRecordReader(valid_content[:-1]).read_fields() == None            # Last field truncated
+    assert StarRailBinaryRecordReader(valid_content + b"\x00").read_fields() == None       # Trailing byte
+    assert StarRailBinaryRecordReader(b"\x00\x04ab\x01c").read_fields() == None            # Unprintable field
+    # Little-endian prefixes aren't the layout ("\x10\x00" reads as a 4096 byte field)
+    little_endian_content = b"".join(struct.pack("<H", len(field)) + field.encode() for field in CLIENT_CONFIG_FIELDS)
+    assert StarRailBinaryRecordReader(little_endian_content).read_fields() == None
+
+
+def test_read_streaming_assets(tmp_path):
+    controller = make_controller(tmp_path, {
+        StarRailStreamingAssetsBinaryFile.SA_BinaryVersion: serialize(BINARY_VERSION_FIELDS),
+        StarRailStreamingAssetsBinaryFile.SA_ClientConfig: serialize(CLIENT_CONFIG_FIELDS)
+    })
+
+    binary_version = controller.read_streaming_assets(StarRailStreamingAssetsBinaryFile.SA_BinaryVersion)
+    assert binary_version.version == "V2.3Live"
+    assert binary_version.datetime_string == "20240607-2202"
+    assert binary_version.detailed_version == BINARY_VERSION_FIELDS[2]
+    assert binary_version.other == ["StartAsset", "StartDesignData"]
+
+    client_config = controller.read_streaming_assets(StarRailStreamingAssetsBinaryFile.SA_ClientConfig)
+    assert client_config.application_identifier == "com.miHoYo.hkrpg"
+    assert client_config.service_endpoints == ["https://globaldp-prod-cn01.bhsr.com/query_dispatch"]
+    assert client_config.unknown == ["CnLive"]
+
+
+def test_string_extractor_fallback(tmp_path):
+    # NUL separated strings don't follow the layout, the strings are extracted and classified by the regex rules instead
+    binary_content = b"\x00\x00\x01\x07".join(field.encode() for field in BINARY_VERSION_FIELDS)
+    controller = make_controller(tmp_path, {StarRailStreamingAssetsBinaryFile.SA_BinaryVersion: binary_content})
+
+    assert controller.read_streaming_assets(StarRailStreamingAssetsBinaryFile.SA_BinaryVersion) == None
+    binary_version = controller.get_decoded_streaming_assets(StarRailStreamingAssetsBinaryFile.SA_BinaryVersion)
+    assert binary_version.version == "V2.3Live"
+    assert binary_version.datetime_string == "20240607-2202"
+    assert binary_version.detailed_version == BINARY_VERSION_FIELDS[2]
@@ -0,0 +1,164 @@
+import struct
+
+import pytest
+
+from starrail.exceptions.exceptions import StarRailWebCacheFormatException
+from starrail.utils.chromium_cache_parser import (
+    BLOCK_HEADER_SIZE, BLOCK_MAGIC, ENTRY_STORE, INDEX_HEADER, INDEX_HEADER_SIZE, INDEX_MAGIC,
+    WINDOWS_EPOCH_OFFSET, ChromiumBlockfileCacheParser
+)
+
+
+TABLE_LEN       = 16
+BLOCK_256       = 2
+BLOCK_1K        = 3
+BLOCK_SIZE      = {BLOCK_256: 256, BLOCK_1K: 1024}
+RESPONSE_TIME   = 1700000100
+
+
+def make_address(file_type, file_number, start_block, num_blocks=1):
+    return 0x80000000 | file_type << 28 | (num_blocks - 1) << 24 | file_number << 16 | start_block
+
+
+def to_cache_time(epoch):
+    return (epoch + WINDOWS_EPOCH_OFFSET) * 1000000
+
+
+def make_response_info(status_line, headers):
+    raw_headers = b"\0".join([status_line.encode()] + [f"{name}: {value}".encode() for name, value in headers.items()]) + b"\0\0"
+    payload = struct.pack("<iqqi", 0, to_cache_time(RESPONSE_TIME - 1), to_cache_time(RESPONSE_TIME), len(raw_headers)) + raw_headers
+    return struct.pack("<I", len(payload)) + payload
+
+
+class SyntheticCache:
+    '''
+    Builds a blockfile cache: index + data_1 (BLOCK_256, entries) + data_2 (BLOCK_1K, keys and stream data).
+    '''
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.table = [0] * TABLE_LEN
+        self.blocks = {1: bytearray(), 2: bytearray()}
+        self.index_magic = INDEX_MAGIC
+
+    def add_data(self, content, file_number=2, file_type=BLOCK_1K):
+        block_size = BLOCK_SIZE[file_type]
+        num_blocks = -(-len(content) // block_size)
+        blocks = self.blocks[file_number]
+        address = make_address(file_type, file_number, len(blocks) // block_size, num_blocks)
+        blocks += content.ljust(num_blocks * block_size, b"\0")
+        return address
+
+    def add_entry(self, bucket, key, creation_epoch, response_info=None, long_key=False, entry_blocks=1, state=0, next_address=0):
+        raw_key = key.encode()
+        long_key_address = self.add_data(raw_key) if long_key else 0
+        data_sizes = [0] * 4
+        data_addrs = [0] * 4
+        if response_info != None:
+            data_sizes[0] = len(response_info)
+            data_addrs[0] = self.add_data(response_info)
+
+        entry_store = ENTRY_STORE.pack(
+            0, next_address, 0, 0, 0, state, to_cache_time(creation_epoch), len(raw_key), long_key_address,
+            *data_sizes, *data_addrs, 0, 0, 0, 0, 0, 0
+        )
+        content = entry_store if long_key else entry_store + raw_key
+        assert len(content) <= entry_blocks * 256
+        address = self.add_data(content.ljust(entry_blocks * 256, b"\0"), file_number=1, file_type=BLOCK_256)
+        if bucket != None:
+            self.table[bucket] = address
+        return address
+
+    def write(self):
+        index_header = INDEX_HEADER.pack(self.index_magic, 0x30000, 0, 0, 2, 0, 0, TABLE_LEN).ljust(INDEX_HEADER_SIZE, b"\0")
+        with open(self.cache_dir / "index", "wb") as wf:
+            wf.write(index_header + struct.pack(f"<{TABLE_LEN}I", *self.table))
+        for file_number, blocks in self.blocks.items():
+            with open(self.cache_dir / f"data_{file_number}", "wb") as wf:
+                wf.write(struct.pack("<I", BLOCK_MAGIC).ljust(BLOCK_HEADER_SIZE, b"\0") + blocks)
+        return str(self.cache_dir)
+
+
+def test_parse_entries_and_response_info(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    response_info = make_response_info("HTTP/1.1 200 OK", {"Content-Type": "text/html", "Server": "nginx"})
+    cache.add_entry(3, "1/0/https://example.com/page", 1700000000, response_info=response_info)
+
+    entries = ChromiumBlockfileCacheParser(cache.write()).parse()
+    assert len(entries) == 1
+    assert entries[0].url == "https://example.com/page"
+    assert entries[0].creation_time == 1700000000
+    assert entries[0].response_time == RESPONSE_TIME
+    assert entries[0].status_line == "HTTP/1.1 200 OK"
+    assert entries[0].headers == {"content-type": "text/html", "server": "nginx"}
+
+
+def test_collision_chain_walk(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    tail = cache.add_entry(None, "https://example.com/3", 1700000003)
+    middle = cache.add_entry(None, "https://example.com/2", 1700000002, next_address=tail)
+    cache.add_entry(5, "https://example.com/1", 1700000001, next_address=middle)
+    cache.add_entry(9, "https://example.com/0", 1700000000)
+    # Evicted entries are skipped but their chain is still followed
+    chained = cache.add_entry(None, "https://example.com/4", 1700000004)
+    cache.add_entry(11, "https://example.com/doomed", 1700000005, state=1, next_address=chained)
+
+    entries = ChromiumBlockfileCacheParser(cache.write()).parse()
+    assert [entry.url for entry in entries] == [f"https://example.com/{index}" for index in range(5)]
+
+
+def test_looping_chain_terminates(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    address = make_address(BLOCK_256, 1, 0)
+    cache.add_entry(0, "https://example.com/loop", 1700000000, next_address=address)
+
+    entries = ChromiumBlockfileCacheParser(cache.write()).parse()
+    assert [entry.url for entry in entries] == ["https://example.com/loop"]
+
+
+def test_long_keys(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    inline_key = "https://example.com/inline/" + "a" * 300     # Inline key spanning two entry blocks
+    long_key = "https://example.com/long/" + "b" * 1500       # Stored in its own 2 block data_2 record
+    cache.add_entry(1, inline_key, 1700000000, entry_blocks=2)
+    cache.add_entry(2, long_key, 1700000001, long_key=True)
+
+    entries = ChromiumBlockfileCacheParser(cache.write()).parse()
+    assert [entry.key for entry in entries] == [inline_key, long_key]
+
+
+def test_known_entries_skipped(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    known = cache.add_entry(1, "https://example.com/known", 1700000000)
+    reused = cache.add_entry(2, "https://example.com/reused", 1700000005)
+    cache.add_entry(3, "https://example.com/new", 1700000001)
+
+    parser = ChromiumBlockfileCacheParser(cache.write())
+    # The reused block holds a different entry (other creation time) than the one read before
+    entries = parser.parse({known: 1700000000, reused: 1600000000})
+    assert [entry.url for entry in entries] == ["https://example.com/new", "https://example.com/reused"]
+    assert parser.known_addresses == [known]
+
+
+def test_bad_index_magic(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    cache.add_entry(0, "https://example.com/", 1700000000)
+    cache.index_magic = 0xDEADBEEF
+
+    with pytest.raises(StarRailWebCacheFormatException):
+        ChromiumBlockfileCacheParser(cache.write()).parse()
+
+
+def test_bad_block_file_magic(tmp_path):
+    cache = SyntheticCache(tmp_path)
+    cache.add_entry(0, "https://example.com/", 1700000000)
+    cache_dir = cache.write()
+    with open(tmp_path / "data_1", "r+b") as wf:
+        wf.write(struct.pack("<I", 0))
+
+    with pytest.raises(StarRailWebCacheFormatException):
+        ChromiumBlockfileCacheParser(cache_dir).parse()
+
+
+def test_missing_index(tmp_path):
+    with pytest.raises(StarRailWebCacheFormatException):
+        ChromiumBlockfileCacheParser(str(tmp_path)).parse()
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+
+from starrail.automation.units import execution_plan
+from starrail.automation.units.action import KeyboardAction, MouseAction, ScrollAction
+from starrail.automation.units.execution_plan import (
+    OP_CLICK, OP_KEY, OP_MOVE, OP_SCROLL, ExecutionPlan, ExecutionTiming
+)
+
+
+RECORDED_WINDOW = {"width": 1000, "height": 500, "top": 0, "left": 0, "is_fullscreen": False}
+CURRENT_WINDOW  = {"width": 2000, "height": 1000, "top": 100, "left": 50, "is_fullscreen": False}
+
+
+class FakePyautogui:
+    def __init__(self, events):
+        self.events = events
+
+    def moveTo(self, x, y, duration=0):
+        self.events.append(("move", x, y))
+
+    def mouseDown(self):
+        self.events.append(("down",))
+
+    def mouseUp(self):
+        self.events.append(("up",))
+
+    def scroll(self, amount):
+        self.events.append(("scroll", amount))
+
+
+class FakeKeyboard:
+    def __init__(self, events):
+        self.events = events
+
+    def press(self, key):
+        self.events.append(("press", key))
+
+    def release(self, key):
+        self.events.append(("release", key))
+
+
+@pytest.fixture
+def events(monkeypatch):
+    recorded_events = []
+    monkeypatch.setattr(execution_plan, "pyautogui", FakePyautogui(recorded_events))
+    return recorded_events
+
+
+def make_actions():
+    return [
+        MouseAction((100, 100), 0.01, True, RECORDED_WINDOW),
+        KeyboardAction("a", 0.02, 0.06),
+        MouseAction((500, 250), 0.01, False, RECORDED_WINDOW),
+        ScrollAction((10, 20), 0, -3, 0.01, RECORDED_WINDOW),
+        MouseAction((7, 8), 0.01, True, dict()),     # Recorded before the pixel calculator
+    ]
+
+
+def test_compile():
+    actions = make_actions()
+    plan = ExecutionPlan.compile(actions, global_delay=0.005, window_info=CURRENT_WINDOW)
+
+    assert len(plan) == 5
+    assert list(plan.op_codes) == [OP_CLICK, OP_KEY, OP_MOVE, OP_SCROLL, OP_CLICK]
+    # The key's hold time delays the actions after it
+    assert list(plan.target_times) == pytest.approx([0.015, 0.04, 0.115, 0.13, 0.145])
+    # Transformed to the current window, except the scroll and the untransformable action
+    assert list(zip(plan.xs, plan.ys)) == [(250, 300), (0, 0), (1050, 600), (10, 20), (7, 8)]
+    assert plan.keys == (None, "a", None, None, None)
+    assert list(plan.values) == [0, 0.06, 0, -3, 0]
+    assert plan.untransformed_count == 1
+
+    # The actions themselves are left untouched
+    assert actions[0].coordinate == (100, 100)
+
+
+def test_compile_without_window_keeps_coordinates():
+    plan = ExecutionPlan.compile(make_actions())
+    assert list(zip(plan.xs, plan.ys))[:3] == [(100, 100), (0, 0), (500, 250)]
+
+
+def test_compile_rejects_unknown_action():
+    with pytest.raises(Exception):
+        ExecutionPlan.compile([object()])
+
+
+def test_run(events):
+    plan = ExecutionPlan.compile(make_actions(), window_info=CURRENT_WINDOW)
+    progress = []
+
+    timing = plan.run(FakeKeyboard(events), on_action=progress.append)
+    assert progress == [0, 1, 2, 3, 4]
+    assert events == [
+        ("move", 250, 300), ("down",), ("up",),
+        ("press", "a"), ("release", "a"),
+        ("move", 1050, 600),
+        ("move", 10, 20), ("scroll", -3),
+        ("move", 7, 8), ("down",), ("up",),
+    ]
+    assert timing.count == 5
+
+
+def test_run_deadlines_absorb_execution_time(events, monkeypatch):
+    # Each click takes CLICK_HOLD_TIME, the deadlines don't move: the next wait is shortened instead
+    monkeypatch.setattr(execution_plan, "CLICK_HOLD_TIME", 0.03)
+    actions = [MouseAction((0, 0), 0.05, True, dict()) for _ in range(5)]
+    plan = ExecutionPlan.compile(actions)
+
+    start_time = time.perf_counter()
+    timing = plan.run(FakeKeyboard(events))
+    elapsed = time.perf_counter() - start_time
+
+    # 5 * 0.05 s of delays, the hold times are absorbed (only the last one adds up)
+    assert 0.25 <= elapsed < 0.25 + 0.03 + 0.1
+    assert timing.max < 0.05
+
+
+def test_wait_until():
+    deadline = time.perf_counter() + 0.02
+    ExecutionPlan.wait_until(deadline)
+    assert time.perf_counter() >= deadline
+
+    # A passed deadline returns at once
+    start_time = time.perf_counter()
+    ExecutionPlan.wait_until(start_time - 1)
+    assert time.perf_counter() - start_time < 0.01
+
+
+def test_execution_timing():
+    timing = ExecutionTiming([0.001 * index for index in range(1, 101)])
+    assert timing.count == 100
+    assert timing.mean == pytest.approx(0.0505)
+    assert timing.p99 == pytest.approx(0.099)
+    assert timing.max == pytest.approx(0.1)
+    assert "actions=100" in repr(timing)
+
+    empty_timing = ExecutionTiming([])
+    assert (empty_timing.count, empty_timing.mean, empty_timing.p99, empty_timing.max) == (0, 0, 0, 0)
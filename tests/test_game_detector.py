@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from starrail.constants import GAME_FILENAME, MIN_WEAK_MATCH_EXE_SIZE
+from starrail.utils.directory_crawler import StarRailDirectoryCrawler
+from starrail.utils.game_detector import StarRailGameDetector, StarRailDetectionStrategy
+
+
+def make_file(path, size=0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as wf:
+        wf.truncate(size)
+    return str(path)
+
+
+def make_tree(root, depth, fanout):
+    # Full tree of `fanout` subdirectories per level, -> number of directories created
+    directory_count = 0
+    level = [str(root)]
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for index in range(fanout):
+                directory = os.path.join(parent, f"dir_{index}")
+                os.makedirs(directory)
+                next_level.append(directory)
+        directory_count += len(next_level)
+        level = next_level
+    return directory_count
+
+
+def make_detector(tmp_path):
+    detector = StarRailGameDetector()
+    detector.install_index.config_file = str(tmp_path / "install_index.json")
+    return detector
+
+
+GAME_FILE_SIZE = int(MIN_WEAK_MATCH_EXE_SIZE * 1024 * 1024) + 1
+
+
+def test_crawl_finds_all_matches(tmp_path):
+    make_tree(tmp_path / "tree", depth=3, fanout=3)
+    expected_paths = {
+        make_file(tmp_path / "tree" / "dir_0" / "dir_1" / "dir_2" / GAME_FILENAME),
+        make_file(tmp_path / "tree" / "dir_2" / "dir_2" / GAME_FILENAME.lower())    # Case-insensitive
+    }
+    crawler = StarRailDirectoryCrawler(workers=4)
+    assert set(crawler.crawl([str(tmp_path / "tree")], GAME_FILENAME)) == expected_paths
+    assert crawler.listed_dirs == 1 + 3 + 9 + 27
+
+
+def test_crawl_prunes_directories(tmp_path):
+    make_file(tmp_path / "node_modules" / "pkg" / GAME_FILENAME)
+    make_file(tmp_path / "Node_Modules" / GAME_FILENAME)
+    expected_path = make_file(tmp_path / "apps" / "windows" / GAME_FILENAME)  # Only pruned at a drive root
+
+    crawler = StarRailDirectoryCrawler(workers=2, prune_dirs={"node_modules"}, prune_root_dirs={"windows"})
+    assert crawler.crawl([str(tmp_path)], GAME_FILENAME) == [expected_path]
+
+
+def test_crawl_stops_at_strong_match(tmp_path):
+    game_dir = tmp_path / "Star Rail Games"
+    directory_count = make_tree(game_dir, depth=3, fanout=4)
+    game_path = make_file(game_dir / GAME_FILENAME, GAME_FILE_SIZE)
+
+    # The game file is in the first directory listed, none of the subdirectories are listed after it
+    crawler = StarRailDirectoryCrawler(workers=1)
+    assert crawler.crawl([str(game_dir)], GAME_FILENAME, lambda path: path == game_path) == [game_path]
+    assert crawler.listed_dirs < directory_count
+
+    detector = make_detector(tmp_path)
+    assert detector.find_game([str(game_dir)]) == game_path
+
+
+def test_detector_prefers_strong_match(tmp_path):
+    make_tree(tmp_path / "library", depth=2, fanout=3)
+    make_file(tmp_path / "library" / "dir_0" / "backup" / GAME_FILENAME, GAME_FILE_SIZE)
+    strong_path = make_file(tmp_path / "library" / "dir_2" / "Star Rail Games" / GAME_FILENAME, GAME_FILE_SIZE)
+
+    detector = make_detector(tmp_path)
+    assert detector.find_game([str(tmp_path / "library")]) == strong_path
+
+
+def test_detector_falls_back_to_weak_match(tmp_path):
+    make_tree(tmp_path / "library", depth=2, fanout=3)
+    make_file(tmp_path / "library" / "dir_0" / "stub" / GAME_FILENAME, 1024)                     # Under the weak match size
+    weak_path = make_file(tmp_path / "library" / "dir_1" / "HSR" / GAME_FILENAME, GAME_FILE_SIZE)
+    make_file(tmp_path / "library" / "node_modules" / "Star Rail Games" / GAME_FILENAME, GAME_FILE_SIZE)   # Pruned
+
+    detector = make_detector(tmp_path)
+    assert detector.find_game([str(tmp_path / "library")]) == weak_path
+    assert len(detector.weak_matches) == 2
+    assert detector.install_index.get_paths().keys() == {weak_path}
+
+
+def test_detector_no_match(tmp_path):
+    make_file(tmp_path / "library" / "stub" / GAME_FILENAME, 1024)
+    detector = make_detector(tmp_path)
+    assert detector.find_game([str(tmp_path / "library")]) == None
+
+
+def test_strategy_without_find_not_instantiable(tmp_path):
+    class IncompleteStrategy(StarRailDetectionStrategy):
+        name = "Incomplete"
+
+    with pytest.raises(TypeError):
+        IncompleteStrategy(make_detector(tmp_path))
@@ -0,0 +1,166 @@
+import threading
+
+import pytest
+
+from starrail.utils.focus_source import FocusSource, FakeFocusSource
+from starrail.utils.process_watcher import GameProcessEvent, GameProcessWatcher, GameProcessSource, FakeProcessSource
+
+
+GAME_PID = 4242
+OTHER_PID = 1000
+
+
+def make_watcher(pid=None, focused_pid=None, **intervals):
+    source = FakeProcessSource(pid)
+    focus_source = FakeFocusSource(focused_pid)
+    return GameProcessWatcher(source, focus_source, **intervals), source, focus_source
+
+
+def test_poll_publishes_start_focus_and_exit():
+    watcher, source, focus_source = make_watcher()
+    received = []
+    watcher.subscribe(lambda event, pid: received.append((event, pid)))
+
+    assert watcher.poll() == []
+
+    source.pid = GAME_PID
+    assert watcher.poll() == [(GameProcessEvent.STARTED, GAME_PID)]
+    assert watcher.is_focused() == False
+
+    focus_source.focused_pid = GAME_PID
+    assert watcher.poll() == [(GameProcessEvent.FOCUSED, GAME_PID)]
+    assert watcher.is_focused() == True
+    assert watcher.poll() == []
+
+    focus_source.focused_pid = OTHER_PID
+    assert watcher.poll() == [(GameProcessEvent.UNFOCUSED, GAME_PID)]
+    assert watcher.is_focused() == False
+
+    focus_source.focused_pid = GAME_PID
+    watcher.poll()
+    source.pid = None
+    assert watcher.poll() == [(GameProcessEvent.UNFOCUSED, GAME_PID), (GameProcessEvent.STOPPED, GAME_PID)]
+    assert watcher.pid == None
+
+    assert received == [
+        (GameProcessEvent.STARTED, GAME_PID),
+        (GameProcessEvent.FOCUSED, GAME_PID),
+        (GameProcessEvent.UNFOCUSED, GAME_PID),
+        (GameProcessEvent.FOCUSED, GAME_PID),
+        (GameProcessEvent.UNFOCUSED, GAME_PID),
+        (GameProcessEvent.STOPPED, GAME_PID),
+    ]
+
+
+def test_poll_publishes_restart_with_new_pid():
+    watcher, source, _ = make_watcher(pid=GAME_PID)
+    watcher.poll()
+
+    source.pid = GAME_PID + 1
+    assert watcher.poll() == [(GameProcessEvent.STOPPED, GAME_PID), (GameProcessEvent.STARTED, GAME_PID + 1)]
+
+
+def test_failing_subscriber_does_not_stop_others():
+    watcher, source, _ = make_watcher()
+    received = []
+
+    def failing_callback(event, pid):
+        raise RuntimeError("subscriber failure")
+
+    watcher.subscribe(failing_callback)
+    watcher.subscribe(lambda event, pid: received.append(event))
+
+    source.pid = GAME_PID
+    watcher.poll()
+    assert received == [GameProcessEvent.STARTED]
+
+
+def test_no_focus_lookup_while_game_not_running():
+    watcher, _, focus_source = make_watcher(focused_pid=OTHER_PID)
+    watcher.poll()
+    assert focus_source.lookups == 0
+
+
+def test_interval_idle_until_game_found():
+    watcher, source, _ = make_watcher(min_interval=0.1, idle_interval=0.5, max_interval=2)
+
+    with watcher.fast_polling():
+        watcher.poll()
+        assert watcher.interval == 0.5  # Not running, every poll would be a full process scan
+
+        source.pid = GAME_PID
+        watcher.poll()
+        assert watcher.interval == 0.1
+        watcher.poll()
+        assert watcher.interval == 0.1
+
+
+def test_interval_backs_off_while_nothing_changes():
+    watcher, source, _ = make_watcher(min_interval=0.1, idle_interval=0.5, max_interval=2)
+
+    intervals = []
+    for _ in range(4):
+        watcher.poll()
+        intervals.append(watcher.interval)
+    assert intervals == [1, 2, 2, 2]
+
+    source.pid = GAME_PID
+    watcher.poll()
+    assert watcher.interval == 0.1
+    watcher.poll()
+    assert watcher.interval == 0.2
+
+
+def test_wait_for_start_focus_and_stop():
+    watcher, source, focus_source = make_watcher(min_interval=0.01, idle_interval=0.01, max_interval=0.05)
+    watcher.start()
+    try:
+        assert watcher.wait_for_start(timeout=0.05) == False
+        assert watcher.wait_for_stop(timeout=0) == True
+
+        timer = threading.Timer(0.05, lambda: setattr(source, "pid", GAME_PID))
+        timer.start()
+        assert watcher.wait_for_start(timeout=5) == True
+        assert watcher.pid == GAME_PID
+
+        timer = threading.Timer(0.05, lambda: setattr(focus_source, "focused_pid", GAME_PID))
+        timer.start()
+        assert watcher.wait_for_focus(timeout=5) == True
+        assert watcher.is_focused() == True
+
+        timer = threading.Timer(0.05, lambda: setattr(source, "pid", None))
+        timer.start()
+        assert watcher.wait_for_stop(timeout=5) == True
+        assert watcher.is_focused() == False
+    finally:
+        watcher.stop()
+    assert watcher.is_started() == False
+
+
+def test_subscriber_called_from_watcher_thread():
+    watcher, source, _ = make_watcher(min_interval=0.01, idle_interval=0.01, max_interval=0.05)
+    started = threading.Event()
+    watcher.subscribe(lambda event, pid: started.set() if event == GameProcessEvent.STARTED else None)
+
+    watcher.start()
+    try:
+        source.pid = GAME_PID
+        assert started.wait(timeout=5) == True
+    finally:
+        watcher.stop()
+
+
+def test_process_source_without_get_pid_not_instantiable():
+    class IncompleteSource(GameProcessSource):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSource()
+
+
+def test_focus_source_without_get_focused_pid_not_instantiable():
+    class IncompleteSource(FocusSource):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSource()
@@ -0,0 +1,85 @@
+import time
+import sqlite3
+from contextlib import closing
+
+from starrail.constants import PULL_AUTHKEY_LIFETIME
+from starrail.utils.pull_url_store import StarRailPullURLStore
+
+
+PULL_URL = "https://webstatic.mihoyo.com/hkrpg/event/e20211215gacha/index.html?authkey=key{}&timestamp={}"
+EVENT_URL = "https://webstatic.mihoyo.com/hkrpg/event/e20230101/index.html"
+GACHA_LOG_URL = "https://public-operation-hkrpg.mihoyo.com/common/gacha_record/api/getGachaLog?authkey=key{}&timestamp={}&gacha_type=1"
+
+
+def test_record_deduplicates(tmp_path):
+    store = StarRailPullURLStore(str(tmp_path / "pull_urls.db"))
+    pull_url = PULL_URL.format(0, int(time.time()))
+
+    store.record([pull_url, EVENT_URL, pull_url], {pull_url: 100.0})
+    rows = {row[0]: row for row in store.get_urls()}
+    _, first_seen, _, cached_time, is_pull, _ = rows[pull_url]
+    assert len(store.get_urls()) == 2
+    assert (cached_time, is_pull) == (100.0, 1)
+    assert rows[EVENT_URL][4] == 0
+
+    # Recording again refreshes last_seen only, an unknown cached time doesn't erase the known one
+    store.record([pull_url])
+    _, first_seen_again, last_seen, cached_time, _, _ = {row[0]: row for row in store.get_urls()}[pull_url]
+    assert len(store.get_urls()) == 2
+    assert first_seen_again == first_seen and last_seen >= first_seen
+    assert cached_time == 100.0
+
+
+def test_newest_valid_url_skips_expired_and_non_pull(tmp_path):
+    store = StarRailPullURLStore(str(tmp_path / "pull_urls.db"))
+    now = int(time.time())
+    expired_url = PULL_URL.format(0, now - 2 * PULL_AUTHKEY_LIFETIME)
+
+    store.record([EVENT_URL, expired_url])
+    assert store.get_newest_valid_url() == None
+
+    valid_url = PULL_URL.format(1, now - 60)
+    store.record([valid_url])
+    assert store.get_newest_valid_url() == valid_url
+
+
+def test_newest_valid_url_ordering(tmp_path):
+    store = StarRailPullURLStore(str(tmp_path / "pull_urls.db"))
+    now = int(time.time())
+    older_url = PULL_URL.format(0, now - 3600)
+    newer_url = PULL_URL.format(1, now - 60)
+
+    # Ordered by authkey expiry, not by the order the URLs were recorded in
+    store.record([newer_url])
+    store.record([older_url])
+    assert store.get_newest_valid_url() == newer_url
+
+    # URLs without a timestamp fall back to the time the game cached them
+    untimed_urls = ["https://webstatic.mihoyo.com/hkrpg/event/e20211215gacha/index.html?authkey=key{}".format(idx) for idx in range(2)]
+    untimed_store = StarRailPullURLStore(str(tmp_path / "untimed_pull_urls.db"))
+    untimed_store.record(untimed_urls, {untimed_urls[0]: 200.0, untimed_urls[1]: 100.0})
+    assert untimed_store.get_newest_valid_url() == untimed_urls[0]
+
+
+def test_gacha_log_api_url_not_a_pull(tmp_path):
+    store = StarRailPullURLStore(str(tmp_path / "pull_urls.db"))
+    now = int(time.time())
+    pull_url = PULL_URL.format(0, now - 60)
+    gacha_log_url = GACHA_LOG_URL.format(0, now - 55)
+
+    # The API URL carries a newer authkey, the page is still the URL to open
+    store.record([pull_url, gacha_log_url], {pull_url: now - 60, gacha_log_url: now - 55})
+    assert {row[0]: row[4] for row in store.get_urls()} == {pull_url: 1, gacha_log_url: 0}
+    assert store.get_newest_valid_url() == pull_url
+
+
+def test_gacha_log_api_url_flagged_by_older_version(tmp_path):
+    db_path = str(tmp_path / "pull_urls.db")
+    store = StarRailPullURLStore(db_path)
+    now = int(time.time())
+    pull_url = PULL_URL.format(0, now - 60)
+    store.record([pull_url])
+
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.execute("INSERT INTO pull_urls VALUES (?, ?, ?, ?, 1, ?)", (GACHA_LOG_URL.format(0, now), now, now, now, now + 3600))
+    assert store.get_newest_valid_url() == pull_url
@@ -0,0 +1,67 @@
+import json
+import time
+
+import pytest
+
+from starrail.config.runtime_state_handler import StarRailRuntimeState
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return tmp_path / "runtime_state.json"
+
+
+def make_runtime_state(state_file, flush_delay):
+    runtime_state = StarRailRuntimeState(flush_delay)
+    runtime_state.config_file = str(state_file)
+    runtime_state.pid, runtime_state.create_time = None, None
+    return runtime_state
+
+
+def wait_for_writes(runtime_state, writes, timeout=5):
+    deadline = time.monotonic() + timeout
+    while runtime_state.writes < writes and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_updates_coalesced_into_one_write(state_file):
+    runtime_state = make_runtime_state(state_file, flush_delay=0.2)
+
+    for pid in range(100, 110):
+        runtime_state.update(pid, 1700000000.0 + pid)
+    assert runtime_state.writes == 0
+    assert not state_file.exists()
+
+    wait_for_writes(runtime_state, 1)
+    time.sleep(0.3)
+    assert runtime_state.writes == 1
+    assert json.loads(state_file.read_text()) == {"pid": 109, "create_time": 1700000109.0}
+
+
+def test_unchanged_update_not_written(state_file):
+    runtime_state = make_runtime_state(state_file, flush_delay=0.05)
+    runtime_state.update(100, 1700000000.0)
+    wait_for_writes(runtime_state, 1)
+
+    runtime_state.update(100, 1700000000.0)
+    time.sleep(0.2)
+    assert runtime_state.writes == 1
+    assert runtime_state.flush() == True
+    assert runtime_state.writes == 1
+
+
+def test_flush_writes_pending_update(state_file):
+    runtime_state = make_runtime_state(state_file, flush_delay=60)
+    runtime_state.update(100, 1700000000.0)
+    runtime_state.update(101, 1700000001.0)
+
+    assert runtime_state.flush() == True
+    assert runtime_state.writes == 1
+    assert json.loads(state_file.read_text()) == {"pid": 101, "create_time": 1700000001.0}
+
+
+def test_failed_write(tmp_path):
+    runtime_state = make_runtime_state(tmp_path / "missing" / "runtime_state.json", flush_delay=60)
+    runtime_state.update(100, 1700000000.0)
+    assert runtime_state.flush() == False
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from starrail.utils.binary_decoder import StarRailBinaryDecoder
+from starrail.utils.string_index import StarRailStringIndex
+
+
+BINARY_CONTENT = b"\x00first string\x01\x02second string here\x03" + b"\xff" * 64 + b"third string\x00"
+EXPECTED_STRINGS = [(1, "first string"), (15, "second string here"), (98, "third string")]
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    file_path = tmp_path / "content.bin"
+    file_path.write_bytes(BINARY_CONTENT)
+    return str(file_path)
+
+
+@pytest.fixture
+def decoder(tmp_path):
+    decoder = StarRailBinaryDecoder()
+    decoder.string_index = StarRailStringIndex(str(tmp_path / "string_index"))
+    return decoder
+
+
+def write_index(string_index, file_path, entries, min_length=8):
+    with string_index.writer(file_path, min_length) as index_writer:
+        for offset, string in entries:
+            index_writer.add(offset, string)
+
+
+def index_files(string_index):
+    return sorted(os.listdir(string_index.index_dir)) if os.path.isdir(string_index.index_dir) else []
+
+
+def test_index_hit(decoder, binary_file):
+    assert decoder.string_index.load(binary_file, 8) == None
+
+    assert decoder.decode_indexed_binary_file(binary_file) == EXPECTED_STRINGS
+    assert decoder.decoded_count == 1
+    assert decoder.string_index.load(binary_file, 8) == EXPECTED_STRINGS
+
+    # Answered from the index, the file isn't decoded again
+    assert decoder.decode_indexed_binary_file(binary_file) == EXPECTED_STRINGS
+    assert decoder.decoded_count == 1
+
+    # Indexed per min_length
+    assert decoder.string_index.load(binary_file, 12) == None
+
+
+def test_index_non_ascii_strings(tmp_path, binary_file):
+    string_index = StarRailStringIndex(str(tmp_path / "string_index"))
+    entries = [(0, "版本更新公告"), (100, "Café"), (2**40, "")]
+    write_index(string_index, binary_file, entries)
+    assert string_index.load(binary_file, 8) == entries
+
+
+def test_index_invalidated_by_size(decoder, binary_file):
+    decoder.decode_indexed_binary_file(binary_file)
+    with open(binary_file, "ab") as wf:
+        wf.write(b"\x00appended string")
+    assert decoder.string_index.load(binary_file, 8) == None
+
+
+def test_index_invalidated_by_mtime(decoder, binary_file):
+    decoder.decode_indexed_binary_file(binary_file)
+    stat = os.stat(binary_file)
+    os.utime(binary_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert decoder.string_index.load(binary_file, 8) == None
+
+
+def test_index_invalidated_by_fingerprint(decoder, binary_file):
+    decoder.decode_indexed_binary_file(binary_file)
+
+    # Same size and mtime, different content
+    stat = os.stat(binary_file)
+    with open(binary_file, "r+b") as wf:
+        wf.write(b"\x00FIRST")
+    os.utime(binary_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(binary_file).st_size == stat.st_size
+
+    assert decoder.string_index.load(binary_file, 8) == None
+    assert decoder.decode_indexed_binary_file(binary_file)[0] == (1, "FIRST string")
+    assert decoder.decoded_count == 2
+
+
+def test_interrupted_commit_leaves_no_index(decoder, binary_file):
+    decoder.decode_indexed_binary_file(binary_file)
+    with open(binary_file, "ab") as wf:
+        wf.write(b"\x00appended string")
+
+    # Interrupted rebuild: neither the partial index nor the stale previous one is left behind
+    with pytest.raises(RuntimeError):
+        for _ in decoder.stream_indexed_binary_file(binary_file):
+            raise RuntimeError("interrupted")
+    assert index_files(decoder.string_index) == []
+    assert decoder.string_index.load(binary_file, 8) == None
+
+
+def test_file_changed_while_indexing(tmp_path, binary_file):
+    string_index = StarRailStringIndex(str(tmp_path / "string_index"))
+    with string_index.writer(binary_file, 8) as index_writer:
+        index_writer.add(1, "first string")
+        with open(binary_file, "ab") as wf:
+            wf.write(b"\x00appended string")
+    assert index_files(string_index) == []
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+from starrail.utils.status_sampler import GameStatusSample
+from starrail.utils.telemetry_store import TelemetryWriter
+
+if sys.version_info < (3, 12):
+    # star_rail_app (imported by the controller) uses f-string syntax that needs Python 3.12
+    pytest.skip("the app controller needs Python 3.12+", allow_module_level=True)
+
+from starrail.controllers import telemetry_controller
+from starrail.controllers.telemetry_controller import StarRailTelemetryController, TELEMETRY_EXTENSION
+
+
+@pytest.fixture
+def messages(monkeypatch):
+    # aprint writes to the sys.stdout bound when it was imported, the messages are recorded instead
+    printed_messages = []
+    monkeypatch.setattr(telemetry_controller, "aprint", lambda text, **kwargs: printed_messages.append(text))
+    return printed_messages
+
+
+def make_controller(tmp_path):
+    controller = StarRailTelemetryController(None)
+    controller.telemetry_dir = str(tmp_path)
+    return controller
+
+
+def write_recording(file_path, count):
+    writer = TelemetryWriter(str(file_path), 1, 1700000000.0)
+    for index in range(count):
+        writer.append(GameStatusSample(1700000000.0 + index, 4242, 1699999000.0, float(index), 1000000, 40,
+                                       index * 10, index * 5, index * 4096, index * 1024, None))
+    writer.close()
+
+
+def test_report_latest_recording_and_export_csv(tmp_path, messages, capsys):
+    controller = make_controller(tmp_path)
+    older_path, newer_path = tmp_path / f"older{TELEMETRY_EXTENSION}", tmp_path / f"newer{TELEMETRY_EXTENSION}"
+    write_recording(older_path, 2)
+    write_recording(newer_path, 10)
+    os.utime(older_path, (1, 1))
+    assert controller.get_latest_recording() == str(newer_path)
+
+    csv_path = tmp_path / "report.csv"
+    controller.report(csv_path=str(csv_path))
+    assert messages[0].startswith("10 samples")
+    assert "CPU Percent" in capsys.readouterr().out
+    assert len(csv_path.read_text().splitlines()) == 11
+
+
+def test_report_without_recording(tmp_path, messages):
+    make_controller(tmp_path).report()
+    assert messages[0].startswith("No telemetry recording found")
@@ -0,0 +1,139 @@
+import csv
+import math
+
+import pytest
+
+from starrail.exceptions.exceptions import StarRailTelemetryFormatException
+from starrail.utils.status_sampler import GameStatusSample
+from starrail.utils.telemetry_store import FIELDS, HEADER, RECORD, TelemetryReader, TelemetryWriter
+
+
+GAME_PID = 4242
+
+
+def make_sample(index, pid=GAME_PID, cpu_percent=None, read_count=None):
+    return GameStatusSample(
+        timestamp=1700000000.0 + index, pid=pid, create_time=1699999000.0,
+        cpu_percent=cpu_percent, rss=1000000 * (index + 1), num_threads=40 + index,
+        read_count=read_count, write_count=None, read_bytes=None, write_bytes=None, cpu_affinity=None
+    )
+
+
+def write_samples(file_path, samples, interval=1.0):
+    writer = TelemetryWriter(str(file_path), interval, 1700000000.0)
+    for sample in samples:
+        writer.append(sample)
+    writer.close()
+    return writer
+
+
+def read_column(file_path, field):
+    reader = TelemetryReader(str(file_path))
+    try:
+        return list(reader.iter_column(field))
+    finally:
+        reader.close()
+
+
+def test_write_reopen_append(tmp_path):
+    file_path = tmp_path / "telemetry" / "recording.srtm"
+    write_samples(file_path, [make_sample(index) for index in range(3)], interval=2.5)
+    writer = write_samples(file_path, [make_sample(index) for index in range(3, 5)], interval=9)
+    assert writer.records == 2
+
+    reader = TelemetryReader(str(file_path))
+    try:
+        assert len(reader) == 5
+        assert (reader.interval, reader.created_time) == (2.5, 1700000000.0)    # Header of the first writer kept
+        assert list(reader.iter_column("timestamp")) == [1700000000.0 + index for index in range(5)]
+        assert list(reader.iter_column("num_threads")) == [40.0 + index for index in range(5)]
+        assert math.isnan(reader.get_record(0)[FIELDS.index("cpu_percent")])
+    finally:
+        reader.close()
+
+
+def test_truncated_tail_dropped_before_append(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    write_samples(file_path, [make_sample(index) for index in range(3)])
+
+    # Crash in the middle of the 4th record
+    with open(file_path, "ab") as wf:
+        wf.write(RECORD.pack(*[1.0] * len(FIELDS))[:RECORD.size // 2])
+    assert read_column(file_path, "rss") == [1000000.0, 2000000.0, 3000000.0]
+
+    write_samples(file_path, [make_sample(3), make_sample(4)])
+    assert file_path.stat().st_size == HEADER.size + 5 * RECORD.size
+    assert read_column(file_path, "rss") == [1000000.0 * (index + 1) for index in range(5)]
+    assert read_column(file_path, "pid") == [GAME_PID] * 5
+
+
+def test_other_format_not_appended(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    file_path.write_bytes(b"not a telemetry file at all, long enough for a header")
+
+    with pytest.raises(StarRailTelemetryFormatException):
+        TelemetryWriter(str(file_path), 1, 1700000000.0)
+    assert file_path.read_bytes() == b"not a telemetry file at all, long enough for a header"
+
+
+def test_rates(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    samples = [make_sample(0, read_count=100), make_sample(2, read_count=300), make_sample(3, read_count=350),
+               make_sample(4, pid=GAME_PID + 1, read_count=10), make_sample(5, pid=GAME_PID + 1, read_count=20)]
+    write_samples(file_path, samples)
+
+    reader = TelemetryReader(str(file_path))
+    try:
+        # No rate across a restart of the game (other pid)
+        assert list(reader.iter_rate("read_count")) == [100.0, 50.0, 10.0]
+        assert list(reader.iter_rate("write_count")) == []
+    finally:
+        reader.close()
+
+
+def test_get_stats_percentiles(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    write_samples(file_path, [make_sample(index, cpu_percent=float(index)) for index in range(1001)] + [make_sample(1001)])
+
+    reader = TelemetryReader(str(file_path))
+    try:
+        stats = reader.get_stats(lambda: reader.iter_column("cpu_percent"), percentiles=(50, 90, 99))
+        assert (stats["count"], stats["min"], stats["mean"], stats["max"]) == (1001, 0.0, 500.0, 1000.0)
+        # Exact to (max - min) / HISTOGRAM_BUCKETS
+        for percentile in (50, 90, 99):
+            assert abs(stats[f"p{percentile}"] - percentile * 10) <= 1000 / 2048 + 1
+
+        assert reader.get_stats(lambda: iter([7.0, 7.0])) == {"count": 2, "min": 7.0, "mean": 7.0, "max": 7.0, "p50": 7.0, "p90": 7.0, "p99": 7.0}
+        assert reader.get_stats(lambda: reader.iter_column("write_count")) == None
+    finally:
+        reader.close()
+
+
+def test_export_csv(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    write_samples(file_path, [make_sample(0, cpu_percent=12.5, read_count=3), make_sample(1)])
+    csv_path = tmp_path / "recording.csv"
+
+    reader = TelemetryReader(str(file_path))
+    try:
+        assert reader.export_csv(str(csv_path)) == 2
+    finally:
+        reader.close()
+
+    with open(csv_path, newline="") as rf:
+        rows = list(csv.reader(rf))
+    assert rows[0] == list(FIELDS)
+    assert rows[1] == ["1700000000", str(GAME_PID), "12.5", "1000000", "40", "3", "", "", ""]
+    assert rows[2] == ["1700000001", str(GAME_PID), "", "2000000", "41", "", "", "", ""]
+
+
+def test_empty_recording(tmp_path):
+    file_path = tmp_path / "recording.srtm"
+    write_samples(file_path, [])
+    reader = TelemetryReader(str(file_path))
+    try:
+        assert len(reader) == 0
+        assert list(reader.iter_column("rss")) == []
+        assert reader.get_stats(lambda: reader.iter_column("rss")) == None
+    finally:
+        reader.close()
@@ -0,0 +1,51 @@
+import re
+
+from starrail.constants import WEBCACHE_IGNORE_FILETYPES
+from starrail.controllers.webcache_controller import StarRailWebCacheController, StarRailWebCacheURLCategory
+
+
+DECODED_STRINGS = [
+    "https://webstatic.mihoyo.com/hkrpg/announcement/index.html?lang=en",
+    "  https://webstatic.mihoyo.com/hkrpg/event/e20211215gacha/index.html?authkey=abc&timestamp=1700000000  ",
+    "1/0/https://webstatic.mihoyo.com/hkrpg/event/e20230101/index.html",                 # Cache key prefix
+    "webstatic.mihoyo.com/hkrpg/event redirect https://example.com/landing",            # Category before "https"
+    "https://cdn.example.com/x https://webstatic.mihoyo.com/hkrpg/announcement/a.html",  # Two "https"
+    "https://webstatic.mihoyo.com/hkrpg/event/e1/index.html?next=https://webstatic.mihoyo.com/hkrpg/announcement/b",
+    "https://webstatic.mihoyo.com/hkrpg/event/e20211215gacha/assets/index.js",           # Ignored file type
+    "https://webstatic.mihoyo.com/hkrpg/announcement/banner.png",
+    "http://webstatic.mihoyo.com/hkrpg/event/insecure.html",                             # No "https"
+    "https://public-operation-hkrpg.mihoyo.com/common/gacha_record/api/getGachaLog?authkey=abc",
+    "https://webstatic.mihoyo.com/hkrpg/other/index.html"
+]
+
+
+def previous_filter_urls(target_sequence, decoded_strings):
+    # Filter of one category, as each category was extracted before the combined classifier
+    filtered_urls = []
+    for url in decoded_strings:
+        url = url.strip()
+        if target_sequence in url and not any(url.endswith(file_type) for file_type in WEBCACHE_IGNORE_FILETYPES):
+            match = re.search("https.*", url)
+            if match != None:
+                filtered_urls.append(match.group(0))
+    return filtered_urls
+
+
+def test_classify_urls_matches_previous_filters():
+    classified_urls = StarRailWebCacheController(None).classify_urls(DECODED_STRINGS)
+    assert classified_urls[StarRailWebCacheURLCategory.ANNOUNCEMENTS] == previous_filter_urls("webstatic.mihoyo.com/hkrpg/announcement", DECODED_STRINGS)
+    assert classified_urls[StarRailWebCacheURLCategory.EVENTS] == previous_filter_urls("webstatic.mihoyo.com/hkrpg/event", DECODED_STRINGS)
+
+
+def test_classify_urls_spans():
+    classified_urls = StarRailWebCacheController(None).classify_urls(DECODED_STRINGS)
+    assert classified_urls[StarRailWebCacheURLCategory.EVENTS][:3] == [
+        "https://webstatic.mihoyo.com/hkrpg/event/e20211215gacha/index.html?authkey=abc&timestamp=1700000000",
+        "https://webstatic.mihoyo.com/hkrpg/event/e20230101/index.html",
+        "https://example.com/landing"
+    ]
+    # From the first "https", and in every category whose sequence the string contains
+    assert "https://cdn.example.com/x https://webstatic.mihoyo.com/hkrpg/announcement/a.html" in classified_urls[StarRailWebCacheURLCategory.ANNOUNCEMENTS]
+    assert DECODED_STRINGS[5] in classified_urls[StarRailWebCacheURLCategory.ANNOUNCEMENTS]
+    assert DECODED_STRINGS[5] in classified_urls[StarRailWebCacheURLCategory.EVENTS]
+    assert classified_urls[StarRailWebCacheURLCategory.GACHA_LOG] == [DECODED_STRINGS[9]]
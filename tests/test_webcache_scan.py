@@ -0,0 +1,209 @@
+import os
+
+import pytest
+
+from starrail.controllers import webcache_controller
+from starrail.controllers.webcache_controller import StarRailWebCacheBinaryFile, StarRailWebCacheController
+from starrail.utils.pull_url_store import StarRailPullURLStore
+from test_chromium_cache_parser import SyntheticCache
+
+
+URL = "https://webstatic.mihoyo.com/hkrpg/event/e{}/index.html"
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def controller(tmp_path):
+    controller = StarRailWebCacheController(None)
+    controller.webcache_state.config_file = str(tmp_path / "webcache_state.json")
+    controller.pull_url_store = StarRailPullURLStore(str(tmp_path / "pull_urls.db"))
+    return controller
+
+
+@pytest.fixture
+def saves(controller, monkeypatch):
+    saved_states = []
+    save_cache_state = controller.webcache_state.save_cache_state
+
+    def recording_save(cache_dir, cache_state):
+        saved_states.append(cache_state)
+        return save_cache_state(cache_dir, cache_state)
+
+    monkeypatch.setattr(controller.webcache_state, "save_cache_state", recording_save)
+    return saved_states
+
+
+@pytest.fixture
+def parsers(monkeypatch):
+    created_parsers = []
+
+    class RecordingParser(webcache_controller.ChromiumBlockfileCacheParser):
+        def parse(self, known_entries=None):
+            created_parsers.append(self)
+            self.new_entries = super().parse(known_entries)
+            return self.new_entries
+
+    monkeypatch.setattr(webcache_controller, "ChromiumBlockfileCacheParser", RecordingParser)
+    return created_parsers
+
+
+def make_cache(cache_dir, entry_ids):
+    os.makedirs(cache_dir, exist_ok=True)
+    cache = SyntheticCache(cache_dir)
+    addresses = [cache.add_entry(bucket, URL.format(entry_id), 1700000000 + entry_id) for bucket, entry_id in enumerate(entry_ids)]
+    cache.write()
+    return addresses
+
+
+# =============================================
+# ===========| CACHE INDEX SCANS | ============
+# =============================================
+
+def test_known_entries_skipped(controller, saves, parsers, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    addresses = make_cache(cache_dir, [0, 1, 2])
+
+    assert controller.parse_webcache_entries(str(cache_dir)) == [URL.format(entry_id) for entry_id in range(3)]
+    assert len(saves) == 1
+    assert set(saves[0]["entries"]) == {str(address) for address in addresses}
+
+    # Nothing changed: every entry is known, nothing is parsed or saved
+    assert controller.parse_webcache_entries(str(cache_dir)) == [URL.format(entry_id) for entry_id in range(3)]
+    assert parsers[-1].new_entries == []
+    assert sorted(parsers[-1].known_addresses) == sorted(addresses)
+    assert len(saves) == 1
+
+
+def test_new_entry_parsed_alone(controller, saves, parsers, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    make_cache(cache_dir, [0, 1])
+    controller.parse_webcache_entries(str(cache_dir))
+
+    make_cache(cache_dir, [0, 1, 2])
+    assert controller.parse_webcache_entries(str(cache_dir)) == [URL.format(entry_id) for entry_id in range(3)]
+    assert [entry.url for entry in parsers[-1].new_entries] == [URL.format(2)]
+    assert len(saves) == 2
+    assert controller.url_timestamps[URL.format(2)] == 1700000002
+
+
+def test_evicted_entries_dropped_urls_kept(controller, saves, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    make_cache(cache_dir, [0, 1, 2])
+    controller.parse_webcache_entries(str(cache_dir))
+
+    # Entry 1 evicted, the blocks are reused by entries 2 and 3
+    addresses = make_cache(cache_dir, [0, 2, 3])
+    assert controller.parse_webcache_entries(str(cache_dir)) == [URL.format(entry_id) for entry_id in range(4)]
+    assert set(saves[-1]["entries"]) == {str(address) for address in addresses}
+    assert set(saves[-1]["urls"]) == {URL.format(entry_id) for entry_id in range(4)}
+
+
+def test_eviction_alone_saved(controller, saves, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    make_cache(cache_dir, [0, 1])
+    controller.parse_webcache_entries(str(cache_dir))
+
+    addresses = make_cache(cache_dir, [0])
+    assert controller.parse_webcache_entries(str(cache_dir)) == [URL.format(0), URL.format(1)]
+    assert len(saves) == 2
+    assert list(saves[-1]["entries"]) == [str(addresses[0])]
+
+
+# =============================================
+# ==========| BINARY FILE FALLBACK | ==========
+# =============================================
+
+@pytest.fixture
+def decoded_ranges(monkeypatch):
+    # Start offsets the binary file chunks are decoded from
+    decoded_starts = []
+    decode_binary_content = webcache_controller.decode_binary_content
+
+    def recording_decode(binary_content, min_length=8, start=0):
+        decoded_starts.append(start)
+        return decode_binary_content(binary_content, min_length, start)
+
+    monkeypatch.setattr(webcache_controller, "decode_binary_content", recording_decode)
+    monkeypatch.setattr(webcache_controller, "WEBCACHE_SCAN_CHUNK_SIZE", CHUNK_SIZE // 1024)
+    return decoded_starts
+
+
+def write_block_file(file_path, strings, size=CHUNK_SIZE * 8):
+    # strings: offset -> string
+    content = bytearray(size)
+    for offset, string in strings.items():
+        content[offset:offset + len(string)] = string.encode()
+    with open(file_path, "wb") as wf:
+        wf.write(content)
+
+
+def set_mtime(file_path, mtime_ns):
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_binary_fallback_rescans_changed_chunks(controller, saves, decoded_ranges, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    os.makedirs(cache_dir)
+    file_path = cache_dir / "data_2"
+    binary_files = [StarRailWebCacheBinaryFile.WEBCACHE_DATA2]
+
+    write_block_file(file_path, {100: URL.format(0), 5 * CHUNK_SIZE + 10: URL.format(1)})
+    set_mtime(file_path, 1_000_000_000)
+    assert controller.decode_webcache_files(binary_files, str(cache_dir)) == [URL.format(0), URL.format(1)]
+    assert decoded_ranges == [0]
+    assert len(saves) == 1
+
+    # Unchanged size and mtime: not read, not saved
+    assert controller.decode_webcache_files(binary_files, str(cache_dir)) == [URL.format(0), URL.format(1)]
+    assert decoded_ranges == [0]
+    assert len(saves) == 1
+
+    # A block rewritten in place (same size), with a URL crossing into the next chunk
+    crossing_offset = 3 * CHUNK_SIZE - 20
+    write_block_file(file_path, {100: URL.format(0), 5 * CHUNK_SIZE + 10: URL.format(1), crossing_offset: URL.format(2)})
+    set_mtime(file_path, 2_000_000_000)
+    assert controller.decode_webcache_files(binary_files, str(cache_dir)) == [URL.format(0), URL.format(1), URL.format(2)]
+    assert decoded_ranges[1:] == [2 * CHUNK_SIZE]
+    assert len(saves) == 2
+
+    # Only the tail of that URL changes: decoding backs up to the start of the string
+    changed_url = URL.format(2).replace("index", "other")
+    write_block_file(file_path, {100: URL.format(0), 5 * CHUNK_SIZE + 10: URL.format(1), crossing_offset: changed_url})
+    set_mtime(file_path, 3_000_000_000)
+    assert controller.decode_webcache_files(binary_files, str(cache_dir))[-1] == changed_url
+    assert decoded_ranges[2:] == [crossing_offset]
+
+
+def test_binary_fallback_touched_file_not_decoded(controller, saves, decoded_ranges, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    os.makedirs(cache_dir)
+    file_path = cache_dir / "data_2"
+    binary_files = [StarRailWebCacheBinaryFile.WEBCACHE_DATA2]
+
+    write_block_file(file_path, {100: URL.format(0)})
+    set_mtime(file_path, 1_000_000_000)
+    controller.decode_webcache_files(binary_files, str(cache_dir))
+
+    # mtime changed but no chunk did: nothing is decoded, only the new mtime is saved
+    set_mtime(file_path, 2_000_000_000)
+    assert controller.decode_webcache_files(binary_files, str(cache_dir)) == [URL.format(0)]
+    assert decoded_ranges == [0]
+    assert saves[-1]["data_files"]["data_2"]["mtime_ns"] == 2_000_000_000
+
+
+def test_binary_fallback_truncated_file_rescanned(controller, decoded_ranges, tmp_path):
+    cache_dir = tmp_path / "Cache_Data"
+    os.makedirs(cache_dir)
+    file_path = cache_dir / "data_2"
+    binary_files = [StarRailWebCacheBinaryFile.WEBCACHE_DATA2]
+
+    write_block_file(file_path, {100: URL.format(0)})
+    controller.decode_webcache_files(binary_files, str(cache_dir))
+
+    # The cache was cleared: the previous strings are dropped
+    write_block_file(file_path, {200: URL.format(1)}, size=CHUNK_SIZE * 2)
+    assert controller.decode_webcache_files(binary_files, str(cache_dir)) == [URL.format(1)]
+
+
+def test_binary_fallback_missing_files(controller, tmp_path):
+    assert controller.decode_webcache_files(list(StarRailWebCacheBinaryFile), str(tmp_path)) == None